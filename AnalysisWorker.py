@@ -0,0 +1,111 @@
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisWorker(object):
+    """
+    Runs HandAnalyzer off the Tk main thread.
+
+    submit() starts the 32-hold analysis on a background thread as soon as a hand is
+    dealt. Finished analyzers come back through a queue that the Tk loop drains with
+    root.after polling, so callbacks always run on the main thread. Only the most
+    recent job is live: submitting again or calling cancel() sets the running job's
+    cancel event and discards anything it still delivers. A job that fails is logged
+    and delivered as None, so the caller never waits on it.
+
+    The analysis modules (numpy, the exact engine, the strategy DB) are imported on
+    the worker thread too, so creating a worker costs the Tk thread nothing.
+    """
+
+    def __init__(self, root, poll_ms=25):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="peeker-analysis")
+        self.results = queue.Queue()
+        self.job_id = 0
+        self.cancel_event = None
+        self.callback = None
+        self.polling = False
+
+        # Import the engine and build its tables now, so the first deal doesn't wait for them
+        self.warm_up()
+
+    def warm_up(self, variant=None):
+        """Builds the exact engine for variant's game (default: Jacks or Better) in the background."""
+        self.executor.submit(self._warm_up, variant)
+
+    @staticmethod
+    def _warm_up(variant):
+        import ExactAnalyzer
+        import Variants
+        ExactAnalyzer.get_engine((variant or Variants.get_variant()).evaluator)
+
+    def submit(self, cards, deck_cards, callback, variant=None):
+        """
+        Analyzes cards against deck_cards; callback(analyzer) runs on the Tk thread, with
+        None if the analysis failed.
+        """
+        self.cancel()
+        self.job_id += 1
+        self.cancel_event = threading.Event()
+        self.callback = callback
+        self.executor.submit(self._run, self.job_id, self.cancel_event, list(cards), list(deck_cards), variant)
+        self._start_polling()
+
+    def cancel(self):
+        """Abandons the in-flight analysis, if any. Its result will never be delivered."""
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+        self.cancel_event = None
+        self.callback = None
+
+    @property
+    def busy(self):
+        return self.callback is not None
+
+    def _run(self, job_id, cancel_event, cards, deck_cards, variant):
+        from HandAnalyzer import AnalysisCancelled, HandAnalyzer
+
+        try:
+            analyzer = HandAnalyzer(cards, deck_cards, variant)
+            analyzer.cancel_event = cancel_event
+            analyzer.analyze()
+        except AnalysisCancelled:
+            return
+        except Exception:
+            # Still deliver the job, or the GUI would keep waiting for it
+            logger.exception("Analysis of %s failed", cards)
+            analyzer = None
+        self.results.put((job_id, analyzer))
+
+    def _start_polling(self):
+        if not self.polling:
+            self.polling = True
+            self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        while True:
+            try:
+                job_id, analyzer = self.results.get_nowait()
+            except queue.Empty:
+                break
+
+            # Results from cancelled or superseded jobs are dropped
+            if job_id == self.job_id and self.callback is not None:
+                callback = self.callback
+                self.callback = None
+                self.cancel_event = None
+                callback(analyzer)
+
+        if self.busy:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self.polling = False
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
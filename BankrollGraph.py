@@ -0,0 +1,201 @@
+import time
+from collections import deque
+
+
+class MinMaxDecimator(object):
+    """
+    Incremental min/max decimation of a growing series.
+
+    Values are folded into equal-width buckets that remember their min and max (and
+    where they occurred). When there are more than max_buckets, neighbouring buckets
+    are merged and the bucket width doubles, so appends are amortized O(1) and the
+    number of plotted points never exceeds 2 * max_buckets.
+    """
+
+    def __init__(self, max_buckets=600):
+        self.max_buckets = max_buckets
+        self.clear()
+
+    def clear(self):
+        self.bucket_size = 1
+        self.count = 0
+        self.last = None
+        # Each bucket: [start, fill, min_index, min_value, max_index, max_value]
+        self.buckets = []
+
+    def append(self, value):
+        index = self.count
+        self.count += 1
+        self.last = value
+
+        if self.buckets and self.buckets[-1][1] < self.bucket_size:
+            b = self.buckets[-1]
+            b[1] += 1
+            if value < b[3]:
+                b[2], b[3] = index, value
+            if value > b[5]:
+                b[4], b[5] = index, value
+        else:
+            self.buckets.append([index, 1, index, value, index, value])
+            if len(self.buckets) > self.max_buckets:
+                self._merge()
+
+    def _merge(self):
+        merged = []
+        for i in range(0, len(self.buckets), 2):
+            pair = self.buckets[i:i + 2]
+            low = min(pair, key=lambda b: b[3])
+            high = max(pair, key=lambda b: b[5])
+            merged.append([pair[0][0], sum(b[1] for b in pair), low[2], low[3], high[4], high[5]])
+        self.buckets = merged
+        self.bucket_size *= 2
+
+    def points(self):
+        """Returns (xs, ys) in time order: each bucket's min and max, in the order they happened."""
+        xs, ys = [], []
+        for _, _, min_i, min_v, max_i, max_v in self.buckets:
+            if min_i == max_i:
+                xs.append(min_i)
+                ys.append(min_v)
+            elif min_i < max_i:
+                xs += [min_i, max_i]
+                ys += [min_v, max_v]
+            else:
+                xs += [max_i, min_i]
+                ys += [max_v, min_v]
+        return xs, ys
+
+
+class BankrollGraph(object):
+    """
+    The session bankroll chart, drawn with persistent artists.
+
+    Every artist is created once; sync() only changes their data. The axes
+    limits grow in steps, so most hands redraw by blitting the animated artists
+    onto a cached background instead of redrawing the whole figure. History is
+    min/max decimated to about one point per pixel column, so the cost of a
+    redraw stays flat however long the session runs.
+    """
+    UP_COLOR = "#00ff00"
+    DOWN_COLOR = "#ff3333"
+
+    def __init__(self, fig, ax, canvas, baseline=200):
+        self.fig = fig
+        self.ax = ax
+        self.canvas = canvas
+        self.baseline = baseline
+        self.seen = 0
+        self.background = None
+        self.redraw_times = deque(maxlen=200)
+        self.last_redraw_ms = 0.0
+        self.full_redraws = 0
+
+        # Two points (min and max) per bucket: about one point per pixel column
+        width_px = int(fig.get_figwidth() * fig.dpi)
+        self.decimator = MinMaxDecimator(max_buckets=width_px // 2)
+
+        # 1. Static styling, set once
+        ax.set_title("SESSION VOLATILITY", color='#ffcc00', fontsize=12, fontweight='bold', pad=10)
+        ax.set_facecolor('#072b07')
+        ax.tick_params(colors='white', labelsize=8)
+        ax.grid(True, color='#0a3d0a', alpha=0.3)
+        ax.axhline(baseline, color='white', linestyle=':', alpha=0.4, label="Break Even")
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+
+        # 2. Persistent data artists (animated: drawn only by blitting)
+        self.line, = ax.plot([], [], color=self.UP_COLOR, linewidth=3, zorder=5, animated=True)
+        self.glow, = ax.plot([], [], color=self.UP_COLOR, linewidth=8, alpha=0.1, zorder=4, animated=True)
+        self.fill = ax.fill_between([0, 1], [0, 0], 0, color=self.UP_COLOR, alpha=0.1, animated=True)
+        self.marker = ax.scatter([0], [baseline], color="white", s=50, edgecolors=self.UP_COLOR, zorder=6,
+                                 animated=True)
+        self.artists = (self.fill, self.glow, self.line, self.marker)
+
+        self.xmax = 10
+        self.ymax = 320
+        ax.set_xlim(0, self.xmax)
+        ax.set_ylim(0, self.ymax)
+
+        # Any full redraw (including window resizes) refreshes the blit background
+        canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        for artist in self.artists:
+            self.ax.draw_artist(artist)
+
+    def sync(self, history):
+        """Feeds any new values of history (a growing list) and redraws; a shorter list resets the chart."""
+        if len(history) < self.seen:
+            self.reset()
+        for value in history[self.seen:]:
+            self.decimator.append(value)
+        self.seen = len(history)
+        self.redraw()
+
+    def redraw(self):
+        start = time.perf_counter()
+        xs, ys = self.decimator.points()
+        if not xs:
+            return
+
+        # Color logic: Green if current bankroll >= start, Red if below
+        color = self.UP_COLOR if self.decimator.last >= self.baseline else self.DOWN_COLOR
+        last_x = self.decimator.count - 1
+
+        self.line.set_data(xs, ys)
+        self.glow.set_data(xs, ys)
+        self.line.set_color(color)
+        self.glow.set_color(color)
+        self.fill.set_verts([[(xs[0], 0)] + list(zip(xs, ys)) + [(xs[-1], 0)]])
+        self.fill.set_facecolor(color)
+        self.marker.set_offsets([[last_x, self.decimator.last]])
+        self.marker.set_edgecolor(color)
+
+        # Limits only ever grow, by doubling x and stepping y, so full redraws are rare
+        needs_full = self.background is None
+        if last_x > self.xmax:
+            while last_x > self.xmax:
+                self.xmax *= 2
+            self.ax.set_xlim(0, self.xmax)
+            needs_full = True
+        top = max(max(ys), 300) + 20
+        if top > self.ymax:
+            self.ymax = top + 100
+            self.ax.set_ylim(0, self.ymax)
+            needs_full = True
+
+        if needs_full:
+            self.full_redraws += 1
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.background)
+            self._draw_artists()
+            self.canvas.blit(self.ax.bbox)
+
+        self.last_redraw_ms = (time.perf_counter() - start) * 1000
+        self.redraw_times.append(self.last_redraw_ms)
+
+    def reset(self):
+        self.decimator.clear()
+        self.seen = 0
+        self.xmax = 10
+        self.ymax = 320
+        self.ax.set_xlim(0, self.xmax)
+        self.ax.set_ylim(0, self.ymax)
+        self.background = None
+
+    def stats(self):
+        """Redraw timing metrics (milliseconds)."""
+        times = sorted(self.redraw_times)
+        return {
+            "last_ms": self.last_redraw_ms,
+            "mean_ms": sum(times) / len(times) if times else 0.0,
+            "p95_ms": times[int(len(times) * 0.95)] if times else 0.0,
+            "full_redraws": self.full_redraws,
+            "points": len(self.decimator.points()[0]),
+            "history": self.decimator.count
+        }
@@ -0,0 +1,169 @@
+import time
+
+import numpy as np
+
+from HandEvaluator import NUM_CATEGORIES, PRIMARY_SLOTS, QUAD_BASE, category_info
+from HandRank import HandRank
+from PayoutTable import PAYOUT_TABLE, payout_for
+
+# Card codes follow HandEvaluator: rank index = code >> 2 (0 = Two), suit = code & 3.
+
+# Rank bitmask (bit 0 = Two) -> straight high card, 0 if the mask is not a straight
+STRAIGHT_HIGH = np.zeros(8192, dtype=np.uint8)
+for _high in range(6, 15):
+    STRAIGHT_HIGH[0b11111 << (_high - 6)] = _high
+STRAIGHT_HIGH[0b1000000001111] = 5  # Ace-low (Wheel)
+
+# Multiplicity pattern of sorted ranks: bit j set when rank[j] == rank[j + 1].
+# Each pattern fixes the hand shape and which sorted column holds the primary rank.
+PATTERN_RANK = np.zeros(16, dtype=np.uint8)
+PATTERN_COLUMN = np.zeros(16, dtype=np.intp)
+for _pattern, _rank, _column in (
+        (1, HandRank.PAIR, 0), (2, HandRank.PAIR, 1), (4, HandRank.PAIR, 2), (8, HandRank.PAIR, 3),
+        (5, HandRank.TWO_PAIR, 3), (9, HandRank.TWO_PAIR, 3), (10, HandRank.TWO_PAIR, 3),
+        (3, HandRank.THREE_OF_A_KIND, 2), (6, HandRank.THREE_OF_A_KIND, 2), (12, HandRank.THREE_OF_A_KIND, 2),
+        (11, HandRank.FULL_HOUSE, 2), (13, HandRank.FULL_HOUSE, 2),
+        (7, HandRank.FOUR_OF_A_KIND, 1), (14, HandRank.FOUR_OF_A_KIND, 1)):
+    PATTERN_RANK[_pattern] = _rank
+    PATTERN_COLUMN[_pattern] = _column
+
+# Suit bitmask -> 1 if only one suit is present
+SINGLE_SUIT = np.zeros(16, dtype=np.uint8)
+SINGLE_SUIT[[1, 2, 4, 8]] = 1
+
+# Final lookup, keyed by pattern | straight << 4 | flush << 5 | ace_high_straight << 6:
+# the HandRank, the sorted column holding the primary rank, and whether primary is kept
+KEY_RANK = np.zeros(128, dtype=np.uint8)
+KEY_COLUMN = np.full(128, 4, dtype=np.intp)
+KEY_KEEP_PRIMARY = np.zeros(128, dtype=np.uint8)
+for _key in range(128):
+    _pattern, _straight, _flush, _ace_high = _key & 15, _key >> 4 & 1, _key >> 5 & 1, _key >> 6 & 1
+    if _pattern:
+        KEY_RANK[_key] = PATTERN_RANK[_pattern]
+        KEY_COLUMN[_key] = PATTERN_COLUMN[_pattern]
+        KEY_KEEP_PRIMARY[_key] = 1
+    elif _straight and _flush:
+        KEY_RANK[_key] = HandRank.ROYAL_FLUSH if _ace_high else HandRank.STRAIGHT_FLUSH
+        KEY_KEEP_PRIMARY[_key] = 1
+    elif _flush or _straight:
+        KEY_RANK[_key] = HandRank.FLUSH if _flush else HandRank.STRAIGHT
+        KEY_KEEP_PRIMARY[_key] = 1
+
+CHUNK_SIZE = 1 << 18
+
+
+def _evaluate_chunk(hands, ranks_out, primaries_out):
+    # 1. Sorted rank histogram, one contiguous array per column
+    sorted_ranks = np.sort(hands >> 2, axis=1)
+    r0, r1, r2, r3, r4 = np.ascontiguousarray(sorted_ranks.T)
+    s0, s1, s2, s3, s4 = np.ascontiguousarray((hands & 3).T)
+
+    pattern = ((r0 == r1).view(np.uint8) | ((r1 == r2).view(np.uint8) << 1)
+               | ((r2 == r3).view(np.uint8) << 2) | ((r3 == r4).view(np.uint8) << 3))
+
+    # 2. Straights and flushes via rank and suit bitmasks
+    one = np.uint16(1)
+    straight_high = STRAIGHT_HIGH[(one << r0) | (one << r1) | (one << r2) | (one << r3) | (one << r4)]
+    one = np.uint8(1)
+    is_flush = SINGLE_SUIT[(one << s0) | (one << s1) | (one << s2) | (one << s3) | (one << s4)]
+    is_straight = straight_high > 0
+
+    # 3. One table lookup for the rank, one gather for the primary value
+    key = (pattern | (is_straight.view(np.uint8) << 4) | (is_flush << 5)
+           | ((straight_high == 14).view(np.uint8) << 6))
+    ranks_out[:] = KEY_RANK[key]
+
+    column = np.arange(0, 5 * len(hands), 5) + KEY_COLUMN[key]
+    primary = np.take(sorted_ranks.ravel(), column) + np.uint8(2)
+    primaries_out[:] = np.where(is_straight, straight_high, primary) * KEY_KEEP_PRIMARY[key]
+
+
+def evaluate_batch(hands):
+    """
+    Classifies an (N, 5) uint8 array of card codes.
+    Returns (ranks, primaries) as uint8 arrays, identical to evaluate_hand_fast
+    (ranks hold HandRank values).
+    """
+    hands = np.ascontiguousarray(hands, dtype=np.uint8)
+    n = len(hands)
+    ranks = np.empty(n, dtype=np.uint8)
+    primaries = np.empty(n, dtype=np.uint8)
+
+    # Chunking keeps the temporaries cache-sized
+    for start in range(0, n, CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, n)
+        _evaluate_chunk(hands[start:stop], ranks[start:stop], primaries[start:stop])
+    return ranks, primaries
+
+
+def evaluate_categories(hands):
+    """
+    HandEvaluator category of every hand in an (N, 5) array of card codes, as uint16
+    (Four of a Kind lands in the kicker block, like HandEvaluator.evaluate_category).
+    """
+    hands = np.ascontiguousarray(hands, dtype=np.uint8)
+    ranks, primaries = evaluate_batch(hands)
+    cats = ranks.astype(np.uint16) * np.uint16(PRIMARY_SLOTS) + primaries
+
+    # The kicker is the one rank left over: sum of the ranks minus four times the quad rank
+    quads = np.flatnonzero(ranks == HandRank.FOUR_OF_A_KIND)
+    if len(quads):
+        rank_sum = (hands[quads] >> 2).sum(axis=1, dtype=np.uint16) + np.uint16(10)
+        quad_rank = primaries[quads].astype(np.uint16)
+        kicker = rank_sum - quad_rank * np.uint16(4)
+        cats[quads] = np.uint16(QUAD_BASE) + (quad_rank - np.uint16(2)) * np.uint16(PRIMARY_SLOTS) + kicker
+    return cats
+
+
+def payout_table_array(table=PAYOUT_TABLE):
+    """payout_for() (Jacks or Better rules on a HandRank table) as an array over every category."""
+    payouts = np.zeros(NUM_CATEGORIES)
+    for cat in range(NUM_CATEGORIES):
+        rank, primary, _ = category_info(cat)
+        payouts[cat] = payout_for(rank, primary, table)
+    return payouts
+
+
+def payout_batch(ranks, primaries, table=PAYOUT_TABLE):
+    """Applies the paytable (and the Jacks or Better pair rule) to evaluate_batch() output."""
+    index = ranks.astype(np.intp) * PRIMARY_SLOTS + primaries
+    return payout_table_array(table)[index]
+
+
+def cross_check(num_hands=200000, seed=0):
+    """
+    Compares evaluate_batch with HandAnalyzer.evaluate_hand_fast on random hands.
+    Returns the number of mismatches.
+    """
+    from Deck import Deck
+    from HandAnalyzer import HandAnalyzer
+
+    deck = Deck()
+    by_code = sorted(deck.cards, key=lambda c: c.get_code)
+    checker = HandAnalyzer(by_code[:5], by_code[5:])
+
+    rng = np.random.default_rng(seed)
+    hands = np.argsort(rng.random((num_hands, 52)), axis=1)[:, :5].astype(np.uint8)
+    ranks, primaries = evaluate_batch(hands)
+
+    mismatches = 0
+    for hand, rank, primary in zip(hands.tolist(), ranks.tolist(), primaries.tolist()):
+        if checker.evaluate_hand_fast([by_code[c] for c in hand]) != (rank, primary):
+            mismatches += 1
+    return mismatches
+
+
+def benchmark(num_hands=10000000, seed=0):
+    """Returns evaluate_batch throughput in hands per second."""
+    from ExactAnalyzer import all_hands
+
+    rng = np.random.default_rng(seed)
+    hands = all_hands()[rng.integers(0, 2598960, size=num_hands)]
+    start = time.perf_counter()
+    evaluate_batch(hands)
+    return num_hands / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    print(f"Cross-check vs evaluate_hand_fast: {cross_check()} mismatches")
+    print(f"evaluate_batch: {benchmark() / 1e6:.1f}M hands/sec")
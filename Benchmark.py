@@ -0,0 +1,642 @@
+"""
+Peeker benchmarks: python Benchmark.py [names] [--save baseline.json] [--compare baseline.json]
+
+Every benchmark runs from fixed seeds (--seed), so two runs do the same work, and
+reports percentiles over repeated samples. --save writes the results to a JSON
+baseline; --compare checks a new run against one and exits non-zero on regressions.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import Card
+from Deck import Deck, FastDeck
+
+DEFAULT_SEED = 1234
+
+# A timing metric this much worse than the baseline counts as a regression
+DEFAULT_TOLERANCE = 0.15
+
+
+class LegacyCard(object):
+    """The previous Card implementation (six dicts per instance), kept as a baseline."""
+
+    def __init__(self, suit, value):
+        self.value = value
+        self.suit = suit
+        self.full_value_lookup = {"2": "Two", "3": "Three", "4": "Four", "5": "Five", "6": "Six", "7": "Seven", "8": "Eight", "9": "Nine", "t": "Ten", "j": "Jack", "q": "Queen", "k": "King", "a": "Ace"}
+        self.full_value_plural_lookup = {"2": "Twos", "3": "Threes", "4": "Fours", "5": "Fives", "6": "Sixes", "7": "Sevens", "8": "Eights", "9": "Nines", "t": "Tens", "j": "Jacks", "q": "Queens", "k": "Kings", "a": "Aces"}
+        self.int_value_plural_lookup = {2: "Twos", 3: "Threes", 4: "Fours", 5: "Fives", 6: "Sixes", 7: "Sevens", 8: "Eights", 9: "Nines", 10: "Tens", 11: "Jacks", 12: "Queens", 13: "Kings", 14: "Aces"}
+        self.int_value_lookup = {"2": 2, "3": 3, "4": 4, "5": 5, "6": 6, "7": 7, "8": 8, "9": 9, "t": 10, "j": 11, "q": 12, "k": 13, "a": 14}
+        self.int_suit_lookup = {"s": 1, "h": 2, "d": 3, "c": 4}
+        self.full_suit_lookup = {"c": "Clubs", "s": "Spades", "h": "Hearts", "d": "Diamonds"}
+
+    @property
+    def get_int_value(self):
+        return self.int_value_lookup[self.value]
+
+
+def legacy_deck():
+    """What Deck() used to do: build 52 new cards and shuffle them."""
+    cards = [LegacyCard(s, v) for s in ["c", "d", "h", "s"] for v in Card.VALUES]
+    random.shuffle(cards)
+    return cards
+
+
+def legacy_hold_ev(analyzer, held_cards):
+    """
+    The previous HandAnalyzer.calculate_hold_ev, kept as a baseline: it materializes
+    every draw (or all 10,000 samples) as a Python list before evaluating any of them.
+    """
+    from collections import Counter
+    from math import comb
+    import itertools
+
+    num_to_draw = 5 - len(held_cards)
+    evaluator = analyzer.variant.evaluator
+    card_ints = evaluator.card_ints
+    deck_pool = [card_ints[c.get_code] for c in analyzer.remaining_deck]
+
+    if comb(len(deck_pool), num_to_draw) <= 20000:
+        actual_draws = list(itertools.combinations(deck_pool, num_to_draw))
+    else:
+        actual_draws = [random.sample(deck_pool, num_to_draw) for _ in range(10000)]
+
+    total_payout = 0
+    hits = 0
+    rank_counts = Counter()
+    held_ints = [card_ints[c.get_code] for c in held_cards]
+    payouts = analyzer.variant.payouts()
+    for draw in actual_draws:
+        cat = evaluator.evaluate_category(*(held_ints + list(draw)))
+        if payouts[cat] > 0:
+            hits += 1
+        rank_counts[evaluator.category_ranks[cat]] += 1
+        total_payout += payouts[cat]
+    return total_payout / len(actual_draws), hits / len(actual_draws), rank_counts
+
+
+def percentiles(samples, points=(50, 90, 99)):
+    """Nearest-rank percentiles of samples plus their mean, as {'p50': ..., 'mean': ...}."""
+    ordered = sorted(samples)
+    stats = {f"p{p}": ordered[min(len(ordered) - 1, max(0, -(-p * len(ordered) // 100) - 1))] for p in points}
+    stats["mean"] = sum(ordered) / len(ordered)
+    return stats
+
+
+def _format(stats, unit, scale=1.0):
+    return " | ".join(f"{name} {value * scale:,.1f}" for name, value in stats.items()) + f" {unit}"
+
+
+def _deals(seed, count, deck=Card.FULL_DECK):
+    """count fixed-seed deals as (hand, stub) lists of Cards."""
+    rng = random.Random(seed)
+    deals = []
+    for _ in range(count):
+        cards = list(deck)
+        rng.shuffle(cards)
+        deals.append((cards[:5], cards[5:]))
+    return deals
+
+
+def _measure(build, repeats):
+    """Returns (seconds per call, bytes allocated per call, peak bytes while holding all results)."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        build()
+    per_call = (time.perf_counter() - start) / repeats
+
+    tracemalloc.start()
+    kept = [build() for _ in range(repeats)]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return per_call, current / repeats, peak
+
+
+def bench_cards(repeats=2000, seed=DEFAULT_SEED, batches=20):
+    """Deck construction time and memory: legacy per-instance dicts vs interned cards vs FastDeck."""
+    results = {}
+    for name, build in (("legacy", legacy_deck), ("interned", Deck), ("fast", FastDeck)):
+        random.seed(seed)
+        per_call, per_deck, peak = _measure(build, repeats)
+
+        # Percentiles over batches of repeats // batches decks (legacy decks leave a lot of garbage)
+        gc.collect()
+        batch = max(1, repeats // batches)
+        samples = []
+        for _ in range(batches):
+            start = time.perf_counter()
+            for _ in range(batch):
+                build()
+            samples.append((time.perf_counter() - start) / batch * 1e6)
+
+        results[name] = {
+            "deck_us": percentiles(samples),
+            "mean_call_us": per_call * 1e6,
+            "bytes_per_deck": per_deck,
+            "peak_mb": peak / 1e6
+        }
+
+    print(f"Deck construction ({repeats} decks held in memory)")
+    for name, r in results.items():
+        print(f"  {name:<9} {r['mean_call_us']:8.1f} us/deck | {r['bytes_per_deck']:9.0f} bytes/deck | peak {r['peak_mb']:.2f} MB")
+        print(f"  {'':<9} {_format(r['deck_us'], 'us')}")
+    return results
+
+
+def bench_evaluator(seed=DEFAULT_SEED, hands=20000, rounds=15):
+    """HandAnalyzer.evaluate_hand_fast throughput over fixed-seed hands (hands/sec per round)."""
+    from HandAnalyzer import HandAnalyzer
+
+    deals = [hand for hand, _ in _deals(seed, hands)]
+    analyzer = HandAnalyzer(deals[0], [])
+    evaluate = analyzer.evaluate_hand_fast
+
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for hand in deals:
+            evaluate(hand)
+        samples.append(hands / (time.perf_counter() - start))
+
+    result = {"hands_per_sec": percentiles(samples)}
+    print(f"evaluate_hand_fast ({hands} hands x {rounds} rounds)")
+    print(f"  {_format(result['hands_per_sec'], 'hands/sec')}")
+    return result
+
+
+def bench_optimal_move(seed=DEFAULT_SEED, hands=200):
+    """
+    Wall time of HandAnalyzer.find_optimal_move as the GUI calls it (strategy database
+    and cache first), and of the uncached exact engine path it falls back to.
+    """
+    from HandAnalyzer import HandAnalyzer
+    from StrategyCache import STRATEGY_CACHE
+    import ExactAnalyzer
+    import StrategyDB
+
+    deals = _deals(seed, hands)
+    STRATEGY_CACHE.clear()
+    ExactAnalyzer.get_engine()
+
+    timings = {"find_optimal_move": [], "exact_engine": []}
+    for hand, stub in deals:
+        analyzer = HandAnalyzer(hand, stub)
+        start = time.perf_counter()
+        analyzer.find_optimal_move()
+        timings["find_optimal_move"].append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        analyzer.calculate_all_holds_exact()
+        timings["exact_engine"].append((time.perf_counter() - start) * 1000)
+
+    result = {name + "_ms": percentiles(samples) for name, samples in timings.items()}
+    result["strategy_db"] = StrategyDB.get_default() is not None
+    print(f"find_optimal_move ({hands} deals, strategy database {'on' if result['strategy_db'] else 'off'})")
+    for name in timings:
+        print(f"  {name:<18} {_format(result[name + '_ms'], 'ms')}")
+    return result
+
+
+def bench_draws(seed=DEFAULT_SEED, hands=5):
+    """
+    HandAnalyzer.calculate_hold_ev per number of held cards: time and peak traced
+    allocation of one hold, for the legacy list-building loop and the streaming
+    DrawEnumerator. Holds of 0 and 1 cards are sampled, the rest enumerated exactly;
+    HOLD_CACHE is cleared before each measured run.
+    """
+    from HandAnalyzer import HandAnalyzer
+    from StrategyCache import HOLD_CACHE
+
+    deals = _deals(seed, hands)
+    results = {}
+    for name in ("legacy", "streaming"):
+        random.seed(seed)
+        results[name] = {}
+        for held in range(5):
+            timings, peaks = [], []
+            for hand, stub in deals:
+                analyzer = HandAnalyzer(hand, stub)
+                analyzer.get_draw_enumerator()
+                if name == "legacy":
+                    run = lambda: legacy_hold_ev(analyzer, hand[:held])
+                else:
+                    run = lambda: analyzer.calculate_hold_ev(hand[:held])
+                run()
+
+                # A cached hold would skip the enumeration being measured
+                HOLD_CACHE.clear()
+                start = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - start) * 1000)
+
+                HOLD_CACHE.clear()
+                gc.collect()
+                tracemalloc.start()
+                run()
+                peaks.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+            results[name][f"held_{held}"] = {"hold_ms": percentiles(timings), "peak_kb": max(peaks) / 1e3}
+
+    print(f"calculate_hold_ev per hold ({hands} deals)")
+    for name, rows in results.items():
+        for held, r in rows.items():
+            print(f"  {name:<9} {held}  {_format(r['hold_ms'], 'ms')} | peak {r['peak_kb']:9.1f} KB")
+    return results
+
+
+def bench_partial(seed=DEFAULT_SEED, draws=4096, rounds=20):
+    """
+    Draw evaluation per number of held cards: every final hand evaluated from its five
+    cards (evaluate_categories) vs the held cards' partial state completed by each
+    draw (complete_categories), for every game's evaluator. Also the exact engine's
+    scalar inner loop: a four-card hold completed by each stub card.
+    """
+    import numpy as np
+    import HandEvaluator
+    import WildEvaluator
+
+    rng = np.random.default_rng(seed)
+    results = {}
+    for evaluator in (HandEvaluator.NATURAL, WildEvaluator.DEUCES, WildEvaluator.JOKER):
+        card_ints = np.asarray(evaluator.card_ints, dtype=np.int64)
+        deck = rng.permutation(evaluator.deck_size)
+        stub = deck[5:]
+        rows = {}
+        for held in range(5):
+            hands = np.empty((draws, 5), dtype=np.uint8)
+            hands[:, :held] = deck[:held]
+            hands[:, held:] = np.array([rng.choice(stub, 5 - held, replace=False) for _ in range(draws)])
+            drawn = card_ints[hands[:, held:]].T.copy()
+
+            full, partial = [], []
+            for _ in range(rounds):
+                start = time.perf_counter()
+                evaluator.evaluate_categories(hands)
+                full.append(draws / (time.perf_counter() - start))
+
+                start = time.perf_counter()
+                state = evaluator.partial_state(evaluator.card_ints[c] for c in deck[:held].tolist())
+                evaluator.complete_categories(state, drawn)
+                partial.append(draws / (time.perf_counter() - start))
+            rows[f"held_{held}"] = {"full_per_sec": percentiles(full), "partial_per_sec": percentiles(partial)}
+
+        # Scalar: five-int evaluate_category vs complete_category from the four-card state
+        ints = evaluator.card_ints
+        a, b, c, d = [ints[x] for x in deck[:4].tolist()]
+        rest = [ints[x] for x in stub.tolist()]
+        full, partial = [], []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(50):
+                for x in rest:
+                    evaluator.evaluate_category(a, b, c, d, x)
+            full.append(50 * len(rest) / (time.perf_counter() - start))
+
+            start = time.perf_counter()
+            for _ in range(50):
+                state = evaluator.partial_state((a, b, c, d))
+                for x in rest:
+                    evaluator.complete_category(state, x)
+            partial.append(50 * len(rest) / (time.perf_counter() - start))
+        rows["scalar_held_4"] = {"full_per_sec": percentiles(full), "partial_per_sec": percentiles(partial)}
+        results[evaluator.key] = rows
+
+    print(f"Draw evaluation, full hand vs partial state ({draws} draws per batch, M draws/sec p50)")
+    for key, rows in results.items():
+        for name, r in rows.items():
+            full, partial = r["full_per_sec"]["p50"], r["partial_per_sec"]["p50"]
+            print(f"  {key:<8} {name:<14} full {full / 1e6:6.2f} | partial {partial / 1e6:6.2f} | x{partial / full:.2f}")
+    return results
+
+
+def bench_hold_cache(seed=DEFAULT_SEED, hands=20000, deals=20):
+    """
+    HOLD_CACHE over a long session: hit rate and size of a cache with the default
+    capacity as every hold of hands random deals is looked up (keys only), and the
+    time of a sampled-mode hold served from the cache vs computed (holds of 0 and 1
+    cards are sampled and never cached). Then the exact
+    engine over the same number of deals, whose four-card holds come from the cache.
+    """
+    import Canonicalizer
+    import ExactAnalyzer
+    import Variants
+    from HandAnalyzer import HandAnalyzer
+    from StrategyCache import HOLD_CACHE, HoldCache
+
+    # 1. Hit rate: a typical hold's counts stand in for every entry
+    variant = Variants.get_variant()
+    hand, stub = _deals(seed, 1)[0]
+    sample_counts = HandAnalyzer(hand, stub).get_draw_enumerator().hold_counts([c.get_code for c in hand[:2]]).copy()
+    cache = HoldCache(HOLD_CACHE.maxbytes)
+    rng = random.Random(seed)
+    checkpoints = {}
+    for i in range(1, hands + 1):
+        dealt = rng.sample(range(variant.deck_size), 5)
+        for mask in range(32):
+            held = [dealt[j] for j in range(5) if mask & (1 << (4 - j))]
+            discards = [dealt[j] for j in range(5) if not mask & (1 << (4 - j))]
+            key = ("natural", Canonicalizer.canonical_hold(held, discards))
+            if cache.get(key, len(sample_counts)) is None:
+                cache.put(key, sample_counts)
+        if i in (hands // 10, hands // 2, hands):
+            checkpoints[f"hands_{i}"] = cache.stats()
+
+    # 2. One hold served vs enumerated, over the 32 holds of each deal
+    served, enumerated = [], []
+    for hand, stub in _deals(seed, deals):
+        HOLD_CACHE.clear()
+        for samples in (enumerated, served):
+            analyzer = HandAnalyzer(hand, stub)
+            start = time.perf_counter()
+            for move in analyzer.all_possible_holds:
+                analyzer.calculate_hold_ev(move["cards"])
+            samples.append((time.perf_counter() - start) / 32 * 1000)
+
+    # 3. Exact engine: a cold cache, then the same deals again
+    engine = ExactAnalyzer.get_engine()
+    HOLD_CACHE.clear()
+    dealt = [rng.sample(range(variant.deck_size), 5) for _ in range(hands)]
+    timings = {}
+    for name in ("cold", "warm"):
+        start = time.perf_counter()
+        for codes in dealt:
+            engine.hold_counts(codes)
+        timings[name] = (time.perf_counter() - start) / hands * 1000
+    exact = {"cold_deal_ms": timings["cold"], "warm_deal_ms": timings["warm"], "cache": HOLD_CACHE.stats()}
+
+    result = {"session": checkpoints, "miss_hold_ms": percentiles(enumerated), "hit_hold_ms": percentiles(served),
+              "exact": exact}
+    print(f"Hold cache ({HOLD_CACHE.maxbytes >> 20} MB)")
+    for name, stats in checkpoints.items():
+        print(f"  {name:<13} {stats['hit_rate'] * 100:5.1f}% hits | {stats['size']:>7} holds | "
+              f"{stats['bytes'] / 1e6:6.1f} MB | {stats['evictions']} evicted")
+    print(f"  miss          {_format(result['miss_hold_ms'], 'us', 1000)}")
+    print(f"  hit           {_format(result['hit_hold_ms'], 'us', 1000)}")
+    print(f"  exact engine  cold {exact['cold_deal_ms']:.3f} ms/deal | warm {exact['warm_deal_ms']:.3f} ms/deal | "
+          f"{exact['cache']['hit_rate'] * 100:.1f}% hits over both passes, {exact['cache']['size']} holds")
+    return result
+
+
+def bench_reprice(seed=DEFAULT_SEED, deals=100, ticks=50):
+    """
+    A progressive meter ticking: re-pricing an analyzed deal from its category counts
+    (HandAnalyzer.reprice) vs analyzing it again, and re-pricing the whole hold tensor
+    (skipped until python HoldTensor.py build has saved it).
+    """
+    import HoldTensor
+    import Variants
+    from HandAnalyzer import HandAnalyzer
+
+    variant = Variants.get_variant()
+    meters = [variant.with_progressive_royal(4000 + 25 * i) for i in range(ticks)]
+    timings = {"reprice_us": [], "reanalyze_us": []}
+    for hand, stub in _deals(seed, deals):
+        analyzer = HandAnalyzer(hand, stub, variant)
+        analyzer.calculate_all_holds_exact()
+        analyzer.find_optimal_move()
+
+        start = time.perf_counter()
+        for meter in meters:
+            analyzer.reprice(meter)
+        timings["reprice_us"].append((time.perf_counter() - start) / ticks * 1e6)
+
+        start = time.perf_counter()
+        for meter in meters[:5]:
+            HandAnalyzer(hand, stub, meter).find_optimal_move()
+        timings["reanalyze_us"].append((time.perf_counter() - start) / 5 * 1e6)
+
+    result = {name: percentiles(samples) for name, samples in timings.items()}
+    print(f"Progressive re-pricing ({deals} deals, {ticks} meter ticks each)")
+    for name in timings:
+        print(f"  {name:<13} {_format(result[name], 'us')}")
+
+    tensor = HoldTensor.get_tensor(variant.evaluator, build_missing=False)
+    if tensor is not None:
+        samples = []
+        for meter in meters[:10]:
+            start = time.perf_counter()
+            HoldTensor.reprice(tensor, meter)
+            samples.append((time.perf_counter() - start) * 1000)
+        result["table_ms"] = percentiles(samples)
+        print(f"  {'whole table':<13} {_format(result['table_ms'], 'ms')} ({len(tensor):,} canonical hands)")
+    return result
+
+
+def bench_session(seed=DEFAULT_SEED, hands=1000, rounds=5):
+    """VideoPokerSim.run_session(silent=True) throughput, each round from the same seed."""
+    import Variants
+    from VideoPokerSim import VideoPokerSim
+
+    samples = []
+    for _ in range(rounds):
+        sim = VideoPokerSim(FastDeck, initial_bankroll=1000.0, keep_payouts=False, variant=Variants.get_variant())
+        start = time.perf_counter()
+        # The session's own banner and report are not part of the measurement output
+        with contextlib.redirect_stdout(io.StringIO()):
+            sim.run_session(num_hands=hands, silent=True, seed=seed)
+        samples.append(hands / (time.perf_counter() - start))
+
+    result = {"hands_per_sec": percentiles(samples)}
+    print(f"run_session ({hands} hands x {rounds} rounds, silent)")
+    print(f"  {_format(result['hands_per_sec'], 'hands/sec')}")
+    return result
+
+
+def bench_graph(seed=DEFAULT_SEED, hands=2000):
+    """
+    GUI.update_graph redraw time: BankrollGraph.sync after every hand of a fixed-seed
+    session, on an offscreen Agg canvas of the GUI's figure size (no display needed).
+    """
+    try:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+    except ImportError:
+        print("update_graph: unavailable (matplotlib is not installed)")
+        return None
+    from BankrollGraph import BankrollGraph
+
+    fig = Figure(figsize=(6, 2.5), dpi=100)
+    ax = fig.add_subplot()
+    graph = BankrollGraph(fig, ax, FigureCanvasAgg(fig), baseline=200)
+
+    rng = random.Random(seed)
+    history = [200]
+    samples = []
+    for _ in range(hands):
+        history.append(history[-1] - 1 + rng.choices((0, 1, 2, 3, 4, 6, 9, 25, 50, 800),
+                                                     (5454, 2146, 1293, 744, 112, 110, 115, 24, 1, 1))[0])
+        start = time.perf_counter()
+        graph.sync(history)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    result = {"redraw_ms": percentiles(samples), "full_redraws": graph.full_redraws}
+    print(f"update_graph ({hands} hands, {graph.full_redraws} full redraws)")
+    print(f"  {_format(result['redraw_ms'], 'ms')}")
+    return result
+
+
+# Cold-import budgets (ms of cumulative `-X importtime`) and modules each entry point must not load
+STARTUP_TARGETS = {
+    "GUI": {"budget_ms": 250, "forbidden": ("matplotlib", "PIL", "numpy")},
+    "SimulationCLI": {"budget_ms": 600, "forbidden": ("tkinter", "matplotlib", "PIL")}
+}
+
+
+def import_profile(module):
+    """
+    Imports module in a fresh interpreter with -X importtime. Returns (cumulative ms,
+    names of every module it loaded), or None if the import failed.
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if proc.returncode != 0:
+        return None
+
+    # Lines look like: "import time:   self [us] | cumulative | imported package"
+    loaded = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        loaded[fields[2].strip()] = int(fields[1])
+    return loaded.get(module, 0) / 1000, set(loaded)
+
+
+def bench_startup(repeats=3):
+    """Cold-import time of each entry point against its budget (best of repeats)."""
+    results = {}
+    print(f"Startup imports (best of {repeats}, -X importtime)")
+    for module, target in STARTUP_TARGETS.items():
+        runs = [import_profile(module) for _ in range(repeats)]
+        if any(run is None for run in runs):
+            results[module] = None
+            print(f"  {module:<14} unavailable (import failed in this environment)")
+            continue
+
+        import_ms = min(ms for ms, _ in runs)
+        leaked = sorted(name for name in target["forbidden"] if name in runs[0][1])
+        ok = import_ms <= target["budget_ms"] and not leaked
+        results[module] = {"import_ms": import_ms, "budget_ms": target["budget_ms"], "leaked": leaked, "ok": ok}
+
+        status = "OK" if ok else "OVER BUDGET"
+        print(f"  {module:<14} {import_ms:8.1f} ms (budget {target['budget_ms']} ms) {status}")
+        if leaked:
+            print(f"  {'':<14} loads {', '.join(leaked)} at import time")
+    return results
+
+
+BENCHMARKS = {
+    "cards": bench_cards,
+    "evaluator": bench_evaluator,
+    "optimal_move": bench_optimal_move,
+    "draws": bench_draws,
+    "partial": bench_partial,
+    "hold_cache": bench_hold_cache,
+    "reprice": bench_reprice,
+    "session": bench_session,
+    "graph": bench_graph,
+    "startup": bench_startup
+}
+
+# Benchmarks whose work is driven by --seed
+SEEDED = ("cards", "evaluator", "optimal_move", "draws", "partial", "hold_cache", "reprice", "session", "graph")
+
+
+def _flatten(results, prefix=""):
+    """{'evaluator': {'hands_per_sec': {'p50': x}}} -> {'evaluator.hands_per_sec.p50': x} (numbers only)."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def _direction(metric):
+    """+1 if bigger is better, -1 if smaller is better, 0 if the metric is not a timing."""
+    parts = metric.split(".")
+    # Only the median and mean of a percentiles() summary are gated; tails and one-off
+    # timings are too noisy on a shared machine
+    if parts[-1] not in ("p50", "mean"):
+        return 0
+    if any(part.endswith("_per_sec") for part in parts):
+        return 1
+    if any(part.endswith(("_ms", "_us")) for part in parts):
+        return -1
+    return 0
+
+
+def save_baseline(path, results, seed):
+    baseline = {
+        "seed": seed,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+    print(f"Wrote baseline {path}")
+
+
+def compare_baseline(path, results, tolerance=DEFAULT_TOLERANCE):
+    """Prints the gated timing metrics against the baseline. Returns the names of the regressions."""
+    with open(path) as f:
+        baseline = json.load(f)
+    old = _flatten(baseline["results"])
+    new = _flatten(results)
+
+    regressions = []
+    print(f"\nCompared with {path} (seed {baseline.get('seed')}, tolerance {tolerance:.0%})")
+    for metric in sorted(set(old) & set(new)):
+        direction = _direction(metric)
+        if direction == 0 or not old[metric]:
+            continue
+        change = (new[metric] - old[metric]) / old[metric]
+        regressed = direction * change < -tolerance
+        if regressed:
+            regressions.append(metric)
+        print(f"  {metric:<48} {old[metric]:>12,.2f} -> {new[metric]:>12,.2f} ({change:+.1%})"
+              f"{'  REGRESSION' if regressed else ''}")
+    print(f"{len(regressions)} regression(s)")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Peeker benchmarks")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run (default: all): {', '.join(BENCHMARKS)}")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help=f"seed for every benchmark (default: {DEFAULT_SEED})")
+    parser.add_argument("--save", default=None, help="write the results to this JSON baseline")
+    parser.add_argument("--compare", default=None, help="compare against this JSON baseline; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"allowed slowdown before a metric counts as a regression (default: {DEFAULT_TOLERANCE})")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+
+    results = {}
+    for name in args.names or BENCHMARKS:
+        results[name] = BENCHMARKS[name](seed=args.seed) if name in SEEDED else BENCHMARKS[name]()
+        print()
+
+    if args.save:
+        save_baseline(args.save, results, args.seed)
+    if args.compare and compare_baseline(args.compare, results, args.tolerance):
+        sys.exit(1)
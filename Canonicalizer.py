@@ -0,0 +1,107 @@
+import itertools
+
+# All 24 ways to relabel the four suits
+SUIT_PERMUTATIONS = tuple(itertools.permutations(range(4)))
+
+# Codes from here up (the Joker) have no suit and are never relabelled
+SUITLESS_CODE = 52
+
+
+def relabel(code, perm):
+    """A card code with its suit mapped through perm (suitless cards unchanged)."""
+    if code >= SUITLESS_CODE:
+        return code
+    return code - code % 4 + perm[code % 4]
+
+
+class CanonicalHand(object):
+    """
+    A dealt hand reduced to its suit-isomorphism class.
+
+    cards    : the canonical form, a sorted tuple of card codes. Two deals share it
+               exactly when one can be turned into the other by relabelling suits.
+    suit_map : suit_map[real_suit] -> canonical suit (suits as 0..3, code % 4)
+    order    : order[k] is the position in the real hand of canonical card k
+    """
+    __slots__ = ("cards", "suit_map", "order")
+
+    def __init__(self, cards, suit_map, order):
+        self.cards = cards
+        self.suit_map = suit_map
+        self.order = order
+
+    def real_mask(self, canonical_mask):
+        """Converts a hold mask over the canonical cards to one over the real hand."""
+        mask = 0
+        for k in range(5):
+            if canonical_mask & (1 << (4 - k)):
+                mask |= 1 << (4 - self.order[k])
+        return mask
+
+    def canonical_mask(self, real_mask):
+        """Converts a hold mask over the real hand to one over the canonical cards."""
+        mask = 0
+        for k in range(5):
+            if real_mask & (1 << (4 - self.order[k])):
+                mask |= 1 << (4 - k)
+        return mask
+
+    def real_code(self, canonical_code):
+        """Maps a canonical card code back to the real card code."""
+        if canonical_code >= SUITLESS_CODE:
+            return canonical_code
+        suit = self.suit_map.index(canonical_code % 4)
+        return canonical_code - canonical_code % 4 + suit
+
+    def __repr__(self):
+        return f"CanonicalHand({self.cards}, suit_map={self.suit_map}, order={self.order})"
+
+
+def canonicalize(codes):
+    """
+    Maps card codes (HandEvaluator encoding, suit = code % 4) to their canonical form:
+    the lexicographically smallest sorted tuple over all 24 suit relabellings.
+    """
+    best = None
+    for perm in SUIT_PERMUTATIONS:
+        relabelled = sorted((relabel(code, perm), i) for i, code in enumerate(codes))
+        key = tuple(code for code, _ in relabelled)
+        if best is None or key < best[0]:
+            best = (key, perm, relabelled)
+
+    key, perm, relabelled = best
+    return CanonicalHand(key, perm, tuple(i for _, i in relabelled))
+
+
+def canonicalize_cards(cards):
+    """canonicalize() for a list of Card objects."""
+    return canonicalize([c.get_code for c in cards])
+
+
+def canonical_hold(held, discards):
+    """
+    Suit-isomorphism class of a hold: the held card codes and the discards (every card
+    out of play that is not held, so the stub is the rest of the deck). Two holds share
+    it exactly when one becomes the other by relabelling suits, and then their draws
+    have the same category counts. Cheaper than canonicalize(): each suit is reduced to
+    its held and discarded rank bitmasks, the four suits are sorted, and everything is
+    packed into one int (a small key for HoldCache).
+    """
+    held_bits = [0, 0, 0, 0]
+    discard_bits = [0, 0, 0, 0]
+    suitless = 0
+    for code in held:
+        if code >= SUITLESS_CODE:
+            suitless += 1
+        else:
+            held_bits[code % 4] |= 1 << (code >> 2)
+    for code in discards:
+        if code >= SUITLESS_CODE:
+            suitless += 4
+        else:
+            discard_bits[code % 4] |= 1 << (code >> 2)
+
+    key = suitless
+    for suit in sorted((h << 13) | d for h, d in zip(held_bits, discard_bits)):
+        key = (key << 26) | suit
+    return key
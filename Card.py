@@ -1,13 +1,58 @@
+# --- SHARED LOOKUP TABLES ---
+# One copy for the whole process instead of six dicts per Card instance.
+full_value_lookup = {"2": "Two", "3": "Three", "4": "Four", "5": "Five", "6": "Six", "7": "Seven", "8": "Eight", "9": "Nine", "t": "Ten", "j": "Jack", "q": "Queen", "k": "King", "a": "Ace", "joker": "Joker"}
+full_value_plural_lookup = {"2": "Twos", "3": "Threes", "4": "Fours", "5": "Fives", "6": "Sixes", "7": "Sevens", "8": "Eights", "9": "Nines", "t": "Tens", "j": "Jacks", "q": "Queens", "k": "Kings", "a": "Aces"}
+int_value_plural_lookup = {2: "Twos", 3: "Threes", 4: "Fours", 5: "Fives", 6: "Sixes", 7: "Sevens", 8: "Eights", 9: "Nines", 10: "Tens", 11: "Jacks", 12: "Queens", 13: "Kings", 14: "Aces"}
+int_value_lookup = {"2": 2, "3": 3, "4": 4, "5": 5, "6": 6, "7": 7, "8": 8, "9": 9, "t": 10, "j": 11, "q": 12, "k": 13, "a": 14}
+int_suit_lookup = {"s": 1, "h": 2, "d": 3, "c": 4}
+full_suit_lookup = {"c": "Clubs", "s": "Spades", "h": "Hearts", "d": "Diamonds"}
+
+# Card code (HandEvaluator encoding): (int value - 2) * 4 + (int suit - 1)
+VALUES = ("2", "3", "4", "5", "6", "7", "8", "9", "t", "j", "q", "k", "a")
+SUITS = ("s", "h", "d", "c")
+
+# The Joker (53-card games) is code 52: it has no rank or suit of its own
+JOKER_CODE = 52
+
+CODE_VALUES = tuple(VALUES[code // 4] for code in range(52)) + ("joker",)
+CODE_SUITS = tuple(SUITS[code % 4] for code in range(52)) + ("",)
+CODE_INT_VALUES = tuple(code // 4 + 2 for code in range(52)) + (0,)
+CODE_INT_SUITS = tuple(code % 4 + 1 for code in range(52)) + (0,)
+
+
 class Card(object):
-    def __init__(self, suit, value):
-        self.value = value
-        self.suit = suit
-        self.full_value_lookup = {"2": "Two", "3": "Three", "4": "Four", "5": "Five", "6": "Six", "7": "Seven", "8": "Eight", "9": "Nine", "t": "Ten", "j": "Jack", "q": "Queen", "k": "King", "a": "Ace"}
-        self.full_value_plural_lookup = {"2": "Twos", "3": "Threes", "4": "Fours", "5": "Fives", "6": "Sixes", "7": "Sevens", "8": "Eights", "9": "Nines", "t": "Tens", "j": "Jacks", "q": "Queens", "k": "Kings", "a": "Aces"}
-        self.int_value_plural_lookup = {2: "Twos", 3: "Threes", 4: "Fours", 5: "Fives", 6: "Sixes", 7: "Sevens", 8: "Eights", 9: "Nines", 10: "Tens", 11: "Jacks", 12: "Queens", 13: "Kings", 14: "Aces"}
-        self.int_value_lookup = {"2": 2, "3": 3, "4": 4, "5": 5, "6": 6, "7": 7, "8": 8, "9": 9, "t": 10, "j": 11, "q": 12, "k": 13, "a": 14}
-        self.int_suit_lookup = {"s": 1, "h": 2, "d": 3, "c": 4}
-        self.full_suit_lookup = {"c": "Clubs", "s": "Spades", "h": "Hearts", "d": "Diamonds"}
+    """
+    An immutable playing card. There is exactly one instance per card: Card(suit, value)
+    returns the shared instance, so cards compare and hash by identity.
+    """
+    __slots__ = ("code",)
+
+    def __new__(cls, suit, value):
+        return BY_NAME[(suit, value)]
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Card is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Card is immutable")
+
+    def __reduce__(self):
+        # Unpickling returns the interned instance (used by the multiprocess simulator)
+        return from_code, (self.code,)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    @property
+    def value(self):
+        return CODE_VALUES[self.code]
+
+    @property
+    def suit(self):
+        return CODE_SUITS[self.code]
 
     def __repr__(self):
         # Maps raw chars to clean display chars
@@ -19,19 +64,61 @@ class Card(object):
         return f"{v}{s}"
 
     def print_full(self):
-        print(f"{self.full_value_lookup[self.value]} of {self.full_suit_lookup[self.suit]}")
+        print(f"{full_value_lookup[self.value]} of {full_suit_lookup[self.suit]}")
 
     def print_mini(self):
         print(f"{self.value}{self.suit}")
 
     @property
     def get_int_value(self):
-        return self.int_value_lookup[self.value]
+        return CODE_INT_VALUES[self.code]
 
     @property
     def get_int_suit(self):
-        return self.int_suit_lookup[self.suit]
+        return CODE_INT_SUITS[self.code]
+
+    @property
+    def get_code(self):
+        # 0..51 integer code used by HandEvaluator: (rank - 2) * 4 + (suit - 1); 52 is the Joker
+        return self.code
+
+    @property
+    def image_name(self):
+        """Name of the card's image in cards/ ('as', 'th', 'red_joker')."""
+        if self.code == JOKER_CODE:
+            return "red_joker"
+        return f"{self.value}{self.suit}"
 
     @property
     def get_value_name(self):
-        return self.full_value_lookup[self.value]
\ No newline at end of file
+        return full_value_lookup[self.value]
+
+
+def _intern(code):
+    card = object.__new__(Card)
+    object.__setattr__(card, "code", code)
+    return card
+
+
+# The 52 singletons plus the Joker, indexed by code
+BY_CODE = tuple(_intern(code) for code in range(53))
+BY_NAME = {(card.suit, card.value): card for card in BY_CODE}
+JOKER = BY_CODE[JOKER_CODE]
+
+# Fresh-deck order used by Deck.new(): clubs, diamonds, hearts, spades; Two up to Ace
+FULL_DECK = tuple(BY_NAME[(s, v)] for s in ["c", "d", "h", "s"] for v in VALUES)
+JOKER_DECK = FULL_DECK + (JOKER,)
+
+
+def from_code(code):
+    """Returns the Card for a 0..52 code."""
+    return BY_CODE[code]
+
+
+def full_deck(deck_size=52):
+    """The fresh-deck order for a 52-card game or a 53-card game with the Joker."""
+    if deck_size == 52:
+        return FULL_DECK
+    if deck_size == 53:
+        return JOKER_DECK
+    raise ValueError(f"Unsupported deck size {deck_size}; expected 52 or 53")
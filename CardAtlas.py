@@ -0,0 +1,163 @@
+import json
+import logging
+import os
+import threading
+import time
+
+import Card
+
+logger = logging.getLogger(__name__)
+
+CARD_SIZE = (110, 155)
+CARD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cards")
+BACK_NAME = "back_green"
+COLUMNS = 10
+
+
+def card_names():
+    """The 54 images the table uses: every card face ('as', 'th', ...), the Joker and the card back."""
+    return [f"{v}{s}" for s in Card.SUITS for v in Card.VALUES] + [Card.JOKER.image_name, BACK_NAME]
+
+
+class CardAtlas(object):
+    """
+    Every card image decoded and resized once, before the first hand needs it.
+
+    start() loads the images on a background thread: from a cached pre-resized
+    sprite sheet when it is newer than every source PNG, otherwise by decoding and
+    resizing the sources (then writing a fresh sheet for next time). Tk images must
+    be created on the main thread, so photo() / realize_all() turn the ready PIL
+    tiles into PhotoImages there.
+    """
+
+    def __init__(self, card_dir=CARD_DIR, size=CARD_SIZE, names=None):
+        self.card_dir = card_dir
+        self.size = size
+        self.names = names or card_names()
+        self.cache_path = os.path.join(card_dir, f".atlas_{size[0]}x{size[1]}.png")
+        self.tiles = {}
+        self.photos = {}
+        self.ready = threading.Event()
+        self.thread = None
+        self.source = None
+        self.load_ms = 0.0
+        self.error = None
+
+    def start(self):
+        """Begins loading in the background; safe to call more than once."""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._load, name="peeker-atlas", daemon=True)
+            self.thread.start()
+        return self
+
+    def _source_path(self, name):
+        return os.path.join(self.card_dir, f"{name}.png")
+
+    def _newest_source_mtime(self):
+        mtimes = [os.path.getmtime(self._source_path(n)) for n in self.names if os.path.exists(self._source_path(n))]
+        return max(mtimes) if mtimes else 0.0
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            newest = self._newest_source_mtime()
+            if not self._load_sheet(newest):
+                self._decode_sources()
+                self._write_sheet(newest)
+        except Exception as e:
+            self.error = e
+            logger.error("Card atlas failed to load: %s", e)
+        finally:
+            self.load_ms = (time.perf_counter() - start) * 1000
+            self.ready.set()
+
+    def _load_sheet(self, newest_mtime):
+        """Loads tiles from the cached sheet; returns False if it is missing or stale."""
+        from PIL import Image
+
+        if not os.path.exists(self.cache_path):
+            return False
+
+        sheet = Image.open(self.cache_path)
+        try:
+            meta = json.loads(sheet.text.get("peeker-atlas", "{}"))
+        except ValueError:
+            return False
+
+        if (meta.get("names") != self.names or meta.get("size") != list(self.size)
+                or meta.get("source_mtime", -1) < newest_mtime):
+            return False
+
+        sheet.load()
+        w, h = self.size
+        for i, name in enumerate(self.names):
+            if name in meta.get("missing", []):
+                continue
+            x, y = (i % COLUMNS) * w, (i // COLUMNS) * h
+            self.tiles[name] = sheet.crop((x, y, x + w, y + h))
+        self.source = "cache"
+        return True
+
+    def _decode_sources(self):
+        from PIL import Image
+
+        for name in self.names:
+            path = self._source_path(name)
+            try:
+                img = Image.open(path).convert("RGBA")
+            except OSError:
+                logger.warning("Card image not found: %s", path)
+                continue
+            # Standard video poker card size
+            self.tiles[name] = img.resize(self.size, Image.Resampling.LANCZOS)
+        self.source = "decoded"
+
+    def _write_sheet(self, newest_mtime):
+        from PIL import Image
+        from PIL.PngImagePlugin import PngInfo
+
+        w, h = self.size
+        rows = (len(self.names) + COLUMNS - 1) // COLUMNS
+        sheet = Image.new("RGBA", (COLUMNS * w, rows * h))
+        for i, name in enumerate(self.names):
+            if name in self.tiles:
+                sheet.paste(self.tiles[name], ((i % COLUMNS) * w, (i // COLUMNS) * h))
+
+        meta = PngInfo()
+        meta.add_text("peeker-atlas", json.dumps({
+            "names": self.names,
+            "size": list(self.size),
+            "source_mtime": newest_mtime,
+            "missing": [n for n in self.names if n not in self.tiles]
+        }))
+        try:
+            sheet.save(self.cache_path, pnginfo=meta)
+        except OSError:
+            # A read-only install still works; it just decodes every launch
+            pass
+
+    def photo(self, name):
+        """Returns the PhotoImage for a card name, or None if it has no image. Main thread only."""
+        if name not in self.photos:
+            self.start()
+            self.ready.wait()
+            tile = self.tiles.get(name)
+            if tile is None:
+                return None
+            from PIL import ImageTk
+            self.photos[name] = ImageTk.PhotoImage(tile)
+        return self.photos[name]
+
+    def realize_all(self):
+        """Creates every PhotoImage now, so no card is converted mid-animation. Main thread only."""
+        for name in self.names:
+            self.photo(name)
+
+    def stats(self):
+        """Startup time and memory held by the decoded tiles."""
+        return {
+            "images": len(self.tiles),
+            "source": self.source,
+            "load_ms": self.load_ms,
+            "memory_mb": sum(len(t.getbands()) * t.width * t.height for t in self.tiles.values()) / 1e6
+        }
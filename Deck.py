@@ -1,31 +1,153 @@
+import logging
 import random
+from array import array
 import Card
 
+logger = logging.getLogger(__name__)
+
+# The most cards one video poker hand can use: 5 dealt + up to 5 drawn
+DRAW_DEPTH = 10
+
 class Deck(object):
-    def __init__(self):
+    def __init__(self, rng=None, deck_size=52):
+        # rng: optional numpy Generator, so simulations can use their own seeded stream
+        self.rng = rng
+        # 53 adds the Joker (Variant.deck_size)
+        self.full = Card.full_deck(deck_size)
         self.cards = []
         self.new()
         self.shuffle()
 
     def new(self):
-        for s in ["c", "d", "h", "s"]:
-            for v in ["2", "3", "4", "5", "6", "7", "8", "9", "t", "j", "q", "k", "a"]:
-               self.cards.append(Card.Card(s, v))
+        # Cards are interned singletons, so a fresh deck is just a copy of the prebuilt order
+        self.cards = list(self.full)
+
+    def reset(self):
+        """Back to a full, unshuffled deck."""
+        self.new()
 
     def inject(self, cards_to_inject):
-        self.new()  # Reset to 52
+        self.new()  # Reset to the full deck
         # Use a list comprehension to filter - it's much safer than .remove()
-        for target in cards_to_inject:
-            self.cards = [c for c in self.cards if not (c.value == target.value and c.suit == target.suit)]
+        targets = set(cards_to_inject)
+        self.cards = [c for c in self.cards if c not in targets]
 
-        print(f"DEBUG: Deck size after inject: {len(self.cards)}")  # This MUST say 47
+        logger.debug("Deck size after inject: %d", len(self.cards))  # This MUST say 47 (48 with the Joker)
 
     def shuffle(self):
-        random.shuffle(self.cards)
+        if self.rng is not None:
+            self.rng.shuffle(self.cards)
+        else:
+            random.shuffle(self.cards)
 
     def dealOne(self):
         return self.cards.pop()
 
     @property
     def get_cards(self):
-        return self.cards
\ No newline at end of file
+        return self.cards
+
+
+class FastDeck(object):
+    """
+    Drop-in replacement for Deck backed by an array of card codes.
+
+    The undealt cards are codes[:size]; cards are dealt from the top (the end),
+    like Deck.dealOne. shuffle() only randomizes the top DRAW_DEPTH positions with
+    a partial Fisher-Yates, and any card dealt beyond that is picked at random when
+    it is dealt, so every deal is still uniformly random.
+    """
+    FULL_CODES = array('B', [c.code for c in Card.FULL_DECK])
+
+    def __init__(self, rng=None, deck_size=52):
+        # rng: optional numpy Generator, so simulations can use their own seeded stream
+        self.rng = rng
+        self._random = rng.random if rng is not None else random.random
+        # 53 adds the Joker (Variant.deck_size)
+        self.full_codes = self.FULL_CODES if deck_size == 52 else array('B', [c.code for c in Card.full_deck(deck_size)])
+        self.codes = array('B', self.full_codes)
+        self.size = len(self.full_codes)
+        self.shuffled = 0
+        self.shuffle()
+
+    def reset(self):
+        """Restores every card in place, without reallocating."""
+        self.codes[:] = self.full_codes
+        self.size = len(self.full_codes)
+        self.shuffled = 0
+
+    def new(self):
+        self.reset()
+
+    def shuffle(self, depth=DRAW_DEPTH):
+        """Randomizes the top `depth` cards (the only ones a hand can reach)."""
+        codes = self.codes
+        depth = min(depth, self.size)
+        for i in range(depth):
+            top = self.size - 1 - i
+            j = int(self._random() * (top + 1))
+            codes[top], codes[j] = codes[j], codes[top]
+        self.shuffled = depth
+
+    def _ensure_random_top(self):
+        # Past the pre-shuffled region: one more Fisher-Yates step
+        if self.shuffled == 0:
+            top = self.size - 1
+            j = int(self._random() * self.size)
+            self.codes[top], self.codes[j] = self.codes[j], self.codes[top]
+        else:
+            self.shuffled -= 1
+
+    def dealOne(self):
+        self._ensure_random_top()
+        self.size -= 1
+        return Card.BY_CODE[self.codes[self.size]]
+
+    def deal_codes(self, n):
+        """Deals n cards and returns their codes as an array slice (top card first)."""
+        for i in range(n):
+            if i >= self.shuffled:
+                top = self.size - 1 - i
+                j = int(self._random() * (top + 1))
+                self.codes[top], self.codes[j] = self.codes[j], self.codes[top]
+        self.shuffled = max(self.shuffled - n, 0)
+        self.size -= n
+        dealt = self.codes[self.size:self.size + n]
+        dealt.reverse()
+        return dealt
+
+    def deal(self, n):
+        """Deals n cards, in the same order n calls to dealOne() would."""
+        return [Card.BY_CODE[c] for c in self.deal_codes(n)]
+
+    def remove(self, codes_to_remove):
+        """Removes the given card codes from the undealt cards (one pass with a 53-bit mask)."""
+        mask = 0
+        for code in codes_to_remove:
+            mask |= 1 << code
+
+        kept = 0
+        codes = self.codes
+        for i in range(self.size):
+            code = codes[i]
+            if not (mask >> code) & 1:
+                codes[kept] = code
+                kept += 1
+        self.size = kept
+        self.shuffled = 0
+
+    def inject(self, cards_to_inject):
+        """Resets to the full deck and removes the injected ones (as Deck.inject)."""
+        self.reset()
+        self.remove([c.code for c in cards_to_inject])
+
+    @property
+    def cards(self):
+        return [Card.BY_CODE[c] for c in self.codes[:self.size]]
+
+    @property
+    def get_cards(self):
+        return self.cards
+
+    def __len__(self):
+        return self.size
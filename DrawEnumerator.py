@@ -0,0 +1,129 @@
+"""
+Streaming draw enumeration for HandAnalyzer.calculate_hold_ev.
+
+Draws are never built as Python lists. The held cards are evaluated once per hold,
+into a partial-hand state (HandEvaluator.partial_state). Each batch of up to
+CHUNK_SIZE draws is gathered from the stub, as packed evaluator ints, into one
+preallocated buffer, and the evaluator completes the held state with every row
+(complete_categories) instead of re-evaluating five cards per draw. The categories
+are folded into a running histogram, so memory per analysis is the buffers plus one
+chunk of evaluator temporaries, however many draws a hold has.
+"""
+import itertools
+from math import comb
+
+import numpy as np
+
+from Metrics import METRICS
+
+# Final hands per batch; sets the size of every buffer below
+CHUNK_SIZE = 4096
+
+# Holds with at most this many possible draws are enumerated exactly; the rest are sampled
+EXACT_LIMIT = 20000
+SAMPLE_SIZE = 10000
+
+# (stub size, cards drawn) -> every combination of stub positions, shared by all enumerators
+_combination_tables = {}
+
+
+def combination_table(n, k):
+    """(k, C(n, k)) uint8 array of stub positions: column i is the i-th of itertools.combinations."""
+    key = (n, k)
+    table = _combination_tables.get(key)
+    if table is None:
+        flat = itertools.chain.from_iterable(itertools.combinations(range(n), k))
+        table = np.fromiter(flat, dtype=np.uint8, count=comb(n, k) * k).reshape(-1, k).T.copy()
+        _combination_tables[key] = table
+    return table
+
+
+class DrawEnumerator(object):
+    """
+    Category histograms of every draw (or a uniform sample of draws) to a hold.
+
+    One enumerator serves all 32 holds of a deal: set_stub() once, then hold_counts()
+    per hold. hold_counts() returns the enumerator's own counts array, which the next
+    call overwrites.
+    """
+
+    def __init__(self, evaluator, chunk_size=CHUNK_SIZE, rng=None):
+        self.evaluator = evaluator
+        self.chunk_size = chunk_size
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.category_ranks = np.asarray(evaluator.category_ranks, dtype=np.intp)
+
+        self.card_ints = np.asarray(evaluator.card_ints, dtype=np.int64)
+
+        # The reusable buffers: drawn cards as packed ints and sampled stub positions,
+        # one row per drawn card (flat, so every (k, m) view of them is contiguous)
+        self.drawn = np.empty(chunk_size * 5, dtype=np.int64)
+        self.picks = np.empty(chunk_size * 5, dtype=np.intp)
+        self.counts = np.zeros(evaluator.num_categories, dtype=np.int64)
+        self.stub = np.empty(0, dtype=np.int64)
+
+    def set_stub(self, stub_codes):
+        """The cards draws come from (the undealt deck), as codes."""
+        self.stub = self.card_ints[np.fromiter(stub_codes, dtype=np.intp)]
+
+    def is_exact(self, k, exact_limit=EXACT_LIMIT):
+        """True when hold_counts() enumerates every draw of k cards instead of sampling."""
+        return comb(len(self.stub), k) <= exact_limit
+
+    def hold_counts(self, held_codes, exact_limit=EXACT_LIMIT, samples=SAMPLE_SIZE):
+        """
+        Category histogram of the final hands for a hold: every draw when there are at
+        most exact_limit of them, otherwise samples uniform draws without replacement.
+        """
+        k = 5 - len(held_codes)
+        n = len(self.stub)
+        self.counts[:] = 0
+        state = self.evaluator.partial_state(self.evaluator.card_ints[c] for c in held_codes)
+
+        total = comb(n, k)
+        if total <= exact_limit:
+            table = combination_table(n, k) if k else None
+            for start in range(0, total, self.chunk_size):
+                m = min(self.chunk_size, total - start)
+                begin = METRICS.clock()
+                drawn = self.drawn[:m * k].reshape(k, m)
+                if k:
+                    np.take(self.stub, table[:, start:start + m], out=drawn)
+                METRICS.add_time("analyzer.draws", begin)
+                self._fold(state, drawn)
+        else:
+            for start in range(0, samples, self.chunk_size):
+                m = min(self.chunk_size, samples - start)
+                begin = METRICS.clock()
+                drawn = self.drawn[:m * k].reshape(k, m)
+                np.take(self.stub, self._sample(m, k, n), out=drawn)
+                METRICS.add_time("analyzer.draws", begin)
+                self._fold(state, drawn)
+        return self.counts
+
+    def _sample(self, m, k, n):
+        """
+        Returns a (k, m) view of picks: column i holds k distinct stub positions, a
+        uniform draw without replacement. Floyd's algorithm, one vectorized step per
+        card: the card for step j is uniform in [0, j], or j itself if already picked.
+        """
+        picks = self.picks[:m * k].reshape(k, m)
+        for i, j in enumerate(range(n - k, n)):
+            pick = self.rng.integers(0, j + 1, size=m)
+            repeated = np.zeros(m, dtype=bool)
+            for earlier in picks[:i]:
+                repeated |= earlier == pick
+            picks[i] = np.where(repeated, j, pick)
+        return picks
+
+    def _fold(self, state, drawn):
+        begin = METRICS.clock()
+        cats = self.evaluator.complete_categories(state, drawn)
+        self.counts += np.bincount(cats, minlength=len(self.counts))
+        METRICS.add_time("analyzer.evaluate", begin)
+        METRICS.count("analyzer.evaluations", len(cats))
+
+    def rank_counts(self, counts=None):
+        """counts (default: the last hold's) summed per rank, indexed by rank value."""
+        counts = self.counts if counts is None else counts
+        return np.bincount(self.category_ranks, weights=counts, minlength=len(self.evaluator.ranks))
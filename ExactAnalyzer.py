@@ -0,0 +1,177 @@
+import itertools
+import threading
+from math import comb
+
+import numpy as np
+
+import Canonicalizer
+import HandEvaluator
+from HandRank import HandRank
+from Metrics import METRICS
+from StrategyCache import HOLD_CACHE
+
+# Final hands are bucketed by the game evaluator's category (HandEvaluator: HandRank,
+# primary, and the kicker of a Four of a Kind; WildEvaluator: WildRank and primary),
+# so any paytable rule can be priced from the counts (Variant.payout_array()).
+
+
+def rank_matrix(evaluator):
+    """(num_categories, len(ranks)) indicator: counts @ rank_matrix sums categories per rank."""
+    matrix = np.zeros((evaluator.num_categories, len(evaluator.ranks)), dtype=np.int64)
+    matrix[np.arange(evaluator.num_categories), evaluator.category_ranks] = 1
+    return matrix
+
+
+RANK_MATRIX = rank_matrix(HandEvaluator.NATURAL)
+
+
+def all_hands(deck_size=52, hand_size=5):
+    """Returns every sorted hand_size-card combination of codes 0..deck_size-1 as a uint8 array."""
+    total = comb(deck_size, hand_size)
+    flat = itertools.chain.from_iterable(itertools.combinations(range(deck_size), hand_size))
+    return np.fromiter(flat, dtype=np.uint8, count=total * hand_size).reshape(total, hand_size)
+
+
+class ExactAnalyzer(object):
+    """
+    Exact draw outcomes for all 32 holds of a dealt hand, with no sampling.
+
+    Every 5-card hand F of the full deck belongs to exactly one hold of the dealt
+    hand D: the hold H = F & D (the rest of F is drawn from the 47-card stub). If
+    N(T) is the category histogram of all hands that contain the cards T, then by
+    inclusion-exclusion
+
+        counts(H) = sum over H <= T <= D of (-1)^(|T| - |H|) * N(T)
+
+    N(T) for |T| <= 3 does not depend on the deal, so it is tabulated once for all
+    52 / 1,326 / 22,100 card subsets. Only the five 4-card subsets (48 hands each)
+    and the dealt hand itself are evaluated per deal, and N(T) of a 4-card T is the
+    hold T with no discards, so it is kept in HOLD_CACHE: there are only ~13,000 such
+    holds up to suits, and a long session stops enumerating them at all.
+
+    evaluator is the game's (HandEvaluator.NATURAL or a WildEvaluator); it sets the
+    deck (53 cards with the Joker) and the categories the counts are bucketed by.
+    """
+
+    def __init__(self, evaluator=HandEvaluator.NATURAL):
+        self.evaluator = evaluator
+        self.deck_size = deck_size = evaluator.deck_size
+        self.num_categories = evaluator.num_categories
+        self.rank_matrix = rank_matrix(evaluator)
+
+        hands = all_hands(deck_size)
+        cats = evaluator.evaluate_categories(hands).astype(np.int64)
+        codes = hands.astype(np.int64)
+
+        # Colex ranks of card subsets: a < b < c  ->  C(c,3) + C(b,2) + a
+        self.c2 = np.array([comb(n, 2) for n in range(deck_size)], dtype=np.int64)
+        self.c3 = np.array([comb(n, 3) for n in range(deck_size)], dtype=np.int64)
+
+        self.n0 = np.bincount(cats, minlength=self.num_categories)
+        self.n1 = self._tabulate([codes[:, i] for i in range(5)], cats, deck_size)
+        self.n2 = self._tabulate(
+            [self.c2[codes[:, j]] + codes[:, i] for i, j in itertools.combinations(range(5), 2)],
+            cats, comb(deck_size, 2))
+        self.n3 = self._tabulate(
+            [self.c3[codes[:, k]] + self.c2[codes[:, j]] + codes[:, i]
+             for i, j, k in itertools.combinations(range(5), 3)], cats, comb(deck_size, 3))
+
+    def _tabulate(self, subset_indices, cats, num_subsets):
+        width = self.num_categories
+        table = np.zeros(num_subsets * width, dtype=np.int64)
+        for idx in subset_indices:
+            table += np.bincount(idx * width + cats, minlength=num_subsets * width)
+        return table.reshape(num_subsets, width).astype(np.int32)
+
+    def _contains_counts(self, subset):
+        """N(T): category histogram of every 5-card hand containing the cards in subset."""
+        size = len(subset)
+        t = sorted(subset)
+
+        if size == 0:
+            return self.n0
+        if size == 1:
+            return self.n1[t[0]]
+        if size == 2:
+            return self.n2[self.c2[t[1]] + t[0]]
+        if size == 3:
+            return self.n3[self.c3[t[2]] + self.c2[t[1]] + t[0]]
+
+        row = np.zeros(self.num_categories, dtype=np.int64)
+        if size == 5:
+            row[self.evaluator.category_codes(t)] = 1
+            return row
+
+        # size == 4: extend the four cards' partial state with each of the 48 (49 with
+        # the Joker) other cards, unless an earlier deal already did
+        key = (self.evaluator.key, Canonicalizer.canonical_hold(t, ()))
+        cached = HOLD_CACHE.get(key, self.num_categories)
+        if cached is not None:
+            return cached
+        METRICS.count("exact.evaluations", self.deck_size - 4)
+        card_ints = self.evaluator.card_ints
+        complete_category = self.evaluator.complete_category
+        state = self.evaluator.partial_state(card_ints[x] for x in t)
+        for x in range(self.deck_size):
+            if x not in t:
+                row[complete_category(state, card_ints[x])] += 1
+        HOLD_CACHE.put(key, row)
+        return row
+
+    def hold_counts(self, codes):
+        """
+        Returns a (32, num_categories) array of exact final-hand counts.
+        Row i is the hold whose mask is format(i, '05b'): bit (4 - j) holds codes[j].
+        """
+        start = METRICS.clock()
+        counts = np.empty((32, self.num_categories), dtype=np.int64)
+        for mask in range(32):
+            held = [codes[j] for j in range(5) if mask & (1 << (4 - j))]
+            counts[mask] = self._contains_counts(held)
+        METRICS.add_time("exact.enumerate", start)
+        # The dealt hand; _contains_counts counts the 4-card completions it runs
+        METRICS.count("exact.evaluations")
+
+        # Mobius inversion over the superset lattice
+        start = METRICS.clock()
+        for bit in (1, 2, 4, 8, 16):
+            for mask in range(32):
+                if not mask & bit:
+                    counts[mask] -= counts[mask | bit]
+        METRICS.add_time("exact.inversion", start)
+
+        return counts
+
+
+# One shared engine per evaluator key ('natural', 'deuces', 'joker')
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(evaluator=HandEvaluator.NATURAL):
+    """Returns the shared ExactAnalyzer for a game's evaluator, building its tables on first use."""
+    with _engines_lock:
+        if evaluator.key not in _engines:
+            with METRICS.timer("exact.build"):
+                _engines[evaluator.key] = ExactAnalyzer(evaluator)
+        return _engines[evaluator.key]
+
+
+def summarize_holds(counts, payouts, ranks=RANK_MATRIX):
+    """
+    Vectorized per-hold summary of hold_counts() output, matching the fields
+    HandAnalyzer.find_optimal_move reports. ranks is the engine's rank_matrix.
+    Returns (evs, most_likely rank values, frequency of that rank).
+    """
+    totals = counts.sum(axis=1)
+    evs = counts @ payouts / totals
+    rank_totals = counts @ ranks
+
+    # Most frequent rank; if that is a loss, the most frequent winning rank instead
+    likely = rank_totals.argmax(axis=1)
+    chasing = rank_totals[:, 1:].argmax(axis=1) + 1
+    has_wins = rank_totals[:, 1:].sum(axis=1) > 0
+    likely = np.where((likely == HandRank.HIGH_CARD) & has_wins, chasing, likely)
+
+    hit_rates = rank_totals[np.arange(len(counts)), likely] / totals
+    return evs, likely, hit_rates
@@ -1,14 +1,20 @@
+import logging
 import tkinter as tk
-import matplotlib.pyplot as plt
 
 from tkinter import messagebox
-from Deck import Deck
-from HandAnalyzer import HandAnalyzer
+from Deck import FastDeck
+from AnalysisWorker import AnalysisWorker
+from BankrollGraph import BankrollGraph
+from CardAtlas import CardAtlas
+from HandHistory import HandHistory
+from MistakeAnalyzer import MistakeAnalyzer
 from GameState import GameState
 from HandRank import HandRank
-from PayoutTable import PAYOUT_TABLE
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from PIL import Image, ImageTk
+from MultiHand import PLAY_SIZES
+from RiskPanel import RiskPanel
+import Variants
+
+logger = logging.getLogger(__name__)
 
 
 class GUI:
@@ -19,24 +25,44 @@ class GUI:
         self.root.configure(bg="#0a3d0a")
 
         # --- Game Logic Objects ---
-        self.deck = Deck()
+        self.deck = FastDeck()
         self.current_hand = []
         self.starting_bankroll = 200
         self.bankroll = 200
         self.holds = [False] * 5
         self.game_state = GameState.DEAL
         self.analyzer = None
+        # True when the background analysis of the current deal raised (see AnalysisWorker)
+        self.analysis_failed = False
+        self.analysis_worker = AnalysisWorker(self.root)
+        # The game being played; the selector next to MAX BET switches it between hands
+        self.variant = Variants.get_variant()
+        # Multi-hand play: lines per deal (the on-screen hand is line 1) and the extra lines' results
+        self.num_lines = 1
+        self.stub_codes = []
+        self.line_results = None
         self.current_bet = 1
         self.max_bet_limit = 5
         self.bankroll_history = [200]
-        self.card_images = {}
+        # Decodes and resizes every card image on a background thread right away
+        self.atlas = CardAtlas().start()
         self.best_win = 0
         self.current_streak = 0
+        self.dealt_hand = []
+        # Every finished hand goes to SQLite on a background writer thread
+        self.hand_history = HandHistory()
+        # Grades each hold against the exact analysis and keeps the session's EV lost
+        self.mistakes = MistakeAnalyzer()
 
         # --- UI Elements ---
         self.hand_rank = ""
         self._setup_ui()
         self.update_payout_display()
+        self.root.after(50, self._finish_atlas)
+        self.root.after_idle(self.refresh_risk)
+
+        # Matplotlib is the slowest import by far: build the chart only once the window has painted
+        self.root.after_idle(self.root.after, 0, self._setup_graph)
 
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
@@ -58,29 +84,31 @@ class GUI:
                                    fg="white")
         self.profit_lbl.pack(side="right", padx=20)
 
-        # Matplotlib Plot below stats
-        self.fig, self.ax = plt.subplots(figsize=(6, 2.5), dpi=100)
+        # Matplotlib Plot below stats: a placeholder of the same size until _setup_graph runs
+        self.graph = None
+        self.graph_frame = tk.Frame(self.dashboard_frame, bg="#0a3d0a", width=600, height=250)
+        self.graph_frame.pack()
+        self.graph_frame.pack_propagate(False)
+
+    def _setup_graph(self):
+        """Imports matplotlib and builds the bankroll chart (deferred until after the first paint)."""
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        # A bare Figure, not pyplot: nothing global to manage or close on exit
+        self.fig = Figure(figsize=(6, 2.5), dpi=100)
+        self.ax = self.fig.add_subplot()
         self.fig.patch.set_facecolor('#0a3d0a')
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self.dashboard_frame)
-        self.canvas.get_tk_widget().pack()
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.graph_frame)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.graph = BankrollGraph(self.fig, self.ax, self.canvas, baseline=self.starting_bankroll)
         self.update_graph()
 
     def update_payout_display(self):
-        # Use PAYOUT_TABLE instead of PAYOUT_BASE
-        for rank, base_val in PAYOUT_TABLE.items():
-            if rank == HandRank.HIGH_CARD:
-                continue
-
-            # Calculation logic
-            win = base_val * self.current_bet
-
-            # Standard Video Poker: Royal Flush bonus at Max Bet (5 coins)
-            if rank == HandRank.ROYAL_FLUSH and self.current_bet == 5:
-                win = 4000
-
-            # Update the specific labels for this rank
-            if rank in self.payout_rows:
-                self.payout_rows[rank][1].config(text=str(win))
+        # Credits per pay category at the current bet
+        for name, win in self.variant.pays_for_bet(self.current_bet).items():
+            if name in self.payout_rows:
+                self.payout_rows[name][1].config(text=str(win))
 
     def _setup_ui(self):
         """Initializes the visual components with a sidebar layout."""
@@ -135,6 +163,22 @@ class GUI:
                                  font=("Arial", 10, "bold"), bg="#cc0000", fg="white")
         self.btn_max.grid(row=0, column=3, padx=15)
 
+        # Game selector
+        self.variant_names = {v.name: v for v in Variants.VARIANTS.values()}
+        self.variant_choice = tk.StringVar(value=self.variant.name)
+        self.variant_menu = tk.OptionMenu(self.bet_frame, self.variant_choice, *self.variant_names,
+                                          command=self.change_variant)
+        self.variant_menu.config(font=("Arial", 10, "bold"), bg="#444", fg="white", highlightthickness=0)
+        self.variant_menu.grid(row=0, column=4, padx=5)
+
+        # Lines per deal (Single / Triple / Five / Ten / Hundred Play)
+        self.play_sizes = {name: lines for lines, name in PLAY_SIZES.items()}
+        self.lines_choice = tk.StringVar(value=PLAY_SIZES[self.num_lines])
+        self.lines_menu = tk.OptionMenu(self.bet_frame, self.lines_choice, *self.play_sizes,
+                                        command=self.change_lines)
+        self.lines_menu.config(font=("Arial", 10, "bold"), bg="#444", fg="white", highlightthickness=0)
+        self.lines_menu.grid(row=0, column=5, padx=5)
+
         # Card Display Area
         self.card_frame = tk.Frame(self.game_area, bg="#0a3d0a")
         self.card_frame.pack(pady=30)
@@ -184,6 +228,24 @@ class GUI:
         )
         self.result_label.pack(pady=5)
 
+        # Multi-hand results: one row per extra line plus the totals (shown only in multi-hand play)
+        self.lines_frame = tk.Frame(self.game_area, bg="#0a3d0a")
+        self.lines_list = tk.Listbox(
+            self.lines_frame,
+            bg="#051c05",
+            fg="#ffffff",
+            font=("Courier", 9),
+            borderwidth=0,
+            highlightthickness=0,
+            width=70,
+            height=5,
+            selectbackground="#051c05"
+        )
+        self.lines_list.pack(side="left", fill="x", expand=True)
+        lines_scroll = tk.Scrollbar(self.lines_frame, command=self.lines_list.yview)
+        lines_scroll.pack(side="right", fill="y")
+        self.lines_list.config(yscrollcommand=lines_scroll.set)
+
         # Action Button (DEAL/DRAW)
         self.deal_button = tk.Button(
             self.game_area,
@@ -226,6 +288,18 @@ class GUI:
                                    font=("Arial", 9), bg="#051c05", fg="white")
         self.streak_lbl.pack(anchor="w", pady=2)
 
+        self.ev_lost_lbl = tk.Label(self.summary_box, text="EV LOST: $0.00",
+                                    font=("Arial", 9), bg="#051c05", fg="white")
+        self.ev_lost_lbl.pack(anchor="w", pady=2)
+
+        self.accuracy_lbl = tk.Label(self.summary_box, text="OPTIMAL HOLDS: -",
+                                     font=("Arial", 9), bg="#051c05", fg="white")
+        self.accuracy_lbl.pack(anchor="w", pady=2)
+
+        # Exact variance and risk of ruin of the current game (filled in the background)
+        self.risk_panel = RiskPanel(self.payout_area, self.root)
+        self.risk_panel.pack(side="bottom", fill="x", pady=(20, 0))
+
         # --- Sidebar Strategy & History (Bottom Right) ---
         self.strategy_frame = tk.Frame(
             self.payout_area,
@@ -260,24 +334,26 @@ class GUI:
         self.history_list.pack(fill="both", expand=True, pady=5)
 
     def _setup_payout_table(self):
-        for widget in self.payout_area.winfo_children():
+        # The rows live in their own frame so switching games rebuilds only them
+        if not hasattr(self, 'paytable_frame'):
+            self.paytable_frame = tk.Frame(self.payout_area, bg="#072b07")
+            self.paytable_frame.pack(side="top", fill="x")
+        for widget in self.paytable_frame.winfo_children():
             widget.destroy()
 
         self.payout_rows = {}
 
-        tk.Label(self.payout_area, text="PAY TABLE", font=("Arial", 14, "bold"),
+        tk.Label(self.paytable_frame, text="PAY TABLE", font=("Arial", 14, "bold"),
                  bg="#072b07", fg="#ffcc00").pack(pady=(0, 15))
 
-        winning_ranks = [r for r in PAYOUT_TABLE.keys() if r != HandRank.HIGH_CARD]
-
-        for rank in winning_ranks:
-            row_frame = tk.Frame(self.payout_area, bg="#072b07")
+        for name in self.variant.pays:
+            row_frame = tk.Frame(self.paytable_frame, bg="#072b07")
             row_frame.pack(fill="x", pady=2)
 
             # Restored labels with more width and clearer colors
             name_lbl = tk.Label(
                 row_frame,
-                text=rank.name.replace("_", " ").title(),
+                text=name,
                 font=("Arial", 11, "bold"),
                 bg="#072b07",
                 fg="#ffffff",  # Changed to white so it's visible
@@ -297,18 +373,63 @@ class GUI:
             )
             val_lbl.pack(side="right")
 
-            self.payout_rows[rank] = [name_lbl, val_lbl]
+            self.payout_rows[name] = [name_lbl, val_lbl]
+
+    def change_variant(self, name):
+        """Switches games between hands: new paytable rows, analysis and payouts."""
+        if self.game_state != GameState.DEAL:
+            self.variant_choice.set(self.variant.name)
+            return
+        self.variant = self.variant_names[name]
+        # Joker Poker plays with a 53rd card; the new game's exact engine is built ahead of its first deal
+        self.deck = FastDeck(deck_size=self.variant.deck_size)
+        self.analysis_worker.warm_up(self.variant)
+        self._setup_payout_table()
+        self.update_payout_display()
+        self.refresh_risk()
+
+    def change_lines(self, name):
+        """Switches between single and multi-hand play between hands."""
+        if self.game_state != GameState.DEAL:
+            self.lines_choice.set(PLAY_SIZES[self.num_lines])
+            return
+        self.num_lines = self.play_sizes[name]
+        self.lines_list.delete(0, tk.END)
+        if self.num_lines > 1:
+            self.lines_frame.pack(before=self.deal_button, pady=5)
+        else:
+            self.lines_frame.pack_forget()
 
-    def highlight_win(self, hand_rank_enum):
-        """Highlights the winning row in the pay table."""
+    def show_line_results(self, main_payout):
+        """Lists every extra line of a multi-hand deal and the total over all lines."""
+        results = self.line_results
+        symbols = {'s': '♠', 'h': '♥', 'd': '♦', 'c': '♣'}
+        self.lines_list.delete(0, tk.END)
+
+        total = main_payout + results.total_payout
+        winners = results.winning_lines + (1 if main_payout > 0 else 0)
+        self.lines_list.insert(tk.END, f"{self.num_lines} LINES | {winners} WINNING | "
+                                       f"WON ${total:g} ON ${self.current_bet * self.num_lines} BET")
+        self.lines_list.itemconfig(0, fg="#ffcc00")
+
+        for line in results.lines():
+            cards = " ".join(("10" if c.value == 't' else c.value.upper()) + symbols.get(c.suit, "")
+                             for c in line["cards"])
+            label = line["pay_name"] or "-"
+            self.lines_list.insert(tk.END, f"#{line['line'] + 1:<3} {cards:<22} {label:<18} ${line['payout']:g}")
+            if line["payout"] > 0:
+                self.lines_list.itemconfig(tk.END, fg="#00ff00")
+
+    def highlight_win(self, pay_name):
+        """Highlights the winning row (a pay category name) in the pay table."""
         # 1. Reset all rows to the sidebar's dark background
         for labels in self.payout_rows.values():
             for lbl in labels:
                 lbl.config(bg="#072b07", fg="#aaa")
 
         # 2. Highlight the specific rank in Gold
-        if hand_rank_enum in self.payout_rows:
-            for lbl in self.payout_rows[hand_rank_enum]:
+        if pay_name in self.payout_rows:
+            for lbl in self.payout_rows[pay_name]:
                 lbl.config(bg="#ffcc00", fg="black")
 
     def change_bet(self, amount):
@@ -318,6 +439,7 @@ class GUI:
                 self.current_bet = new_bet
                 self.bet_label.config(text=f"BET: {self.current_bet}")
                 self.update_payout_display()
+                self.refresh_risk()
 
                 # Visual feedback only (No state=tk.DISABLED)
                 if self.current_bet > 0:
@@ -347,30 +469,23 @@ class GUI:
             self.play_action()
 
     def get_card_image(self, card_name):
-        """Loads 'as.png', 'kd.png', etc."""
-        if card_name in self.card_images:
-            return self.card_images[card_name]
-
-        # Force lowercase to match your files: 'as.png'
-        filename = f"{card_name.lower()}.png"
-        path = f"cards/{filename}"
-
-        try:
-            img = Image.open(path)
-            # Standard video poker card size
-            img = img.resize((110, 155), Image.Resampling.LANCZOS)
-            photo = ImageTk.PhotoImage(img)
-            self.card_images[card_name] = photo
-            return photo
-        except Exception as e:
-            print(f"File not found: {path}")
-            return None
+        """Returns the preloaded image for 'as', 'kd', 'back_green', etc."""
+        return self.atlas.photo(card_name.lower())
+
+    def _finish_atlas(self):
+        """Creates every PhotoImage once the atlas is loaded, before the first deal needs them."""
+        if not self.atlas.ready.is_set():
+            self.root.after(50, self._finish_atlas)
+            return
+        self.atlas.realize_all()
+        stats = self.atlas.stats()
+        logger.info("Card atlas: %d images from %s in %.0fms (%.1f MB)", stats['images'], stats['source'],
+                    stats['load_ms'], stats['memory_mb'])
 
     def show_cards(self, index=0):
         if index < len(self.current_hand):
             card = self.current_hand[index]
-            card_name = f"{card.value}{card.suit}".lower()
-            img = self.get_card_image(card_name)
+            img = self.get_card_image(card.image_name)
             if img:
                 self.card_labels[index].config(image=img, text="")
                 self.card_labels[index].image = img
@@ -392,8 +507,7 @@ class GUI:
     def reveal_single_card(self, index):
         """Helper to reveal the card and move to the next one."""
         card = self.current_hand[index]
-        card_name = f"{card.value}{card.suit}".lower()
-        img = self.get_card_image(card_name)
+        img = self.get_card_image(card.image_name)
         self.card_labels[index].config(image=img)
         self.card_labels[index].image = img
 
@@ -401,8 +515,16 @@ class GUI:
         self.animate_draw(index + 1)
 
     def analyze(self):
-        self.analyzer = HandAnalyzer(self.current_hand, self.deck.get_cards)
-        self.analyzer.analyze()
+        """Starts the strategy analysis in the background; on_analysis_ready receives it."""
+        self.analyzer = None
+        self.analysis_failed = False
+        self.analysis_worker.submit(self.current_hand, self.deck.get_cards, self.on_analysis_ready,
+                                    variant=self.variant)
+
+    def on_analysis_ready(self, analyzer):
+        # None: the analysis failed (already logged), so this deal is played without advice
+        self.analyzer = analyzer
+        self.analysis_failed = analyzer is None
 
     def reset_to_backs(self):
         """Instantly turns all cards face-down to the green back image."""
@@ -419,7 +541,9 @@ class GUI:
             self.result_label.config(text="PLACE A BET FIRST", fg="#ff3333")
             return
 
-        if self.bankroll < self.current_bet:
+        # Every line is a separate bet
+        wager = self.current_bet * self.num_lines
+        if self.bankroll < wager:
             messagebox.showerror("Insufficient Funds", "You don't have enough credits!")
             return
 
@@ -431,13 +555,19 @@ class GUI:
                 lbl.config(bg="#072b07", fg="#aaa")
 
         # 3. Handle Money
-        self.bankroll -= self.current_bet
+        self.bankroll -= wager
         self.header_label.config(text=f"Bankroll: ${self.bankroll}")
 
         # 4. Logic & State Change
         self.game_state = GameState.DRAW
-        self.deck = Deck()
-        self.current_hand = [self.deck.dealOne() for _ in range(5)]
+        self.deck.reset()
+        self.deck.shuffle()
+        self.current_hand = self.deck.deal(5)
+        self.dealt_hand = list(self.current_hand)
+        # Each extra line draws from its own copy of this stub
+        self.stub_codes = [c.get_code for c in self.deck.get_cards]
+        self.line_results = None
+        self.lines_list.delete(0, tk.END)
         self.analyze()
 
         # 5. Start Animation
@@ -455,6 +585,16 @@ class GUI:
         # We do this before cards are replaced and holds are reset.
         self.last_player_holds = self.holds[:]
 
+        # The hand is decided; an analysis that hasn't finished yet is no longer needed
+        self.analysis_worker.cancel()
+
+        # Multi-hand: the other lines keep the same cards and draw in one batch
+        if self.num_lines > 1:
+            from MultiHand import play_lines
+            mask = sum(1 << (4 - i) for i, held in enumerate(self.holds) if held)
+            self.line_results = play_lines(self.variant, [c.get_code for c in self.dealt_hand], mask,
+                                           self.stub_codes, self.num_lines - 1, self.current_bet)
+
         # 2. LOGIC: Replace cards that were NOT held
         for i, held in enumerate(self.holds):
             if not held:
@@ -474,60 +614,94 @@ class GUI:
 
     def finish_hand_logic(self):
         """Phase 2: Evaluation, Strategy Advisor update, and UI cleanup."""
-        # 1. Evaluate final hand
-        rank, val = self.analyzer.evaluate_hand_fast(self.current_hand)
-        rank_display = rank.name.replace("_", " ").title()
-
-        # 2. Payouts
-        base_payout = self.analyzer.get_payout(rank, val)
+        # 1. Evaluate final hand into its category (wild cards included); the variant names and prices it
+        evaluator = self.variant.evaluator
+        cat = evaluator.category_cards(self.current_hand)
+        rank = evaluator.category_ranks[cat]
+        pay_name = self.variant.pay_category(cat)
+        rank_display = pay_name or rank.name.replace("_", " ").title()
+
+        # 2. Payouts (per coin at this bet size)
+        base_payout = self.variant.payouts(self.current_bet)[cat]
         win_amount = base_payout * self.current_bet
 
-        # Royal Flush Max Bet Bonus
-        if rank == HandRank.ROYAL_FLUSH and self.current_bet == 5:
-            win_amount = 4000
-
         # 3. Strategy Advisor (Parse Mask + Symbols)
-        best_data = self.analyzer.best_move
-        best_mask_str = best_data.get('mask', '00000')
-        best_indices = [i for i, bit in enumerate(best_mask_str) if bit == '1']
+        player_mask = "".join("1" if h else "0" for h in self.last_player_holds)
+        assessment = None
+        if self.analyzer is not None:
+            # Every line plays the same hold, so a mistake costs its EV on each of them
+            assessment = self.mistakes.assess(self.analyzer, player_mask, bet=self.current_bet * self.num_lines)
+
+        if assessment is None:
+            # DRAW was clicked before the background analysis finished, or it failed
+            reason = "Analysis unavailable" if self.analysis_failed else "No analysis"
+            log_entry = f"[?] {rank_display[:8]} | {reason}"
+            log_color = "#aaaaaa"
+        else:
+            best_data = self.analyzer.best_move
+            best_mask_str = best_data.get('mask', '00000')
+            best_indices = [i for i, bit in enumerate(best_mask_str) if bit == '1']
 
-        symbols = {'s': '♠', 'h': '♥', 'd': '♦', 'c': '♣'}
+            symbols = {'s': '♠', 'h': '♥', 'd': '♦', 'c': '♣'}
 
-        if len(best_indices) == 5:
-            move_txt = "Hold All"
-        elif not best_indices:
-            move_txt = "Discard All"
-        else:
-            cards_str = []
-            for idx in best_indices:
-                c = self.current_hand[idx]
-                v = "10" if c.value == 't' else c.value.upper()
-                s = symbols.get(c.suit.lower(), c.suit)
-                cards_str.append(f"{v}{s}")
-            move_txt = "Hold " + " ".join(cards_str)
-
-        # Comparison Logic
-        player_indices = [i for i, h in enumerate(self.last_player_holds) if h]
-        is_correct = set(player_indices) == set(best_indices)
+            if len(best_indices) == 5:
+                move_txt = "Hold All"
+            elif not best_indices:
+                move_txt = "Discard All"
+            else:
+                cards_str = []
+                for idx in best_indices:
+                    # The dealt card, not whatever replaced it on the draw
+                    c = self.analyzer.player_cards[idx]
+                    v = "10" if c.value == 't' else c.value.upper()
+                    s = symbols.get(c.suit.lower(), c.suit)
+                    cards_str.append(f"{v}{s}")
+                move_txt = "Hold " + " ".join(cards_str)
+
+            # Comparison Logic: any hold with the best EV counts as correct
+            is_correct = assessment["is_optimal"]
+
+            icon = "[✓]" if is_correct else "[!]"
+            log_entry = f"{icon} {rank_display[:8]} | {move_txt}"
+            if not is_correct:
+                log_entry += f" (-{assessment['ev_cost']:.2f}, #{assessment['rank']})"
+            log_color = "#00ff00" if is_correct else "#ffaa00"
 
         # Log to Sidebar Strategy List
-        icon = "[✓]" if is_correct else "[!]"
-        log_entry = f"{icon} {rank_display[:8]} | {move_txt}"
-
         if hasattr(self, 'history_list'):
             self.history_list.insert(0, log_entry)
-            self.history_list.itemconfig(0, fg="#00ff00" if is_correct else "#ffaa00")
+            self.history_list.itemconfig(0, fg=log_color)
             if self.history_list.size() > 12:
                 self.history_list.delete(12)
 
-        # 4. Handle Bankroll and Result Label
-        if win_amount > 0:
-            self.result_label.config(text=f"{rank_display} - WIN ${win_amount}!", fg="#ffcc00")
-            self.bankroll += win_amount
+        # Persist the hand, line 1 in multi-hand play (queued; the write happens on the history thread)
+        if assessment is None:
+            self.hand_history.record(self.dealt_hand, self.current_hand, player_mask, rank, win_amount,
+                                     self.current_bet)
+        else:
+            self.hand_history.record(self.dealt_hand, self.current_hand, player_mask, rank, win_amount,
+                                     self.current_bet, optimal_mask=assessment["optimal_mask"],
+                                     player_ev=assessment["player_ev"], optimal_ev=assessment["optimal_ev"],
+                                     is_optimal=assessment["is_optimal"])
+        self.update_mistake_display()
+
+        # 4. Handle Bankroll and Result Label (in multi-hand play, over all lines)
+        total_win = win_amount
+        if self.line_results is not None:
+            # GUI bets are whole credits, so every line pays a whole number
+            total_win += int(self.line_results.total_payout)
+            self.show_line_results(win_amount)
+
+        if total_win > 0:
+            if self.line_results is None:
+                self.result_label.config(text=f"{rank_display} - WIN ${win_amount}!", fg="#ffcc00")
+            else:
+                self.result_label.config(text=f"{rank_display} - TOTAL WIN ${total_win}!", fg="#ffcc00")
+            self.bankroll += total_win
 
             # Update Best Win
-            if win_amount > self.best_win:
-                self.best_win = win_amount
+            if total_win > self.best_win:
+                self.best_win = total_win
                 if hasattr(self, 'best_win_lbl'):
                     self.best_win_lbl.config(text=f"BEST WIN: ${self.best_win}")
 
@@ -537,10 +711,10 @@ class GUI:
             self.streak_lbl.config(text=f"STREAK: {self.current_streak} Wins", fg="#00ff00")
 
             # Payout Animations
-            if rank.value >= 6:
-                self.flash_payout_row(rank)
+            if rank >= HandRank.FULL_HOUSE:
+                self.flash_payout_row(pay_name)
             else:
-                self.highlight_win(rank)
+                self.highlight_win(pay_name)
         else:
             # Handle Loss
             self.result_label.config(text=rank_display, fg="white")
@@ -568,6 +742,7 @@ class GUI:
             self.profit_lbl.config(text=f"PROFIT: {prefix}${profit}", fg=color)
 
         self.update_graph()
+        self.refresh_risk()
 
         # 6. Cleanup for Next Hand
         self.reset_holds()
@@ -575,6 +750,21 @@ class GUI:
             self.game_state = GameState.DEAL
             self.deal_button.config(text="DEAL", state=tk.NORMAL)
 
+    def update_mistake_display(self):
+        """Refreshes the session EV-lost and accuracy labels from the MistakeAnalyzer."""
+        summary = self.mistakes.summary()
+        self.ev_lost_lbl.config(text=f"EV LOST: ${summary['credits_lost']:.2f}",
+                                fg="white" if summary["mistakes"] == 0 else "#ffaa00")
+        if summary["accuracy"] is None:
+            self.accuracy_lbl.config(text="OPTIMAL HOLDS: -")
+        else:
+            self.accuracy_lbl.config(text=f"OPTIMAL HOLDS: {summary['hands'] - summary['mistakes']}/"
+                                          f"{summary['hands']} ({summary['accuracy'] * 100:.0f}%)")
+
+    def refresh_risk(self):
+        """Updates the risk panel for the current game and the bankroll in (single-line) bets."""
+        self.risk_panel.refresh(self.variant, self.bankroll // max(self.current_bet, 1))
+
     def reset_holds(self):
         """Clears all hold selections and resets card borders to the background color."""
         self.holds = [False] * 5
@@ -583,41 +773,10 @@ class GUI:
             lbl.config(highlightbackground="#0a3d0a")
 
     def update_graph(self):
-        self.ax.clear()
-
-        # Data points
-        data = self.bankroll_history
-        x = range(len(data))
-
-        # Color logic: Green if current bankroll > start (200), Red if below
-        current_color = "#00ff00" if data[-1] >= 200 else "#ff3333"
-
-        # 1. Plot the main line with a "neon" glow effect
-        self.ax.plot(x, data, color=current_color, linewidth=3, zorder=5)
-        self.ax.plot(x, data, color=current_color, linewidth=8, alpha=0.1, zorder=4)  # Outer glow
-
-        # 2. Fill with a gradient effect
-        self.ax.fill_between(x, data, 0, color=current_color, alpha=0.1)
-
-        # 3. Add a "Current Position" marker
-        self.ax.scatter(x[-1], data[-1], color="white", s=50, edgecolors=current_color, zorder=6)
-
-        # 4. Fixed Axis & Baseline
-        current_max = max(max(data), 300)
-        self.ax.set_ylim(0, current_max + 20)
-        self.ax.axhline(200, color='white', linestyle=':', alpha=0.4, label="Break Even")
-
-        # Formatting
-        self.ax.set_title("SESSION VOLATILITY", color='#ffcc00', fontsize=12, fontweight='bold', pad=10)
-        self.ax.set_facecolor('#072b07')
-        self.ax.tick_params(colors='white', labelsize=8)
-        self.ax.grid(True, color='#0a3d0a', alpha=0.3)
-
-        # Remove border box for a "HUD" look
-        for spine in self.ax.spines.values():
-            spine.set_visible(False)
-
-        self.canvas.draw()
+        """Pushes new bankroll_history points to the chart (see BankrollGraph)."""
+        # Before the chart exists there is nothing to draw; _setup_graph syncs the full history
+        if self.graph is not None:
+            self.graph.sync(self.bankroll_history)
 
     def check_game_over(self):
         """Checks if the player has enough money to continue."""
@@ -655,14 +814,15 @@ class GUI:
                 self.card_labels[i].config(highlightbackground="#0a3d0a")
 
     def on_closing(self):
-        """Cleanly shuts down the app and Matplotlib."""
-        plt.close('all')  # This kills the background graph threads
+        """Cleanly shuts down the app and the analysis thread."""
+        self.analysis_worker.shutdown()
+        self.hand_history.close()  # Commits any hands still queued
         self.root.quit()  # This stops the Tkinter mainloop
         self.root.destroy()  # This closes the window
 
-    def flash_payout_row(self, rank, count=0):
-        if rank in self.payout_rows:
-            labels = self.payout_rows[rank]
+    def flash_payout_row(self, pay_name, count=0):
+        if pay_name in self.payout_rows:
+            labels = self.payout_rows[pay_name]
             try:
                 # Check if the first label still exists before trying to config it
                 if not labels[0].winfo_exists(): return
@@ -676,9 +836,9 @@ class GUI:
                     lbl.config(bg=bg_color, fg=fg_color)
 
                 if count < 8:
-                    self.root.after(200, lambda: self.flash_payout_row(rank, count + 1))
+                    self.root.after(200, lambda: self.flash_payout_row(pay_name, count + 1))
                 else:
-                    self.highlight_win(rank)
+                    self.highlight_win(pay_name)
             except tk.TclError:
                 # This catches the error if the widget was destroyed mid-flash
                 pass
@@ -709,6 +869,9 @@ class GUI:
         if hasattr(self, 'profit_lbl'): self.profit_lbl.config(text="PROFIT: $0", fg="#00ff00")
         if hasattr(self, 'best_win_lbl'): self.best_win_lbl.config(text="BEST WIN: $0")
         if hasattr(self, 'history_list'): self.history_list.delete(0, tk.END)
+        self.mistakes.reset()
+        self.update_mistake_display()
 
         self.update_graph()
+        self.refresh_risk()
         self.result_label.config(text="SESSION RESET", fg="white")
\ No newline at end of file
@@ -1,15 +1,40 @@
 from collections import Counter
 from HandRank import HandRank
-from PayoutTable import PAYOUT_TABLE
+from Metrics import METRICS
+from StrategyCache import HOLD_CACHE, STRATEGY_CACHE
+import Canonicalizer
+from DrawEnumerator import DrawEnumerator
+import StrategyDB
+import ExactAnalyzer
+import Variants
+import HandEvaluator
 import itertools
+import logging
 import threading
-from math import comb
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# EVs closer than this are the same play (suit-symmetric holds have identical EVs)
+EV_TOLERANCE = 1e-6
+
+# find_optimal_move modes
+ANALYSIS_MODES = ("exact", "sampled")
+
+
+class AnalysisCancelled(Exception):
+    """Raised inside find_optimal_move when cancel_event is set."""
 
 
 class HandAnalyzer(object):
-    def __init__(self, cards, deck):
+    def __init__(self, cards, deck, variant=None, rng=None):
         self.player_cards = cards
         self.remaining_deck = deck
+        # rng: optional numpy Generator for sampled holds, so simulations can use their own seeded stream
+        self.rng = rng
+        # The game being played (Variants registry); decides what every final hand pays
+        self.variant = variant or Variants.get_variant()
         self.rank = None
         self.primary = None
         self.secondary = None
@@ -19,13 +44,24 @@ class HandAnalyzer(object):
         self.best_move = None
         self.sorted_hand = sorted(cards, key=lambda c: c.get_int_value)
         self.all_move_results = []
-        self.all_possible_holds = self.generate_all_combinations()
+        # mask string ('10010') -> result dict, filled in by _set_results
+        self.results_by_mask = {}
+        with METRICS.timer("analyzer.holds"):
+            self.all_possible_holds = self.generate_all_combinations()
+        # Optional threading.Event; set it from another thread to abandon the analysis
+        self.cancel_event = None
+        # Sampled-mode draw buffers, shared by all 32 holds (get_draw_enumerator)
+        self.draw_enumerator = None
+        self.dead_codes = None
+        # (32, num_categories) final-hand counts per hold (all_possible_holds order), the
+        # paytable-independent result of the analysis; see get_hold_counts() and reprice()
+        self.hold_counts = None
 
     def generate_all_combinations(self):
         """Generates all 32 possible hold combinations using self.player_cards."""
         # Check if the attribute exists and has the expected 5 cards
         if not hasattr(self, 'player_cards') or len(self.player_cards) < 5:
-            print("!!! Error: player_cards not found or incomplete.")
+            logger.error("player_cards not found or incomplete")
             return []
 
         combinations = []
@@ -42,6 +78,14 @@ class HandAnalyzer(object):
         return combinations
 
     def evaluate_hand_fast(self, cards):
+        """Table-driven evaluation (see HandEvaluator). Returns (HandRank, primary)."""
+        return HandEvaluator.evaluate_cards(cards)
+
+    def evaluate_hand_reference(self, cards):
+        """
+        The original Counter-based evaluator. Kept as the reference implementation
+        that HandEvaluator.verify_against_reference() checks against.
+        """
         # 1. Safety Gate: Must have 5 cards to evaluate a rank
         if not cards or len(cards) != 5:
             return HandRank.HIGH_CARD, 0
@@ -115,31 +159,43 @@ class HandAnalyzer(object):
         The main entry point: identifies the current hand and triggers the EV analysis.
         """
         # 1. Identify current hand rank (e.g., Straight, Pair, High Card)
-        self.rank, self.primary = self.evaluate_hand(self.sorted_hand, True)
-        print(f"\n[ Current Hand ]: {self.rank.name}")
+        if self.variant.wild is None:
+            self.rank, self.primary = self.evaluate_hand(self.sorted_hand, True)
+        else:
+            evaluator = self.variant.evaluator
+            self.rank, self.primary, _ = evaluator.category_info(evaluator.category_cards(self.player_cards))
+        logger.info("Current hand: %s", self.rank.name)
 
         # 2. Run the heavy EV strategy analysis
         self.run_heavy_analysis()
 
     def run_heavy_analysis(self):
         """
-        Calculates EV for all 32 combinations and prints the formatted results table.
+        Calculates EV for all 32 combinations and logs the formatted results table (INFO).
         """
-        print("Analyzing strategies... (Running Synchronously)")
+        logger.debug("Analyzing strategies...")
 
         # 1. Execute the EV math for all 32 possible holds
         self.find_optimal_move()
 
         if not hasattr(self, 'all_move_results') or not self.all_move_results:
-            print("!!! Analysis Error: No results were generated.")
+            logger.error("Analysis produced no results")
             return
 
-        # 2. Print Table Header
-        print("\n" + "=" * 95)
-        print(f"{'RANK':<5} | {'EV':<7} | {'FREQ %':<8} | {'LIKELY RESULT':<18} | {'HOLD STRATEGY'}")
-        print("-" * 95)
+        # 2. The table is only built when someone is listening
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Strategy table:\n%s", self.format_results())
+
+    def format_results(self):
+        """The top 5 holds and the strategy summary as text (what run_heavy_analysis logs)."""
+        lines = []
 
-        # 3. Print Top 5 Strategies (Sorted by EV)
+        # 1. Table Header
+        lines.append("=" * 95)
+        lines.append(f"{'RANK':<5} | {'EV':<7} | {'FREQ %':<8} | {'LIKELY RESULT':<18} | {'HOLD STRATEGY'}")
+        lines.append("-" * 95)
+
+        # 2. Top 5 Strategies (Sorted by EV)
         for i, res in enumerate(self.all_move_results[:5]):
             # Use an arrow to highlight the best move
             rank_str = f"--> #{i + 1}" if i == 0 else f"    #{i + 1}"
@@ -154,32 +210,31 @@ class HandAnalyzer(object):
                     card_labels.append(f"{val_display}{c.suit.upper()}")
                 hold_str = "HOLD " + " ".join(card_labels)
 
-            # Fixed: Only ONE print statement here to prevent double-printing lines
-            print(
+            lines.append(
                 f"{rank_str:<5} | {res['ev']:<7.3f} | {res['hit_rate'] * 100:>5.1f}%   | {res['most_likely']:<18} | {hold_str}")
 
-        print("=" * 95)
+        lines.append("=" * 95)
 
-        # 4. Strategy Summary Analysis
+        # 3. Strategy Summary Analysis
         best_ev = self.all_move_results[0]['ev']
         second_best_ev = self.all_move_results[1]['ev'] if len(self.all_move_results) > 1 else 0
         ev_gap = best_ev - second_best_ev
 
-        print("\n--- Strategy Analysis ---")
+        lines.append("--- Strategy Analysis ---")
 
         if best_ev > 1.0:
-            print(
+            lines.append(
                 f"STATUS: High-Value Situation! The {self.all_move_results[0]['most_likely']} is worth {best_ev:.3f} credits.")
 
         # Alert if the choice between #1 and #2 is very close
         if 0 < ev_gap < 0.05:
-            print(f"ADVICE: Close call! Move #1 is only {ev_gap:.3f} better than Move #2.")
+            lines.append(f"ADVICE: Close call! Move #1 is only {ev_gap:.3f} better than Move #2.")
 
         elif best_ev < 0.40:
-            print("STATUS: Defensive Play. No strong draws; follow Strategy #1 to minimize loss.")
+            lines.append("STATUS: Defensive Play. No strong draws; follow Strategy #1 to minimize loss.")
 
-        print(f"OPTIMAL EXPECTED VALUE: {best_ev:.3f}")
-        print("Analysis Complete.\n")
+        lines.append(f"OPTIMAL EXPECTED VALUE: {best_ev:.3f}")
+        return "\n".join(lines)
 
     def get_all_hold_combinations(self):
         self.all_possible_holds = []
@@ -188,73 +243,154 @@ class HandAnalyzer(object):
             held_cards = [self.player_cards[i] for i in range(5) if mask[i] == 1]
             self.all_possible_holds.append({"mask": mask, "cards": held_cards})
 
-    def get_payout(self, hand_rank, rank_value):
-        if hand_rank == HandRank.PAIR:
-            if rank_value >= 11:
-                return PAYOUT_TABLE[HandRank.PAIR]
-            else:
-                return 0
-        return PAYOUT_TABLE.get(hand_rank, 0)
+    def get_payout(self, hand_rank, rank_value, kicker=0):
+        """Per-coin payout of an evaluated hand (kicker only matters for bonus quads)."""
+        return self.variant.payouts()[self.variant.evaluator.category(hand_rank, rank_value, kicker)]
+
+    def category_of(self, cards):
+        """Evaluator category of five Card objects (wild cards count as wild in wild games)."""
+        return self.variant.evaluator.category_cards(cards)
+
+    def payout_of(self, cards):
+        """Per-coin payout of five Card objects under this analyzer's variant."""
+        return self.variant.payouts()[self.category_of(cards)]
 
     def calculate_hold_ev(self, held_cards):
         """
         Calculates the Expected Value (EV) for a specific set of held cards.
         Uses exact math for small draw sizes and sampling for large draw sizes.
+        Returns (ev, hit_rate, Counter of final-hand ranks).
         """
-        import random
-        from collections import Counter
-        from math import comb
-        import itertools
+        counts = self.hold_category_counts(held_cards)
 
-        num_to_draw = 5 - len(held_cards)
-        deck_pool = list(self.remaining_deck)
+        # Final Math Calculations
+        # EV = (Total Payout / Total Samples)
+        payouts = self.get_payout_vector()
+        sample_size = int(counts.sum())
+        ev = float(counts @ payouts) / sample_size
+        hit_rate = int(counts[payouts > 0].sum()) / sample_size
 
-        # 1. Determine total possible combinations for this specific draw
-        total_combinations = comb(len(deck_pool), num_to_draw)
+        ranks = self.variant.evaluator.ranks
+        rank_counts = Counter({ranks(r): int(n) for r, n in enumerate(self.draw_enumerator.rank_counts(counts)) if n})
+        return ev, hit_rate, rank_counts
 
-        # 2. DECISION LOGIC: Exact Math vs. Statistical Sampling
+    def hold_category_counts(self, held_cards):
+        """
+        Final-hand category counts of one hold (a new array), exact for small draw sizes
+        and sampled for large ones. No paytable is involved.
+        """
+        # 1. The same hold with the same kind of discards may have been counted in an
+        # earlier deal (HOLD_CACHE). Only exact counts are cached: a sample depends on
+        # the rng, and serving another deal's sample would make seeded runs depend on
+        # what else the process has analyzed
+        enumerator = self.get_draw_enumerator()
+        held_codes = [c.get_code for c in held_cards]
+        counts = cache_key = None
+        if enumerator.is_exact(5 - len(held_codes)):
+            cache_key = (self.variant.evaluator.key,
+                         Canonicalizer.canonical_hold(held_codes, self.dead_codes.difference(held_codes)))
+            counts = HOLD_CACHE.get(cache_key, self.variant.evaluator.num_categories)
+
+        # 2. Otherwise stream every draw (or a sample) through the DrawEnumerator buffers.
         # If total combinations are 20,000 or less, we calculate EVERYTHING for 100% accuracy.
         # This covers: Holding 4 cards (47 combos), 3 cards (1,081 combos), or 2 cards (16,215 combos).
-        if total_combinations <= 20000:
-            actual_draws = list(itertools.combinations(deck_pool, num_to_draw))
-        else:
-            # For holding 0 or 1 card, there are millions of combos.
-            # 10,000 random samples is the industry standard for high accuracy.
-            sample_limit = 10000
-            actual_draws = [random.sample(deck_pool, num_to_draw) for _ in range(sample_limit)]
-
-        sample_size = len(actual_draws)
-        local_total_payout = 0
-        local_hits = 0
-        local_rank_counts = Counter()
-
-        # 3. Simulation Loop
-        for draw in actual_draws:
-            # Combine held cards with the sampled/calculated draw
-            full_hand = held_cards + list(draw)
-
-            # Evaluate the hand rank and find its payout
-            rank_enum, rank_val = self.evaluate_hand_fast(full_hand)
-            payout = self.get_payout(rank_enum, rank_val)
-
-            if payout > 0:
-                local_hits += 1
-
-            local_rank_counts[rank_enum] += 1
-            local_total_payout += payout
+        # For holding 0 or 1 card, there are millions of combos: 10,000 random samples instead.
+        if counts is None:
+            counts = enumerator.hold_counts(held_codes).copy()
+            if cache_key is not None:
+                HOLD_CACHE.put(cache_key, counts)
+        return counts
+
+    def get_draw_enumerator(self):
+        """
+        The DrawEnumerator every hold of this deal shares (created on first use), with
+        dead_codes: every card of the game's deck that is not in the stub.
+        """
+        if self.draw_enumerator is None:
+            stub_codes = [c.get_code for c in self.remaining_deck]
+            self.draw_enumerator = DrawEnumerator(self.variant.evaluator, rng=self.rng)
+            self.draw_enumerator.set_stub(stub_codes)
+            self.dead_codes = set(range(self.variant.deck_size)).difference(stub_codes)
+        return self.draw_enumerator
+
+    def get_payout_vector(self):
+        """get_payout() for every ExactAnalyzer category, as an array."""
+        return self.variant.payout_array()
+
+    def calculate_all_holds_exact(self):
+        """
+        Exact (EV, rank_counts) for all 32 holds at once, in the same order as
+        all_possible_holds. Enumerates every draw; no sampling.
+        """
+        codes = [c.get_code for c in self.player_cards]
+        engine = ExactAnalyzer.get_engine(self.variant.evaluator)
+        with METRICS.timer("analyzer.draws"):
+            self.hold_counts = engine.hold_counts(codes)
+        return self.summarize_counts(self.hold_counts, engine.rank_matrix)
+
+    def summarize_counts(self, counts, rank_matrix=None):
+        """(EV, Counter of final-hand ranks) per row of a (holds, num_categories) counts array."""
+        evaluator = self.variant.evaluator
+        if rank_matrix is None:
+            rank_matrix = ExactAnalyzer.rank_matrix(evaluator)
+        with METRICS.timer("analyzer.evaluate"):
+            evs = counts @ self.get_payout_vector() / counts.sum(axis=1)
+            rank_totals = counts @ rank_matrix
+
+            results = []
+            for i in range(len(counts)):
+                rank_counts = Counter({evaluator.ranks(r): int(n) for r, n in enumerate(rank_totals[i]) if n})
+                results.append((float(evs[i]), rank_counts))
+        return results
+
+    def get_hold_counts(self):
+        """
+        The (32, num_categories) category counts of this deal's holds. A deal answered
+        from the strategy database or cache has none yet; they are computed here (the
+        exact engine on a full stub, per hold otherwise).
+        """
+        if self.hold_counts is None:
+            if len(self.remaining_deck) == self.variant.deck_size - 5:
+                self.calculate_all_holds_exact()
+            else:
+                self.hold_counts = np.array([self.hold_category_counts(move["cards"])
+                                             for move in self.all_possible_holds])
+        return self.hold_counts
 
-        # 4. Final Math Calculations
-        # EV = (Total Payout / Total Samples)
-        ev = local_total_payout / sample_size if sample_size > 0 else 0
-        hit_rate = local_hits / sample_size if sample_size > 0 else 0
+    def reprice(self, variant):
+        """
+        Re-ranks the analyzed holds under another paytable of the same game (e.g.
+        Variant.with_progressive_royal as the meter moves): EV is linear in the pays, so
+        this is one (32, num_categories) @ (num_categories,) product, with no draws
+        evaluated. The likely-result fields do not depend on the paytable and are kept.
+        Before any analysis there is nothing to re-rank: the variant is only switched,
+        so the next find_optimal_move prices with it.
+        """
+        if variant.evaluator is not self.variant.evaluator:
+            raise ValueError(f"{variant.name} is not played with the same cards as {self.variant.name}")
+        if not self.results_by_mask:
+            self.variant = variant
+            return
+        counts = self.get_hold_counts()
+        evs = counts @ variant.payout_array() / counts.sum(axis=1)
 
-        return ev, hit_rate, local_rank_counts
+        previous = self.results_by_mask
+        self.variant = variant
+        self._set_results([dict(previous[move["mask"]], ev=float(ev))
+                           for move, ev in zip(self.all_possible_holds, evs.tolist())])
 
-    def find_optimal_move(self):
+    def find_optimal_move(self, mode="exact"):
         """
         Analyzes all 32 possible hold combinations and identifies the mathematically
         optimal strategy based on Expected Value (EV).
+
+        mode="exact" enumerates every draw for every hold (deterministic).
+        mode="sampled" uses calculate_hold_ev, which samples holds of 0 or 1 cards.
+        Exact analysis falls back to sampling (with a warning) when the stub is not the
+        rest of a full deck. Any other mode raises ValueError.
         """
+        if mode not in ANALYSIS_MODES:
+            raise ValueError(f"Unknown analysis mode {mode!r}; choose from {', '.join(ANALYSIS_MODES)}")
         results = []
 
         # 1. Safety Gate: Ensure we have combinations to analyze
@@ -262,13 +398,58 @@ class HandAnalyzer(object):
             self.all_possible_holds = self.generate_all_combinations()
 
         if not self.all_possible_holds:
-            print("!!! Critical Error: No hold combinations found.")
+            logger.error("No hold combinations found")
             return
 
+        # The exact engine assumes the stub is the rest of the game's full deck
+        # (47 cards, or 48 with the Joker)
+        use_exact = mode == "exact" and len(self.remaining_deck) == self.variant.deck_size - 5
+        if mode == "exact" and not use_exact:
+            logger.warning("Exact analysis needs the %d-card stub, got %d cards; sampling instead",
+                           self.variant.deck_size - 5, len(self.remaining_deck))
+        METRICS.count("analyzer.exact" if use_exact else "analyzer.sampled")
+
+        # Exact results are shared across suit-isomorphic deals: check the prebuilt
+        # strategy database first, then the in-memory cache
+        if use_exact:
+            start = METRICS.clock()
+            canonical = Canonicalizer.canonicalize_cards(self.player_cards)
+            cache_key = (canonical.cards, self.variant.hash)
+            strategy_db = StrategyDB.get_default()
+            if strategy_db is not None and strategy_db.table_hash != self.variant.hash:
+                strategy_db = None
+            cached = strategy_db.lookup(canonical) if strategy_db is not None else None
+            if strategy_db is not None:
+                METRICS.count("strategy_db.hits" if cached is not None else "strategy_db.misses")
+            if cached is None:
+                cached = STRATEGY_CACHE.get(cache_key)
+            METRICS.add_time("analyzer.lookup", start)
+            if cached is not None:
+                self._set_results([
+                    {
+                        "mask": format(canonical.real_mask(i), '05b'),
+                        "cards": self.all_possible_holds[canonical.real_mask(i)]["cards"],
+                        "ev": ev,
+                        "hit_rate": hit_rate,
+                        "most_likely": ml_name
+                    }
+                    for i, (ev, hit_rate, ml_name) in enumerate(cached)
+                ])
+                return
+
+            self.check_cancelled()
+            hold_stats = self.calculate_all_holds_exact()
+        else:
+            hold_counts = []
+            for move in self.all_possible_holds:
+                self.check_cancelled()
+                hold_counts.append(self.hold_category_counts(move["cards"]))
+            self.hold_counts = np.array(hold_counts)
+            hold_stats = self.summarize_counts(self.hold_counts)
+
         # 2. Loop through every possible way to hold the cards (32 total)
-        for move in self.all_possible_holds:
-            # Run the simulation for this specific hold
-            ev, hit_rate, rank_counts = self.calculate_hold_ev(move["cards"])
+        start = METRICS.clock()
+        for move, (ev, rank_counts) in zip(self.all_possible_holds, hold_stats):
 
             # Calculate total samples to get accurate frequency percentages
             sample_size = sum(rank_counts.values())
@@ -301,17 +482,46 @@ class HandAnalyzer(object):
                 "most_likely": ml_name
             })
 
+        METRICS.add_time("analyzer.summarize", start)
+
+        if use_exact and len(results) == 32:
+            STRATEGY_CACHE.put(cache_key, [
+                (res["ev"], res["hit_rate"], res["most_likely"])
+                for res in (results[canonical.real_mask(i)] for i in range(32))
+            ])
+
         # 3. Final Sorting
+        self._set_results(results)
+
+    def check_cancelled(self):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise AnalysisCancelled()
+
+    def _set_results(self, results):
+        start = METRICS.clock()
         if results:
-            # Sort results by EV descending (Highest EV at Index 0)
-            results.sort(key=lambda x: x["ev"], reverse=True)
+            # Sort results by EV descending (Highest EV at Index 0); equal EVs keep
+            # mask order so cached and freshly computed results pick the same move
+            results.sort(key=lambda x: (-x["ev"], x["mask"]))
+
+            # Rank 1 is the best hold; holds with the same EV share a rank
+            for i, res in enumerate(results):
+                tied = i > 0 and results[i - 1]["ev"] - res["ev"] <= EV_TOLERANCE
+                res["rank"] = results[i - 1]["rank"] if tied else i + 1
 
             self.all_move_results = results
+            self.results_by_mask = {res["mask"]: res for res in results}
             self.best_move = results[0]
             self.best_ev = results[0]["ev"]
         else:
-            print("!!! Error: The analysis loop produced zero results.")
+            logger.error("The analysis loop produced zero results")
             self.all_move_results = []
+            self.results_by_mask = {}
+        METRICS.add_time("analyzer.sort", start)
+
+    def result_for(self, mask):
+        """The result dict for a hold mask ('10010'), or None before the analysis has run."""
+        return self.results_by_mask.get(mask)
 
     # --- HELPER FUNCTIONS (Returning Tuples) ---
     def is_straight(self, cards):
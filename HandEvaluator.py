@@ -0,0 +1,351 @@
+from HandRank import HandRank
+import itertools
+
+# --- CARD ENCODING ---
+# A card "code" is a small integer 0..51: (rank - 2) * 4 + (suit - 1), where rank is
+# Card.get_int_value (2..14) and suit is Card.get_int_suit (s=1, h=2, d=3, c=4).
+#
+# The evaluator works on a packed int per card:
+#   bits 16-28 : one bit per rank (2 = bit 16 ... A = bit 28)
+#   bits 12-15 : one bit per suit
+#   bits 0-7   : a prime per rank, so the product of 5 cards identifies the rank multiset
+RANK_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+CARD_INTS = tuple(
+    (1 << (16 + code // 4)) | (1 << (12 + code % 4)) | RANK_PRIMES[code // 4]
+    for code in range(52)
+)
+
+# --- CATEGORIES ---
+# Paytables are priced per category: rank * PRIMARY_SLOTS + primary. Four of a Kind
+# also has a block keyed by its kicker, because bonus paytables pay on it:
+#   QUAD_BASE + (quad rank - 2) * PRIMARY_SLOTS + kicker
+# The plain FOUR_OF_A_KIND row stands for "kicker unknown" (category(rank, primary)).
+PRIMARY_SLOTS = 16
+QUAD_BASE = len(HandRank) * PRIMARY_SLOTS
+NUM_CATEGORIES = QUAD_BASE + 13 * PRIMARY_SLOTS
+
+
+def category(rank, primary, kicker=0):
+    """Category index of an evaluated hand; kicker only matters for Four of a Kind."""
+    if kicker and rank == HandRank.FOUR_OF_A_KIND:
+        return QUAD_BASE + (primary - 2) * PRIMARY_SLOTS + kicker
+    return int(rank) * PRIMARY_SLOTS + primary
+
+
+def category_info(cat):
+    """Inverse of category(): (HandRank, primary, kicker)."""
+    if cat >= QUAD_BASE:
+        quad, kicker = divmod(cat - QUAD_BASE, PRIMARY_SLOTS)
+        return HandRank.FOUR_OF_A_KIND, quad + 2, kicker
+    return HandRank(cat // PRIMARY_SLOTS), cat % PRIMARY_SLOTS, 0
+
+
+# HandRank of every category, for turning category counts into rank counts
+CATEGORY_RANKS = tuple(category_info(cat)[0] for cat in range(NUM_CATEGORIES))
+
+# Rank bitmasks (bit 0 = Two) for every straight, with the straight's high card
+STRAIGHT_MASKS = {0b1111100000000 >> i: 14 - i for i in range(9)}
+STRAIGHT_MASKS[0b1000000001111] = 5  # Ace-low (Wheel)
+
+
+def _high_rank(rank_mask):
+    return rank_mask.bit_length() + 1
+
+
+def _build_tables():
+    """Builds the lookup tables used by evaluate() and evaluate_category()."""
+    flush_table = [None] * 8192
+    unique_table = [None] * 8192
+
+    # 1. Five distinct ranks: indexed by the OR of the rank bits
+    for ranks in itertools.combinations(range(13), 5):
+        rank_mask = sum(1 << r for r in ranks)
+        high = STRAIGHT_MASKS.get(rank_mask)
+
+        if high is not None:
+            if high == 14:
+                flush_table[rank_mask] = (HandRank.ROYAL_FLUSH, 14)
+            else:
+                flush_table[rank_mask] = (HandRank.STRAIGHT_FLUSH, high)
+            unique_table[rank_mask] = (HandRank.STRAIGHT, high)
+        else:
+            flush_table[rank_mask] = (HandRank.FLUSH, _high_rank(rank_mask))
+            unique_table[rank_mask] = (HandRank.HIGH_CARD, 0)
+
+    # 2. Everything with a repeated rank: indexed by the product of the rank primes
+    product_table = {}
+    for ranks in itertools.combinations_with_replacement(range(13), 5):
+        counts = {r: ranks.count(r) for r in set(ranks)}
+        if len(counts) == 5 or max(counts.values()) > 4:
+            continue
+
+        product = 1
+        for r in ranks:
+            product *= RANK_PRIMES[r]
+
+        shape = sorted(counts.values(), reverse=True)
+        by_count = lambda n: [r + 2 for r, c in counts.items() if c == n]
+
+        if shape[0] == 4:
+            result = (HandRank.FOUR_OF_A_KIND, by_count(4)[0], by_count(1)[0])
+        elif shape == [3, 2]:
+            result = (HandRank.FULL_HOUSE, by_count(3)[0])
+        elif shape[0] == 3:
+            result = (HandRank.THREE_OF_A_KIND, by_count(3)[0])
+        elif shape[:2] == [2, 2]:
+            result = (HandRank.TWO_PAIR, max(by_count(2)))
+        else:
+            result = (HandRank.PAIR, by_count(2)[0])
+
+        product_table[product] = result
+
+    # 3. Category of every entry; Four of a Kind keeps its kicker (the third field)
+    # there, then drops it from the (HandRank, primary) result
+    product_categories = {product: category(*result) for product, result in product_table.items()}
+    product_table = {product: result[:2] for product, result in product_table.items()}
+    flush_categories = [None if r is None else category(*r) for r in flush_table]
+    unique_categories = [None if r is None else category(*r) for r in unique_table]
+
+    return flush_table, unique_table, product_table, flush_categories, unique_categories, product_categories
+
+
+(FLUSH_TABLE, UNIQUE_TABLE, PRODUCT_TABLE,
+ FLUSH_CATEGORIES, UNIQUE_CATEGORIES, PRODUCT_CATEGORIES) = _build_tables()
+
+
+# --- PARTIAL HANDS ---
+# evaluate_category() only reads three folds of the five packed ints: their AND (the
+# shared suit bit), their OR (the rank bits, which hold every straight window) and the
+# product of the rank primes (the rank histogram). A partial hand is kept as that
+# state, built once from the held cards, and each drawn card extends it in O(1):
+#   state = (suits, rank_bits, product)
+EMPTY_STATE = (-1, 0, 1)
+
+
+def partial_state(ints):
+    """State of the packed ints of a partial hand (any number of cards)."""
+    suits, rank_bits, product = EMPTY_STATE
+    for c in ints:
+        suits &= c
+        rank_bits |= c
+        product *= c & 0xFF
+    return suits, rank_bits, product
+
+
+def extend_state(state, c):
+    """The state with one more packed int."""
+    return state[0] & c, state[1] | c, state[2] * (c & 0xFF)
+
+
+def state_category(state):
+    """Category of a complete (five-card) state; same result as evaluate_category()."""
+    suits, rank_bits, product = state
+    rank_bits >>= 16
+
+    if suits & 0xF000:
+        return FLUSH_CATEGORIES[rank_bits]
+
+    cat = UNIQUE_CATEGORIES[rank_bits]
+    if cat is not None:
+        return cat
+
+    return PRODUCT_CATEGORIES[product]
+
+
+def complete_category(state, c):
+    """Category of a four-card state completed by the packed int c (the exact engine's inner loop)."""
+    suits, rank_bits, product = state
+    rank_bits = (rank_bits | c) >> 16
+
+    if suits & c & 0xF000:
+        return FLUSH_CATEGORIES[rank_bits]
+
+    cat = UNIQUE_CATEGORIES[rank_bits]
+    if cat is not None:
+        return cat
+
+    return PRODUCT_CATEGORIES[product * (c & 0xFF)]
+
+
+_batch_tables = None
+
+
+def _get_batch_tables():
+    # numpy copies of the tables for complete_categories(), built on first use
+    global _batch_tables
+    if _batch_tables is None:
+        import numpy as np
+        flush = np.array([0 if cat is None else cat for cat in FLUSH_CATEGORIES], dtype=np.uint16)
+        unique = np.array([NUM_CATEGORIES if cat is None else cat for cat in UNIQUE_CATEGORIES], dtype=np.uint16)
+        products = np.array(sorted(PRODUCT_CATEGORIES), dtype=np.int64)
+        product_cats = np.array([PRODUCT_CATEGORIES[p] for p in products.tolist()], dtype=np.uint16)
+        _batch_tables = flush, unique, products, product_cats
+    return _batch_tables
+
+
+def fold_states(state, drawn):
+    """
+    Extends one partial state by N draws. drawn is a (k, N) int64 array of packed ints,
+    one row per drawn card, so each fold is k whole-row operations. Returns the
+    (suit bits, rank bits, prime product) arrays of the N completed hands.
+    """
+    import numpy as np
+
+    suits = np.bitwise_and.reduce(drawn, axis=0) & state[0]
+    rank_bits = (np.bitwise_or.reduce(drawn, axis=0) | state[1]) >> 16
+    product = np.multiply.reduce(drawn & 0xFF, axis=0) * state[2]
+    return suits & 0xF000, rank_bits, product
+
+
+def complete_categories(state, drawn):
+    """Category of the partial hand state completed by each column of drawn (fold_states), as uint16."""
+    import numpy as np
+
+    flush, unique, products, product_cats = _get_batch_tables()
+    suits, rank_bits, product = fold_states(state, drawn)
+    # Paired hands are the only ones whose rank bits have no unique-table entry
+    cats = unique[rank_bits]
+    paired = np.flatnonzero(cats == NUM_CATEGORIES)
+    if len(paired):
+        cats[paired] = product_cats[np.searchsorted(products, product[paired])]
+    flushes = np.flatnonzero(suits)
+    if len(flushes):
+        cats[flushes] = flush[rank_bits[flushes]]
+    return cats
+
+
+def card_code(card):
+    """Returns the 0..51 code for a Card object."""
+    return card.get_code
+
+
+def encode(card):
+    """Returns the packed evaluator int for a Card object."""
+    return CARD_INTS[card.get_code]
+
+
+def evaluate(c1, c2, c3, c4, c5):
+    """
+    Evaluates five packed card ints and returns (HandRank, primary).
+    Results match HandAnalyzer.evaluate_hand_fast exactly.
+    """
+    rank_bits = (c1 | c2 | c3 | c4 | c5) >> 16
+
+    # 1. Flush: all five cards share the suit bit
+    if c1 & c2 & c3 & c4 & c5 & 0xF000:
+        return FLUSH_TABLE[rank_bits]
+
+    # 2. Five distinct ranks (Straight or High Card)
+    result = UNIQUE_TABLE[rank_bits]
+    if result is not None:
+        return result
+
+    # 3. Paired hands
+    return PRODUCT_TABLE[(c1 & 0xFF) * (c2 & 0xFF) * (c3 & 0xFF) * (c4 & 0xFF) * (c5 & 0xFF)]
+
+
+def evaluate_category(c1, c2, c3, c4, c5):
+    """Like evaluate(), but returns the category index (Four of a Kind with its kicker)."""
+    rank_bits = (c1 | c2 | c3 | c4 | c5) >> 16
+
+    if c1 & c2 & c3 & c4 & c5 & 0xF000:
+        return FLUSH_CATEGORIES[rank_bits]
+
+    cat = UNIQUE_CATEGORIES[rank_bits]
+    if cat is not None:
+        return cat
+
+    return PRODUCT_CATEGORIES[(c1 & 0xFF) * (c2 & 0xFF) * (c3 & 0xFF) * (c4 & 0xFF) * (c5 & 0xFF)]
+
+
+def category_codes(codes):
+    """Category of a sequence of five 0..51 card codes."""
+    c1, c2, c3, c4, c5 = codes
+    return evaluate_category(CARD_INTS[c1], CARD_INTS[c2], CARD_INTS[c3], CARD_INTS[c4], CARD_INTS[c5])
+
+
+def category_cards(cards):
+    """Category of a list of five Card objects."""
+    c1, c2, c3, c4, c5 = [CARD_INTS[c.get_code] for c in cards]
+    return evaluate_category(c1, c2, c3, c4, c5)
+
+
+def evaluate_codes(codes):
+    """Evaluates a sequence of five 0..51 card codes."""
+    c1, c2, c3, c4, c5 = codes
+    return evaluate(CARD_INTS[c1], CARD_INTS[c2], CARD_INTS[c3], CARD_INTS[c4], CARD_INTS[c5])
+
+
+def evaluate_cards(cards):
+    """Evaluates a list of five Card objects."""
+    if not cards or len(cards) != 5:
+        return HandRank.HIGH_CARD, 0
+    c1, c2, c3, c4, c5 = [CARD_INTS[c.get_code] for c in cards]
+    return evaluate(c1, c2, c3, c4, c5)
+
+
+class NaturalEvaluator(object):
+    """
+    The functions above behind the interface a Variant's evaluator provides (see
+    WildEvaluator.WildEvaluator), so the analyzers can run any game the same way.
+    """
+    key = "natural"
+    ranks = HandRank
+    deck_size = 52
+    card_ints = CARD_INTS
+    num_categories = NUM_CATEGORIES
+    category_ranks = CATEGORY_RANKS
+
+    category = staticmethod(category)
+    category_info = staticmethod(category_info)
+    evaluate_category = staticmethod(evaluate_category)
+    category_codes = staticmethod(category_codes)
+    category_cards = staticmethod(category_cards)
+
+    partial_state = staticmethod(partial_state)
+    extend_state = staticmethod(extend_state)
+    state_category = staticmethod(state_category)
+    complete_category = staticmethod(complete_category)
+    complete_categories = staticmethod(complete_categories)
+
+    @staticmethod
+    def evaluate_categories(hands):
+        """Category of every hand in an (N, 5) array of card codes (BatchEvaluator)."""
+        from BatchEvaluator import evaluate_categories
+        return evaluate_categories(hands)
+
+    def __repr__(self):
+        return "NaturalEvaluator()"
+
+
+NATURAL = NaturalEvaluator()
+
+
+def verify_against_reference():
+    """
+    Compares evaluate() with HandAnalyzer.evaluate_hand_reference on all
+    2,598,960 five-card hands. Returns the number of mismatches.
+    """
+    from Deck import Deck
+    from HandAnalyzer import HandAnalyzer
+
+    deck = Deck()
+    deck.cards.sort(key=card_code)
+    by_code = deck.cards
+    reference = HandAnalyzer(by_code[:5], by_code[5:])
+
+    mismatches = 0
+    for hand in itertools.combinations(range(52), 5):
+        expected = reference.evaluate_hand_reference([by_code[c] for c in hand])
+        if evaluate_codes(hand) != expected:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"Mismatch: {[by_code[c] for c in hand]} -> {evaluate_codes(hand)} != {expected}")
+
+    return mismatches
+
+
+if __name__ == '__main__':
+    errors = verify_against_reference()
+    print(f"Checked all 2,598,960 hands: {errors} mismatches")
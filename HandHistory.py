@@ -0,0 +1,226 @@
+import argparse
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# --- SCHEMA ---
+# One row per finished hand. Cards are stored as space-separated names ("as kd 5h 5c 2s")
+# and masks as the 5-character hold strings used everywhere else ("11000"). EVs are per
+# coin, as HandAnalyzer reports them; payout is the credits won and bet the coins wagered.
+# is_optimal is MistakeAnalyzer's verdict (any hold tied with the best EV is optimal), so
+# history accuracy and the sidebar's agree.
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "peeker_history.db")
+
+COLUMNS = ("session_id", "ts", "dealt", "final_hand", "player_mask", "optimal_mask",
+           "player_ev", "optimal_ev", "ev_loss", "is_optimal", "final_rank", "payout", "bet")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hands (
+    id           INTEGER PRIMARY KEY,
+    session_id   TEXT    NOT NULL,
+    ts           REAL    NOT NULL,
+    dealt        TEXT    NOT NULL,
+    final_hand   TEXT    NOT NULL,
+    player_mask  TEXT    NOT NULL,
+    optimal_mask TEXT,
+    player_ev    REAL,
+    optimal_ev   REAL,
+    ev_loss      REAL,
+    is_optimal   INTEGER,
+    final_rank   INTEGER NOT NULL,
+    payout       REAL    NOT NULL,
+    bet          INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS hands_session ON hands (session_id, ts);
+CREATE INDEX IF NOT EXISTS hands_ts ON hands (ts);
+"""
+
+# Databases written before is_optimal existed gain the column, graded from ev_loss with
+# HandAnalyzer.EV_TOLERANCE (repeated here: HandHistory loads with the GUI, before numpy)
+EV_TOLERANCE = 1e-6
+MIGRATIONS = (
+    "ALTER TABLE hands ADD COLUMN is_optimal INTEGER",
+    f"UPDATE hands SET is_optimal = ev_loss <= {EV_TOLERANCE} WHERE ev_loss IS NOT NULL"
+)
+
+INSERT = f"INSERT INTO hands ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+
+def cards_text(cards):
+    """Card objects -> 'as kd 5h 5c 2s'."""
+    return " ".join(f"{c.value}{c.suit}" for c in cards)
+
+
+def _connect(path):
+    conn = sqlite3.connect(path)
+    # WAL lets the GUI read history while the writer thread appends
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class HandHistory(object):
+    """
+    Persistent record of every hand played, in SQLite.
+
+    record() only puts a row on a queue, so it costs the caller microseconds. A
+    background thread drains the queue and writes rows in batches (one transaction
+    per batch of up to batch_size rows, or whatever arrived within flush_interval
+    seconds). Reads use their own connection and see everything already committed.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, session_id=None, batch_size=64, flush_interval=1.0):
+        self.path = path
+        self.session_id = session_id or time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pending = queue.Queue()
+        self.written = 0
+        self.batches = 0
+        self.error = None
+        self._reader = None
+
+        # Create the schema up front so readers never race the writer thread
+        conn = _connect(path)
+        with conn:
+            conn.executescript(SCHEMA)
+            if "is_optimal" not in {row[1] for row in conn.execute("PRAGMA table_info(hands)")}:
+                for sql in MIGRATIONS:
+                    conn.execute(sql)
+        conn.close()
+
+        self.thread = threading.Thread(target=self._write_loop, name="peeker-history", daemon=True)
+        self.thread.start()
+
+    def record(self, dealt, final_hand, player_mask, final_rank, payout, bet,
+               optimal_mask=None, player_ev=None, optimal_ev=None, is_optimal=None):
+        """
+        Queues one finished hand. dealt/final_hand are Card lists, masks are '10110'
+        strings. The EV fields are None when no analysis was available for the hand;
+        is_optimal is the MistakeAnalyzer assessment's (graded from the EVs if omitted).
+        """
+        ev_loss = None
+        if player_ev is not None and optimal_ev is not None:
+            if is_optimal is None:
+                is_optimal = optimal_ev - player_ev <= EV_TOLERANCE
+            ev_loss = 0.0 if is_optimal else max(optimal_ev - player_ev, 0.0)
+        if is_optimal is not None:
+            is_optimal = int(is_optimal)
+
+        # Cards are immutable singletons: snapshot the lists now, format them on the writer thread
+        self.pending.put((self.session_id, time.time(), tuple(dealt), tuple(final_hand),
+                          player_mask, optimal_mask, player_ev, optimal_ev, ev_loss, is_optimal,
+                          int(final_rank), float(payout), int(bet)))
+
+    def _write_loop(self):
+        conn = _connect(self.path)
+        closing = False
+        while not closing:
+            # 1. Block for the first row, then take whatever else is already waiting
+            try:
+                batch = [self.pending.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+
+            # 2. A None row is the close() sentinel
+            rows = [row[:2] + (cards_text(row[2]), cards_text(row[3])) + row[4:] for row in batch if row is not None]
+            closing = len(rows) != len(batch)
+
+            # 3. One transaction per batch
+            if rows:
+                try:
+                    with conn:
+                        conn.executemany(INSERT, rows)
+                    self.written += len(rows)
+                    self.batches += 1
+                except sqlite3.Error as e:
+                    self.error = e
+                    logger.error("Hand history write failed (%d hands lost): %s", len(rows), e)
+
+            for _ in batch:
+                self.pending.task_done()
+        conn.close()
+
+    def flush(self):
+        """Blocks until every queued hand has been committed."""
+        self.pending.join()
+
+    def close(self):
+        """Writes anything still queued and stops the writer thread."""
+        if self.thread.is_alive():
+            self.pending.put(None)
+            self.thread.join()
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    # --- QUERIES ---
+
+    def _query(self, sql, params=()):
+        if self._reader is None:
+            self._reader = _connect(self.path)
+        return self._reader.execute(sql, params).fetchall()
+
+    def recent(self, limit=20, session_id=None):
+        """The last `limit` hands (newest first) as dicts, optionally for one session."""
+        where = "WHERE session_id = ?" if session_id else ""
+        params = (session_id, limit) if session_id else (limit,)
+        rows = self._query(f"SELECT {', '.join(COLUMNS)} FROM hands {where} ORDER BY ts DESC LIMIT ?", params)
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def session_summary(self, session_id=None):
+        """Hand count, accuracy, EV lost and net result for a session (default: this one)."""
+        row = self._query("""
+            SELECT COUNT(*),
+                   SUM(is_optimal),
+                   COUNT(is_optimal),
+                   COALESCE(SUM(ev_loss), 0),
+                   COALESCE(SUM(payout - bet), 0),
+                   MIN(ts), MAX(ts)
+            FROM hands WHERE session_id = ?""", (session_id or self.session_id,))[0]
+        hands, correct, analyzed, ev_lost, net, first, last = row
+        return {
+            "hands": hands,
+            "analyzed": analyzed,
+            "accuracy": (correct or 0) / analyzed if analyzed else None,
+            "ev_lost": ev_lost,
+            "net": net,
+            "started": first,
+            "ended": last
+        }
+
+    def sessions(self, limit=10):
+        """The most recent session ids, newest first."""
+        rows = self._query("SELECT session_id, MAX(ts) AS last FROM hands GROUP BY session_id "
+                           "ORDER BY last DESC LIMIT ?", (limit,))
+        return [session_id for session_id, _ in rows]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Summaries of recorded play")
+    parser.add_argument("--db", default=DEFAULT_PATH)
+    parser.add_argument("--sessions", type=int, default=10, help="how many recent sessions to list")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        parser.error(f"no hand history at {args.db}")
+
+    history = HandHistory(args.db)
+    print(f"{'SESSION':<24} | {'HANDS':>6} | {'ACCURACY':>8} | {'EV LOST':>8} | {'NET':>8}")
+    print("-" * 66)
+    for session in history.sessions(args.sessions):
+        s = history.session_summary(session)
+        accuracy = f"{s['accuracy'] * 100:7.1f}%" if s["accuracy"] is not None else f"{'-':>8}"
+        print(f"{session:<24} | {s['hands']:>6} | {accuracy} | {s['ev_lost']:8.3f} | {s['net']:+8.1f}")
+    history.close()
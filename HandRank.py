@@ -10,4 +10,21 @@ class HandRank(IntEnum):
     FULL_HOUSE = 6
     FOUR_OF_A_KIND = 7
     STRAIGHT_FLUSH = 8
-    ROYAL_FLUSH = 9
\ No newline at end of file
+    ROYAL_FLUSH = 9
+
+
+class WildRank(IntEnum):
+    """Hand ranks of the wild-card games (WildEvaluator), lowest to highest."""
+    HIGH_CARD = 0
+    PAIR = 1
+    TWO_PAIR = 2
+    THREE_OF_A_KIND = 3
+    STRAIGHT = 4
+    FLUSH = 5
+    FULL_HOUSE = 6
+    FOUR_OF_A_KIND = 7
+    STRAIGHT_FLUSH = 8
+    FIVE_OF_A_KIND = 9
+    WILD_ROYAL_FLUSH = 10
+    FOUR_DEUCES = 11
+    ROYAL_FLUSH = 12
@@ -0,0 +1,261 @@
+"""
+Paytable-independent hold analysis: category counts per hold, priced by matrix products.
+
+A hold's EV is linear in the paytable, EV = counts @ payouts / draws, so the analysis
+keeps the counts and prices them last. Counts are reduced to the game's pay basis: the
+evaluator categories merged as far as every registered paytable of that game allows
+(one column per hand rank and pay category, so the low pairs and the Jacks or Better
+pair stay apart, and so do the bonus quads). For every canonical starting hand the
+(32, basis) counts are kept in peeker_counts_<evaluator>_<basis hash>.npy, and
+re-pricing the whole strategy table is one matrix multiply:
+
+    python HoldTensor.py build --variant jacks_or_better
+    python HoldTensor.py reprice --variant jacks_or_better --royal 4000
+"""
+import argparse
+import hashlib
+import logging
+import os
+import time
+from math import comb
+
+import numpy as np
+
+import ExactAnalyzer
+import HandEvaluator
+import Metrics
+import StrategyDB
+import Variants
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Canonical hands per float64 block in reprice() (about 60 MB of converted counts)
+REPRICE_CHUNK = 16384
+
+# evaluator key -> PayBasis
+_bases = {}
+
+
+def get_evaluator(key):
+    """Evaluator by key ('natural', 'deuces', 'joker'), for worker processes."""
+    if key == HandEvaluator.NATURAL.key:
+        return HandEvaluator.NATURAL
+    import WildEvaluator
+    return WildEvaluator.get_evaluator(key)
+
+
+class PayBasis(object):
+    """
+    The coarsest grouping of an evaluator's categories that every registered variant
+    of the game prices consistently: two categories share a column when they have the
+    same hand rank and fall in the same pay category under every paytable.
+
+    columns : category -> column, as an intp array
+    ranks   : hand rank value of each column
+    labels  : column names, for reports
+    matrix  : (num_categories, width) indicator; counts @ matrix sums categories per column
+    """
+
+    def __init__(self, evaluator, variants):
+        self.evaluator = evaluator
+        rules = [v.rule for v in variants]
+
+        signatures = []
+        for cat in range(evaluator.num_categories):
+            info = evaluator.category_info(cat)
+            signatures.append((int(info[0]), tuple(rule(*info) for rule in rules)))
+        # Columns in hand rank order (the non-paying reading first)
+        distinct = sorted(set(signatures), key=lambda sig: (sig[0], [name or "" for name in sig[1]]))
+        index = {sig: i for i, sig in enumerate(distinct)}
+
+        self.columns = np.array([index[sig] for sig in signatures], dtype=np.intp)
+        self.ranks = np.array([rank for rank, _ in distinct], dtype=np.intp)
+        self.labels = tuple(self._label(evaluator.ranks(rank), names) for rank, names in distinct)
+        self.width = len(distinct)
+        self.matrix = np.zeros((evaluator.num_categories, self.width), dtype=np.int64)
+        self.matrix[np.arange(evaluator.num_categories), self.columns] = 1
+        self.hash = hashlib.sha1(repr((evaluator.key, self.labels)).encode()).hexdigest()[:16]
+
+    @staticmethod
+    def _label(rank, names):
+        label = Variants.rank_name(rank)
+        extra = [name for name in dict.fromkeys(names) if name is not None and name != label]
+        return f"{label} ({' / '.join(extra)})" if extra else label
+
+    def project(self, counts):
+        """Category counts (..., num_categories) -> basis counts (..., width)."""
+        return counts @ self.matrix
+
+    def payouts(self, variant, coins=None):
+        """What each column pays per coin in variant (same game), as a float64 array."""
+        if variant.evaluator is not self.evaluator:
+            raise ValueError(f"{variant.name} is not played with the {self.evaluator.key} evaluator")
+        pays = np.zeros(self.width)
+        pays[self.columns] = variant.payout_array(coins)
+        return pays
+
+    def __repr__(self):
+        return f"PayBasis({self.evaluator.key!r}, {self.width} columns)"
+
+
+def get_basis(evaluator):
+    """The PayBasis of a game's evaluator, over every registered variant played with it."""
+    if evaluator.key not in _bases:
+        variants = [v for v in Variants.VARIANTS.values() if (v.wild or HandEvaluator.NATURAL.key) == evaluator.key]
+        _bases[evaluator.key] = PayBasis(evaluator, variants)
+    return _bases[evaluator.key]
+
+
+def hold_draws(deck_size):
+    """Number of draws of each of the 32 hold masks from a full stub, as float64."""
+    stub = deck_size - 5
+    return np.array([comb(stub, 5 - bin(mask).count("1")) for mask in range(32)], dtype=np.float64)
+
+
+def tensor_dtype(basis):
+    return np.dtype([
+        ("key", "<u4"),                       # packed canonical cards (StrategyDB.pack_key)
+        ("size", "<u4"),                      # deals the canonical hand stands for
+        ("counts", "<f4", (32, basis.width))  # basis counts per canonical hold mask (exact in float32)
+    ])
+
+
+def _tensor_rows(keys, sizes, evaluator_key):
+    evaluator = get_evaluator(evaluator_key)
+    engine = ExactAnalyzer.get_engine(evaluator)
+    basis = get_basis(evaluator)
+    rows = np.zeros(len(keys), dtype=tensor_dtype(basis))
+    rows["key"] = keys
+    rows["size"] = sizes
+    for i, key in enumerate(keys.tolist()):
+        rows["counts"][i] = basis.project(engine.hold_counts(StrategyDB.unpack_key(key)))
+    return rows
+
+
+def build(evaluator, workers=1, chunk_size=2000):
+    """
+    Basis counts of all 32 holds of every canonical starting hand (about a minute on one
+    core, like StrategyDB.build). Returns a structured array in key order.
+    """
+    start = time.time()
+    keys, sizes = StrategyDB.enumerate_canonical_hands(evaluator.deck_size)
+    logger.info("Building hold tensor for %s: %d canonical hands", evaluator.key, len(keys))
+
+    chunks = [(keys[i:i + chunk_size], sizes[i:i + chunk_size], evaluator.key)
+              for i in range(0, len(keys), chunk_size)]
+    if workers > 1:
+        from multiprocessing import Pool
+        with Pool(workers) as pool:
+            parts = pool.starmap(_tensor_rows, chunks)
+    else:
+        parts = []
+        for n, chunk in enumerate(chunks):
+            parts.append(_tensor_rows(*chunk))
+            logger.info("Progress: %d/%d | %.0fs", min((n + 1) * chunk_size, len(keys)), len(keys), time.time() - start)
+
+    rows = np.concatenate(parts)
+    logger.info("Hold tensor ready in %.0fs", time.time() - start)
+    return rows
+
+
+def cache_path(evaluator):
+    return os.path.join(CACHE_DIR, f"peeker_counts_{evaluator.key}_{get_basis(evaluator).hash}.npy")
+
+
+def get_tensor(evaluator, workers=1, build_missing=True):
+    """
+    The hold tensor of a game's evaluator, memory-mapped from its cache file (built and
+    saved on first use). The basis hash is in the file name, so registering a paytable
+    with new pay categories starts a new file. With build_missing=False a missing file
+    returns None.
+    """
+    path = cache_path(evaluator)
+    if not os.path.exists(path):
+        if not build_missing:
+            return None
+        tmp_path = path + ".tmp.npy"
+        np.save(tmp_path, build(evaluator, workers=workers))
+        os.replace(tmp_path, path)
+    return np.load(path, mmap_mode="r")
+
+
+def reprice(tensor, variant, coins=None, chunk_size=REPRICE_CHUNK):
+    """
+    EV of every hold of every canonical hand under variant's paytable: a
+    (hands * 32, width) @ (width,) product, taken chunk_size hands at a time in float64
+    (the EVs and best holds of HandAnalyzer and StrategyDB). Returns (evs (hands, 32),
+    best mask per hand).
+    """
+    basis = get_basis(variant.evaluator)
+    pays = basis.payouts(variant, coins)
+    draws = hold_draws(variant.deck_size)
+    counts = tensor["counts"]
+    evs = np.empty((len(counts), 32))
+    for start in range(0, len(counts), chunk_size):
+        chunk = counts[start:start + chunk_size].astype(np.float64)
+        np.divide(chunk @ pays, draws, out=evs[start:start + chunk_size])
+    return evs, evs.argmax(axis=1)
+
+
+def expected_return(tensor, evs):
+    """Return of perfect play over all deals: best EV of each canonical hand, weighted by its deals."""
+    sizes = tensor["size"].astype(np.float64)
+    return float(sizes @ evs.max(axis=1) / sizes.sum())
+
+
+def check_against_db(tensor, variant, masks):
+    """
+    Compares reprice()'s best holds with the strategy database's for every canonical
+    hand, when a database for variant exists; exits on any difference.
+    """
+    try:
+        strategy_db = StrategyDB.StrategyDB(StrategyDB.DEFAULT_PATH, variant)
+    except StrategyDB.StaleDatabaseError as e:
+        logger.info("No strategy database to check against: %s", e)
+        return
+    records = strategy_db.records
+    if not np.array_equal(records["key"], tensor["key"]):
+        raise SystemExit(f"{strategy_db.path} and the hold tensor cover different hands")
+    differ = np.flatnonzero(records["best"] != masks)
+    if len(differ):
+        raise SystemExit(f"Best hold differs from the strategy database for {len(differ):,} hands, "
+                         f"e.g. {StrategyDB.unpack_key(int(tensor['key'][differ[0]]))}")
+    print(f"Best holds match the strategy database for all {len(masks):,} canonical hands")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Paytable-independent hold counts and whole-table re-pricing")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, text in (("build", "compute and save the hold tensor for a game"),
+                       ("reprice", "price every canonical hand under a paytable (building the tensor if needed)")):
+        cmd = sub.add_parser(name, help=text)
+        cmd.add_argument("--variant", default=Variants.DEFAULT_VARIANT,
+                         help=f"game: {', '.join(Variants.VARIANTS)}")
+        cmd.add_argument("--workers", type=int, default=1, help="processes for the build")
+    sub.choices["reprice"].add_argument("--royal", type=float, default=None,
+                                        help="progressive meter: what a max-bet Royal Flush pays, in credits")
+    args = parser.parse_args()
+    Metrics.setup_logging("INFO")
+
+    base = Variants.get_variant(args.variant)
+    tensor = get_tensor(base.evaluator, workers=args.workers)
+    if args.command == "reprice":
+        variants = [base] + ([base.with_progressive_royal(args.royal)] if args.royal is not None else [])
+        base_evs = None
+        for variant in variants:
+            start = time.perf_counter()
+            evs, masks = reprice(tensor, variant)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{variant.name:<40} return {expected_return(tensor, evs) * 100:.4f}%  ({elapsed:.0f} ms)")
+            if base_evs is None:
+                base_evs = evs
+                check_against_db(tensor, variant, masks)
+                continue
+            # A hand changes strategy when its new best hold was worse under the base paytable
+            chosen = base_evs[np.arange(len(masks)), masks]
+            changed = chosen < base_evs.max(axis=1) - 1e-5
+            share = tensor["size"][changed].sum() / tensor["size"].sum()
+            print(f"Best hold changes for {changed.sum():,} of {len(masks):,} canonical hands "
+                  f"({share * 100:.2f}% of deals)")
@@ -0,0 +1,232 @@
+"""
+Process-wide metrics: per-phase timers, counters and cache hit rates.
+
+Hot paths record into the shared METRICS registry:
+
+    with METRICS.timer("analyzer.sort"):
+        ...
+    METRICS.count("analyzer.evaluations", len(draws))
+
+A timer costs two perf_counter_ns() calls and a dict update, so it is left on;
+METRICS.enabled = False turns every call into an early return. Caches register a
+stats() callable and are read only when a snapshot is taken.
+
+capture() measures one block of work, optionally under cProfile:
+
+    with capture(profile=True) as cap:
+        analyzer.find_optimal_move()
+    print(cap.report())
+
+Diagnostics go through the logging module (one logger per module); nothing is
+shown unless setup_logging() or the application configures a handler.
+"""
+import io
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+
+def setup_logging(level="WARNING"):
+    """Sends every module's log records at level and above to stderr (entry points call this)."""
+    logging.basicConfig(level=getattr(logging, str(level).upper(), level), format=LOG_FORMAT)
+
+
+class _Timer(object):
+    """Context manager returned by MetricsRegistry.timer()."""
+    __slots__ = ("registry", "name", "start")
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.add_time(self.name, self.start)
+        return False
+
+
+class _NullTimer(object):
+    """What timer() returns while the registry is disabled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry(object):
+    """
+    Named timers (calls, total and max nanoseconds), counters and registered caches.
+
+    For the hottest loops, clock() + add_time() avoid the timer object:
+
+        start = METRICS.clock()
+        ...
+        METRICS.add_time("exact.enumerate", start)
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.timers = {}
+        self.counters = {}
+        self.caches = {}
+        self._lock = threading.Lock()
+
+    def clock(self):
+        return time.perf_counter_ns() if self.enabled else 0
+
+    def add_time(self, name, start_ns):
+        """Records one call of timer name that started at start_ns (from clock())."""
+        if not self.enabled:
+            return
+        elapsed = time.perf_counter_ns() - start_ns
+        with self._lock:
+            entry = self.timers.get(name)
+            if entry is None:
+                self.timers[name] = [1, elapsed, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+                if elapsed > entry[2]:
+                    entry[2] = elapsed
+
+    def timer(self, name):
+        """Context manager timing its block as one call of name."""
+        return _Timer(self, name) if self.enabled else _NULL_TIMER
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def register_cache(self, name, stats):
+        """stats() must return a dict with at least 'hits' and 'misses'."""
+        self.caches[name] = stats
+
+    def reset(self):
+        """Clears timers and counters (registered caches keep their own statistics)."""
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+
+    def snapshot(self):
+        """Plain-dict copy of everything: timers in ms/us, counters, and each cache's stats()."""
+        with self._lock:
+            timers = {name: list(entry) for name, entry in self.timers.items()}
+            counters = dict(self.counters)
+        return {
+            "timers": {
+                name: {
+                    "calls": calls,
+                    "total_ms": total / 1e6,
+                    "mean_us": total / calls / 1e3,
+                    "max_us": longest / 1e3
+                }
+                for name, (calls, total, longest) in sorted(timers.items())
+            },
+            "counters": dict(sorted(counters.items())),
+            "caches": {name: stats() for name, stats in sorted(self.caches.items())}
+        }
+
+    def report(self, snapshot=None):
+        """The snapshot as aligned text lines."""
+        snapshot = snapshot or self.snapshot()
+        lines = [f"{'TIMER':<28} {'CALLS':>9} {'TOTAL ms':>11} {'MEAN us':>10} {'MAX us':>10}"]
+        for name, t in snapshot["timers"].items():
+            lines.append(f"{name:<28} {t['calls']:>9} {t['total_ms']:>11.1f} {t['mean_us']:>10.1f} {t['max_us']:>10.1f}")
+        for name, value in snapshot["counters"].items():
+            lines.append(f"{name:<28} {value:>9}")
+        for name, stats in snapshot["caches"].items():
+            lookups = stats["hits"] + stats["misses"]
+            rate = stats["hits"] / lookups if lookups else 0.0
+            lines.append(f"{name:<28} {lookups:>9} lookups, {rate * 100:.1f}% hits")
+        return "\n".join(lines)
+
+
+# Shared by every module in the process
+METRICS = MetricsRegistry()
+
+
+def _difference(after, before):
+    """Timers and counters accumulated between two snapshots."""
+    timers = {}
+    for name, t in after["timers"].items():
+        old = before["timers"].get(name, {"calls": 0, "total_ms": 0.0})
+        calls = t["calls"] - old["calls"]
+        if calls:
+            total = t["total_ms"] - old["total_ms"]
+            # The max is not decomposable; the block's max is at most the running max
+            timers[name] = {"calls": calls, "total_ms": total, "mean_us": total * 1e3 / calls, "max_us": t["max_us"]}
+    counters = {name: value - before["counters"].get(name, 0) for name, value in after["counters"].items()
+                if value != before["counters"].get(name, 0)}
+    caches = {}
+    for name, stats in after["caches"].items():
+        old = before["caches"].get(name, {})
+        caches[name] = dict(stats, hits=stats["hits"] - old.get("hits", 0), misses=stats["misses"] - old.get("misses", 0))
+    return {"timers": timers, "counters": counters, "caches": caches}
+
+
+class Capture(object):
+    """Result of a capture() block: wall time, the metrics it added and (optionally) a profile."""
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.elapsed_ns = 0
+        self.metrics = None
+        self.profile = None
+
+    @property
+    def elapsed_ms(self):
+        return self.elapsed_ns / 1e6
+
+    def profile_stats(self, sort="cumulative", limit=15):
+        """The cProfile listing as text (empty without profile=True)."""
+        if self.profile is None:
+            return ""
+        import pstats
+        out = io.StringIO()
+        pstats.Stats(self.profile, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def report(self):
+        text = f"Captured {self.elapsed_ms:.2f} ms\n" + self.registry.report(self.metrics)
+        if self.profile is not None:
+            text += "\n" + self.profile_stats()
+        return text
+
+
+@contextmanager
+def capture(profile=False, registry=METRICS):
+    """
+    Measures the block: Capture.metrics holds only what it recorded, and profile=True
+    also runs it under cProfile. Other threads recording at the same time are counted too.
+    """
+    cap = Capture(registry)
+    before = registry.snapshot()
+    profiler = None
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+    start = time.perf_counter_ns()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield cap
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        cap.elapsed_ns = time.perf_counter_ns() - start
+        cap.profile = profiler
+        cap.metrics = _difference(registry.snapshot(), before)
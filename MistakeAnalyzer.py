@@ -0,0 +1,67 @@
+class MistakeAnalyzer(object):
+    """
+    Scores the player's holds against a finished HandAnalyzer, one session at a time.
+
+    Each assessment is two dict lookups (the player's hold and the best hold), so
+    the running totals are cheap enough to refresh in the sidebar after every hand.
+    EVs are per coin, like HandAnalyzer's; credits_lost scales the cost by the bet.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.hands = 0
+        self.mistakes = 0
+        self.ev_lost = 0.0
+        self.credits_lost = 0.0
+        self.worst = None
+
+    def assess(self, analyzer, player_mask, bet=1):
+        """
+        Grades one hold. Returns None if the analyzer has no results yet; otherwise a dict
+        with both EVs, the EV cost, the hold's rank among the 32 holds (1 = best, ties
+        share a rank) and whether it was an optimal play.
+        """
+        result = analyzer.result_for(player_mask)
+        best = analyzer.best_move
+        if result is None or best is None:
+            return None
+
+        # 1. Cost of this hold against the best one (equal-EV holds cost nothing)
+        is_optimal = result["rank"] == 1
+        ev_cost = 0.0 if is_optimal else max(best["ev"] - result["ev"], 0.0)
+
+        assessment = {
+            "player_mask": player_mask,
+            "optimal_mask": best["mask"],
+            "player_ev": result["ev"],
+            "optimal_ev": best["ev"],
+            "ev_cost": ev_cost,
+            "credits_lost": ev_cost * bet,
+            "rank": result["rank"],
+            "holds": len(analyzer.all_move_results),
+            "is_optimal": is_optimal
+        }
+
+        # 2. Session totals
+        self.hands += 1
+        if not is_optimal:
+            self.mistakes += 1
+            self.ev_lost += ev_cost
+            self.credits_lost += ev_cost * bet
+            if self.worst is None or ev_cost > self.worst["ev_cost"]:
+                self.worst = assessment
+        return assessment
+
+    def summary(self):
+        """Session totals: hands graded, mistakes, accuracy and EV lost (total and per hand)."""
+        return {
+            "hands": self.hands,
+            "mistakes": self.mistakes,
+            "accuracy": (self.hands - self.mistakes) / self.hands if self.hands else None,
+            "ev_lost": self.ev_lost,
+            "credits_lost": self.credits_lost,
+            "ev_lost_per_hand": self.ev_lost / self.hands if self.hands else 0.0,
+            "worst": self.worst
+        }
@@ -0,0 +1,116 @@
+from collections import Counter
+
+import Card
+
+# numpy is imported where it is used, so the GUI can read PLAY_SIZES without loading it
+
+# Lines per deal the simulator and GUI offer, with their floor names
+PLAY_SIZES = {1: "Single Play", 3: "Triple Play", 5: "Five Play", 10: "Ten Play", 100: "Hundred Play"}
+
+# evaluator key -> category_ranks as a uint8 array, for ranking whole batches of lines
+_rank_arrays = {}
+
+
+def _category_ranks(evaluator):
+    if evaluator.key not in _rank_arrays:
+        import numpy as np
+        _rank_arrays[evaluator.key] = np.asarray(evaluator.category_ranks, dtype=np.uint8)
+    return _rank_arrays[evaluator.key]
+
+
+def draw_completions(dealt_codes, mask, stub_codes, num_lines, rng=None):
+    """
+    Final hands of num_lines independent draws to the same hold: every line keeps the
+    held cards (mask bit 4 - j holds dealt_codes[j]) in place and fills the other
+    positions from its own full copy of stub_codes.
+
+    All lines are drawn in one batched operation: each line gets a random key per stub
+    card and takes the stub cards with the smallest keys, which is a uniform draw
+    without replacement. Returns a (num_lines, 5) uint8 array of card codes.
+    """
+    import numpy as np
+
+    rng = rng if rng is not None else np.random.default_rng()
+    held = [j for j in range(5) if mask & (1 << (4 - j))]
+    drawn = [j for j in range(5) if not mask & (1 << (4 - j))]
+
+    hands = np.empty((num_lines, 5), dtype=np.uint8)
+    hands[:, held] = [dealt_codes[j] for j in held]
+    if drawn:
+        stub = np.asarray(stub_codes, dtype=np.uint8)
+        keys = rng.random((num_lines, len(stub)))
+        picks = np.argpartition(keys, len(drawn) - 1, axis=1)[:, :len(drawn)]
+        hands[:, drawn] = stub[picks]
+    return hands
+
+
+class MultiHandResult(object):
+    """
+    Outcome of one multi-hand deal: per-line arrays plus the aggregate.
+
+    hands      : (lines, 5) final card codes, in dealt positions
+    categories : evaluator category of each line
+    ranks      : HandRank / WildRank value of each line
+    payouts    : credits each line won at bet (per line)
+    """
+
+    def __init__(self, variant, hands, categories, bet=1):
+        self.variant = variant
+        self.hands = hands
+        self.categories = categories
+        self.bet = bet
+        self.ranks = _category_ranks(variant.evaluator)[categories]
+        self.payouts = variant.payout_array(bet)[categories] * bet
+
+    def __len__(self):
+        return len(self.hands)
+
+    @property
+    def total_bet(self):
+        return self.bet * len(self.hands)
+
+    @property
+    def total_payout(self):
+        return float(self.payouts.sum())
+
+    @property
+    def net(self):
+        return self.total_payout - self.total_bet
+
+    @property
+    def winning_lines(self):
+        return int((self.payouts > 0).sum())
+
+    def lines(self):
+        """Per-line results as dicts (Card objects and pay-category names), for display."""
+        ranks_type = self.variant.evaluator.ranks
+        return [
+            {
+                "line": i + 1,
+                "cards": [Card.from_code(c) for c in hand],
+                "rank": ranks_type(rank),
+                "pay_name": self.variant.pay_category(cat),
+                "payout": payout
+            }
+            for i, (hand, cat, rank, payout) in enumerate(zip(
+                self.hands.tolist(), self.categories.tolist(), self.ranks.tolist(), self.payouts.tolist()))
+        ]
+
+    def summary(self):
+        """Aggregate: {pay category: (lines, credits)} in paytable order, for the paying lines only."""
+        totals = {}
+        for cat, count in Counter(self.categories.tolist()).items():
+            name = self.variant.pay_category(cat)
+            if name is not None:
+                lines, credits = totals.get(name, (0, 0))
+                totals[name] = (lines + count, credits + self.variant.payouts(self.bet)[cat] * self.bet * count)
+        return {name: totals[name] for name in self.variant.pays if name in totals}
+
+
+def play_lines(variant, dealt_codes, mask, stub_codes, num_lines, bet=1, rng=None):
+    """
+    Draws num_lines completions of one hold (draw_completions) and scores them all with
+    the variant's batch evaluator. Returns a MultiHandResult.
+    """
+    hands = draw_completions(dealt_codes, mask, stub_codes, num_lines, rng)
+    return MultiHandResult(variant, hands, variant.evaluator.evaluate_categories(hands), bet)
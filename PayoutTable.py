@@ -11,4 +11,15 @@ PAYOUT_TABLE = {
     HandRank.TWO_PAIR: 2,
     HandRank.PAIR: 1,       # Note: Logic must check if self.primary >= 11
     HandRank.HIGH_CARD: 0
-}
\ No newline at end of file
+}
+
+
+def payout_for(hand_rank, rank_value, table=PAYOUT_TABLE):
+    """Payout for an evaluated hand; a Pair only pays for Jacks or Better."""
+    if hand_rank == HandRank.PAIR:
+        if rank_value >= 11:
+            return table[HandRank.PAIR]
+        else:
+            return 0
+    return table.get(hand_rank, 0)
+
@@ -0,0 +1,162 @@
+import json
+import os
+
+import numpy as np
+
+# --- CHUNK LAYOUT ---
+# A results directory holds manifest.json plus one .npy file per column per chunk
+# ("rank.00003.npy"). Every chunk except the last has exactly chunk_size rows. The
+# manifest's metadata names the variant played and the rank enum of the rank column.
+FIELDS = (
+    ("seed", "<u8"),        # session seed (0 when the session was unseeded)
+    ("hand_index", "<u8"),  # position of the hand in the session
+    ("hand", "<u4"),        # dealt cards in deal order, packed 6 bits per code (StrategyDB.pack_key)
+    ("hold", "u1"),         # hold mask as an int: bit (4 - i) holds dealt card i
+    ("rank", "u1"),         # final rank: HandRank, or WildRank in wild-card games (metadata["ranks"])
+    ("payout", "<f4"),      # credits returned for the hand
+    ("bankroll", "<f8")     # bankroll after the hand
+)
+COLUMNS = tuple(name for name, _ in FIELDS)
+MANIFEST = "manifest.json"
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def chunk_path(directory, column, index):
+    return os.path.join(directory, f"{column}.{index:05d}.npy")
+
+
+def variant_metadata(variant):
+    """Sink metadata for a Variants.Variant: its key and the enum its final ranks use."""
+    return {"variant": variant.key, "ranks": "WildRank" if variant.wild else "HandRank"}
+
+
+class ColumnarSink(object):
+    """
+    Streams per-hand simulation results to disk in fixed-size columnar chunks.
+
+    Rows go into preallocated column buffers; each time chunk_size rows have
+    accumulated, the buffers are written out as .npy files and reused, so memory
+    stays constant however many hands are recorded. The manifest is rewritten after
+    every chunk, so a run that dies part way still leaves a readable directory.
+    """
+
+    def __init__(self, directory, chunk_size=DEFAULT_CHUNK_SIZE, metadata=None):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        # Written to the manifest as is, e.g. variant_metadata(variant)
+        self.metadata = metadata or {}
+        self.buffers = {name: np.empty(chunk_size, dtype=dtype) for name, dtype in FIELDS}
+        self.fill = 0
+        self.chunks = []
+        self.rows = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def append(self, seed, hand_index, hand, hold, rank, payout, bankroll):
+        """Records one hand."""
+        i = self.fill
+        b = self.buffers
+        b["seed"][i] = seed
+        b["hand_index"][i] = hand_index
+        b["hand"][i] = hand
+        b["hold"][i] = hold
+        b["rank"][i] = rank
+        b["payout"][i] = payout
+        b["bankroll"][i] = bankroll
+        self.fill += 1
+        if self.fill == self.chunk_size:
+            self._write_chunk()
+
+    def extend(self, **columns):
+        """Records many hands at once; every column in COLUMNS must be given, all the same length."""
+        n = len(columns["rank"])
+        start = 0
+        while start < n:
+            take = min(self.chunk_size - self.fill, n - start)
+            for name in COLUMNS:
+                self.buffers[name][self.fill:self.fill + take] = columns[name][start:start + take]
+            self.fill += take
+            start += take
+            if self.fill == self.chunk_size:
+                self._write_chunk()
+
+    def _write_chunk(self):
+        if self.fill == 0:
+            return
+        index = len(self.chunks)
+        for name in COLUMNS:
+            np.save(chunk_path(self.directory, name, index), self.buffers[name][:self.fill])
+        self.chunks.append(self.fill)
+        self.rows += self.fill
+        self.fill = 0
+        self._write_manifest()
+
+    def _write_manifest(self):
+        manifest = {
+            "fields": [[name, dtype] for name, dtype in FIELDS],
+            "chunk_size": self.chunk_size,
+            "chunks": self.chunks,
+            "rows": self.rows,
+            "metadata": self.metadata
+        }
+        # Write-then-rename so a reader never sees a half-written manifest
+        tmp = os.path.join(self.directory, MANIFEST + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, os.path.join(self.directory, MANIFEST))
+
+    def close(self):
+        """Writes the final partial chunk."""
+        self._write_chunk()
+        if not self.chunks:
+            self._write_manifest()
+
+
+class ColumnarReader(object):
+    """Reads a ColumnarSink directory back, one chunk at a time or memory-mapped."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        self.columns = tuple(name for name, _ in self.manifest["fields"])
+        self.metadata = self.manifest.get("metadata", {})
+
+    def __len__(self):
+        return self.manifest["rows"]
+
+    def rank_enum(self):
+        """The enum the rank column holds (HandRank or WildRank), or None if not recorded."""
+        name = self.metadata.get("ranks")
+        if name is None:
+            return None
+        import HandRank
+        return getattr(HandRank, name)
+
+    def chunk(self, index, columns=None, mmap=True):
+        """One chunk as {column: array}. With mmap, arrays are read-only views of the files."""
+        mode = "r" if mmap else None
+        return {name: np.load(chunk_path(self.directory, name, index), mmap_mode=mode)
+                for name in (columns or self.columns)}
+
+    def iter_chunks(self, columns=None, mmap=True):
+        """Yields every chunk in order; memory use is bounded by one chunk."""
+        for index in range(len(self.manifest["chunks"])):
+            yield self.chunk(index, columns, mmap)
+
+    def column(self, name):
+        """A whole column concatenated into one in-memory array."""
+        parts = [chunk[name] for chunk in self.iter_chunks([name])]
+        if not parts:
+            return np.empty(0, dtype=dict(self.manifest["fields"])[name])
+        return np.concatenate(parts)
+
+    def to_dataframe(self, columns=None):
+        """All rows as a pandas DataFrame (pandas is only needed for this)."""
+        import pandas as pd
+        return pd.DataFrame({name: self.column(name) for name in (columns or self.columns)})
@@ -0,0 +1,320 @@
+"""
+Exact variance and risk-of-ruin analytics for perfect play.
+
+The per-hand payout distribution is built from the exact engine: every canonical
+starting hand contributes the final-hand category distribution of its best hold,
+weighted by how many deals it stands for. Everything else is derived from that PMF
+without simulation:
+
+    python RiskAnalyzer.py --variant deuces_wild --bankroll 800 --hands 10000
+
+Amounts are in bets (one hand at max coins), so the PMF lives on an integer grid.
+"""
+import argparse
+import logging
+import os
+import time
+
+import numpy as np
+
+import ExactAnalyzer
+import Metrics
+import StrategyDB
+import Variants
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Probability mass dropped from each tail of a convolved PMF (keeps long horizons small)
+TAIL_TOLERANCE = 1e-14
+
+# Quantiles report() shows for the bankroll after the horizon
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# variant hash -> PayoutDistribution
+_distributions = {}
+
+
+def cache_path(variant):
+    return os.path.join(CACHE_DIR, f"peeker_risk_{variant.hash}.npy")
+
+
+def _category_probabilities(keys, sizes, variant_key):
+    """Sum over the given starting hands of class size x the best hold's category probabilities."""
+    variant = Variants.get_variant(variant_key)
+    engine = ExactAnalyzer.get_engine(variant.evaluator)
+    payouts = variant.payout_array()
+    total = np.zeros(engine.num_categories)
+    for key, size in zip(keys.tolist(), sizes.tolist()):
+        counts = engine.hold_counts(StrategyDB.unpack_key(key))
+        totals = counts.sum(axis=1)
+        best = int((counts @ payouts / totals).argmax())
+        total += counts[best] * (size / totals[best])
+    return total
+
+
+def build_category_probabilities(variant, workers=1, chunk_size=2000):
+    """
+    Probability of each final-hand category under perfect play, over every deal of the
+    variant's deck. Runs the exact analysis on all canonical starting hands (about a
+    minute on one core), like StrategyDB.build.
+    """
+    start = time.time()
+    keys, sizes = StrategyDB.enumerate_canonical_hands(variant.deck_size)
+    logger.info("Building payout distribution for %s: %d canonical hands", variant.name, len(keys))
+
+    chunks = [(keys[i:i + chunk_size], sizes[i:i + chunk_size], variant.key)
+              for i in range(0, len(keys), chunk_size)]
+    if workers > 1:
+        from multiprocessing import Pool
+        with Pool(workers) as pool:
+            parts = pool.starmap(_category_probabilities, chunks)
+    else:
+        parts = []
+        for n, chunk in enumerate(chunks):
+            parts.append(_category_probabilities(*chunk))
+            logger.info("Progress: %d/%d | %.0fs", min((n + 1) * chunk_size, len(keys)), len(keys), time.time() - start)
+
+    probs = np.sum(parts, axis=0) / sizes.sum()
+    logger.info("Payout distribution ready in %.0fs", time.time() - start)
+    return probs
+
+
+def _next_pow2(n):
+    return 1 << (n - 1).bit_length()
+
+
+def _trim(pmf, offset):
+    """Drops the outer tails holding less than TAIL_TOLERANCE each. Returns (pmf, offset)."""
+    cdf = np.cumsum(pmf)
+    lo = int(np.searchsorted(cdf, TAIL_TOLERANCE))
+    hi = int(np.searchsorted(cdf, cdf[-1] - TAIL_TOLERANCE)) + 1
+    return pmf[lo:hi], offset + lo
+
+
+def _convolve(a, b):
+    """Linear convolution of two PMFs through the real FFT."""
+    n = len(a) + len(b) - 1
+    size = _next_pow2(n)
+    out = np.fft.irfft(np.fft.rfft(a, size) * np.fft.rfft(b, size), size)[:n]
+    return np.clip(out, 0.0, None)
+
+
+def pmf_power(pmf, k):
+    """
+    PMF of the sum of k independent draws from pmf (index = value), by FFT convolution
+    and binary exponentiation. Returns (pmf, offset): pmf[i] is P(sum == offset + i).
+    Tails under TAIL_TOLERANCE are trimmed after every step, so the work grows with the
+    spread of the sum (~sqrt(k)) rather than its range (k x the top payout).
+    """
+    result, result_offset = np.ones(1), 0
+    base, base_offset = np.asarray(pmf, dtype=np.float64), 0
+    while k:
+        if k & 1:
+            result, result_offset = _trim(_convolve(result, base), result_offset + base_offset)
+        k >>= 1
+        if k:
+            base, base_offset = _trim(_convolve(base, base), 2 * base_offset)
+    return result / result.sum(), result_offset
+
+
+class PayoutDistribution(object):
+    """
+    The per-hand payout PMF of perfect play and the statistics derived from it.
+
+    pmf[x] is the probability that one hand returns x bets (the stake is not returned
+    separately, so the net result of a hand is x - 1).
+    """
+
+    def __init__(self, variant, category_probs):
+        self.variant = variant
+        self.category_probs = np.asarray(category_probs, dtype=np.float64)
+
+        # 1. Collapse the categories onto the integer payout grid
+        payouts = variant.payout_array()
+        if not np.all(payouts == np.round(payouts)):
+            raise ValueError(f"{variant.name} has fractional payouts; the PMF needs whole bets")
+        self.pmf = np.bincount(payouts.astype(np.int64), weights=self.category_probs)
+        self.values = np.arange(len(self.pmf))
+
+        # 2. Moments of one hand
+        self.mean = float(self.values @ self.pmf)
+        self.variance = float((self.values - self.mean) ** 2 @ self.pmf)
+
+    @property
+    def expected_return(self):
+        return self.mean
+
+    @property
+    def sd(self):
+        """Standard deviation of one hand, in bets."""
+        return self.variance ** 0.5
+
+    @property
+    def n0(self):
+        """
+        Hands until the expected result equals one standard deviation of the results
+        (variance / edge^2): past N0 the edge, not luck, dominates a session.
+        """
+        edge = self.mean - 1
+        return self.variance / edge ** 2 if edge else float("inf")
+
+    def outcomes(self):
+        """[(pay category, probability, share of the return)] in paytable order, plus the losses."""
+        names = self.variant.pays
+        probs = dict.fromkeys(names, 0.0)
+        lose = 0.0
+        for cat, p in enumerate(self.category_probs.tolist()):
+            name = self.variant.pay_category(cat)
+            if name is None:
+                lose += p
+            else:
+                probs[name] += p
+        rows = [(name, probs[name], probs[name] * self.variant.pay_per_coin(name) / self.mean) for name in names]
+        rows.append(("Nothing", lose, 0.0))
+        return rows
+
+    def result_distribution(self, hands):
+        """
+        Net result (in bets) of hands independent hands: (values, probs). Uses pmf_power,
+        so long horizons cost milliseconds instead of a simulation.
+        """
+        pmf, offset = pmf_power(self.pmf, hands)
+        return np.arange(len(pmf)) + offset - hands, pmf
+
+    def bankroll_distribution(self, bankroll, hands):
+        """
+        Bankroll (in bets) after hands hands from bankroll, playing through any losing
+        streak (no ruin barrier). Returns (values, probs).
+        """
+        values, probs = self.result_distribution(hands)
+        return values + bankroll, probs
+
+    def bankroll_quantiles(self, bankroll, hands, quantiles=QUANTILES):
+        values, probs = self.bankroll_distribution(bankroll, hands)
+        cdf = np.cumsum(probs)
+        return {q: int(values[min(int(np.searchsorted(cdf, q)), len(values) - 1)]) for q in quantiles}
+
+    def ruin_root(self):
+        """
+        Probability of ever losing a bankroll of one bet. A hand loses at most one bet, so
+        the walk cannot skip past zero and the long-run ruin probability from B bets is
+        exactly ruin_root() ** B; it is 1 for games returning 100% or less.
+        """
+        if self.mean <= 1:
+            return 1.0
+        # Smallest root in (0, 1) of sum(pmf[x] * r ** x) = r, by bisection
+        lo, hi = 0.0, 1.0
+        for _ in range(200):
+            mid = (lo + hi) / 2
+            if np.polyval(self.pmf[::-1], mid) > mid:
+                lo = mid
+            else:
+                hi = mid
+        return hi
+
+    def risk_of_ruin(self, bankroll, hands=None, headroom=None):
+        """
+        Probability of being unable to place a bet (bankroll < 1) starting from bankroll bets.
+
+        hands=None is the long-run risk (ruin_root() ** bankroll). Otherwise the bankroll
+        PMF is stepped hand by hand with an absorbing barrier at zero: each step is the
+        convolution of the bankroll vector with the few payout values, done as shifted
+        adds. Bankrolls above bankroll + headroom are held at that cap, which can only
+        overstate the risk; the default headroom is 10 SDs of the horizon's results.
+        """
+        bankroll = int(bankroll)
+        if bankroll < 1:
+            return 1.0
+        if hands is None:
+            return self.ruin_root() ** bankroll
+
+        if headroom is None:
+            headroom = int(10 * self.sd * hands ** 0.5) + len(self.pmf)
+        cap = bankroll + headroom
+        state = np.zeros(cap + 1)
+        state[bankroll] = 1.0
+        steps = [(int(x) - 1, float(p)) for x, p in zip(self.values, self.pmf) if p > 0]
+
+        ruined = 0.0
+        for _ in range(hands):
+            new = np.zeros(cap + 1)
+            for shift, p in steps:
+                if shift < 0:
+                    new[:-1] += p * state[1:]
+                elif shift == 0:
+                    new += p * state
+                else:
+                    new[shift:] += p * state[:-shift]
+                    new[cap] += p * state[-shift:].sum()
+            ruined += new[0]
+            new[0] = 0.0
+            state = new
+        return ruined
+
+    def report(self, bankroll, hands):
+        """Prints the variance and risk summary for a bankroll (in bets) and horizon."""
+        print("\n" + "=" * 50)
+        print(f"{'RISK ANALYSIS: ' + self.variant.name.upper():^50}")
+        print("=" * 50)
+        print(f"Expected Return: {self.mean * 100:.4f}%")
+        print(f"Variance:        {self.variance:.2f}")
+        print(f"SD per Hand:     {self.sd:.3f} bets")
+        print(f"N0:              {self.n0:,.0f} hands")
+
+        print("\n--- Payouts ---")
+        for name, p, share in self.outcomes():
+            print(f"{name:<24} {p:>11.8f}  1 in {1 / p if p else float('inf'):>9,.1f}  {share * 100:5.2f}% of return")
+
+        print(f"\n--- Bankroll of {bankroll} bets over {hands:,} hands ---")
+        print(f"Risk of Ruin:    {self.risk_of_ruin(bankroll, hands) * 100:.2f}%")
+        print(f"Long-Run Ruin:   {self.risk_of_ruin(bankroll) * 100:.2f}%")
+        quantiles = self.bankroll_quantiles(bankroll, hands)
+        print("Final Bankroll:  " + "  ".join(f"{int(q * 100)}%: {v}" for q, v in quantiles.items()))
+        print("=" * 50 + "\n")
+
+
+def get_distribution(variant=None, workers=1, use_cache=True, build=True):
+    """
+    The PayoutDistribution for variant (default: Jacks or Better). The category
+    probabilities are cached in memory and in peeker_risk_<hash>.npy, keyed by the
+    paytable hash like the strategy database, so the exact pass runs once per paytable.
+    With build=False a missing cache returns None instead of running that pass.
+    """
+    variant = variant or Variants.get_variant()
+    if variant.hash in _distributions:
+        return _distributions[variant.hash]
+
+    path = cache_path(variant)
+    probs = None
+    if use_cache and os.path.exists(path):
+        try:
+            probs = np.load(path)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable risk cache %s: %s", path, e)
+        else:
+            if probs.shape != (variant.evaluator.num_categories,):
+                probs = None
+    if probs is None:
+        if not build:
+            return None
+        probs = build_category_probabilities(variant, workers=workers)
+        if use_cache:
+            np.save(path, probs)
+
+    _distributions[variant.hash] = PayoutDistribution(variant, probs)
+    return _distributions[variant.hash]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Exact variance and risk of ruin for perfect play")
+    parser.add_argument("--variant", default=Variants.DEFAULT_VARIANT,
+                        help=f"game to analyze: {', '.join(Variants.VARIANTS)}")
+    parser.add_argument("--bankroll", type=int, default=200, help="starting bankroll in bets (default: 200)")
+    parser.add_argument("--hands", type=int, default=1000, help="horizon in hands (default: 1000)")
+    parser.add_argument("--workers", type=int, default=1, help="processes for the first, uncached build")
+    args = parser.parse_args()
+    Metrics.setup_logging("INFO")
+
+    get_distribution(Variants.get_variant(args.variant), workers=args.workers).report(args.bankroll, args.hands)
@@ -0,0 +1,96 @@
+import queue
+import threading
+import tkinter as tk
+
+# Horizon the panel's risk of ruin covers, in hands
+HORIZON = 1000
+
+
+class RiskPanel(object):
+    """
+    Sidebar box with the exact variance and risk of ruin of the current game
+    (RiskAnalyzer). The numbers are worked out on a daemon thread and delivered through
+    a queue that the Tk loop polls, like AnalysisWorker; numpy and the exact engine are
+    only imported there. A paytable whose payout distribution has not been built yet
+    shows a BUILD button instead, since that pass takes a minute or two.
+    """
+
+    def __init__(self, parent, root, poll_ms=100):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.results = queue.Queue()
+        self.running = False
+        self.pending = None
+        # (variant, bankroll) of the last request whose distribution is not built yet
+        self.unbuilt = None
+
+        self.frame = tk.Frame(parent, bg="#051c05", highlightthickness=1, highlightbackground="#555",
+                              padx=10, pady=10)
+        tk.Label(self.frame, text="GAME RISK (MAX BET)", font=("Arial", 10, "bold"),
+                 bg="#051c05", fg="#ffcc00").pack(anchor="w")
+
+        self.labels = {}
+        for key, text in (("return", "RETURN: -"), ("sd", "SD/HAND: -"), ("n0", "N0: -"),
+                          ("ruin", f"RUIN IN {HORIZON:,} HANDS: -")):
+            self.labels[key] = tk.Label(self.frame, text=text, font=("Arial", 9), bg="#051c05", fg="white")
+            self.labels[key].pack(anchor="w", pady=2)
+
+        self.build_button = tk.Button(self.frame, text="BUILD", command=self._build,
+                                      font=("Arial", 9, "bold"), bg="#444", fg="white")
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def refresh(self, variant, bankroll_bets):
+        """Recomputes the figures for variant and a bankroll in bets (latest request wins)."""
+        self.pending = (variant, int(bankroll_bets), False)
+        self._start()
+
+    def _build(self):
+        if self.unbuilt is None:
+            return
+        self.pending = self.unbuilt + (True,)
+        self.unbuilt = None
+        self.build_button.pack_forget()
+        self.labels["return"].config(text="RETURN: building...")
+        self._start()
+
+    def _start(self):
+        if self.running or self.pending is None:
+            return
+        self.running = True
+        job, self.pending = self.pending, None
+        threading.Thread(target=self._run, args=job, daemon=True, name="peeker-risk").start()
+        self.root.after(self.poll_ms, self._poll)
+
+    def _run(self, variant, bankroll_bets, build):
+        import RiskAnalyzer
+
+        distribution = RiskAnalyzer.get_distribution(variant, build=build)
+        ruin = distribution.risk_of_ruin(bankroll_bets, HORIZON) if distribution is not None else None
+        self.results.put((variant, bankroll_bets, distribution, ruin))
+
+    def _poll(self):
+        try:
+            variant, bankroll_bets, distribution, ruin = self.results.get_nowait()
+        except queue.Empty:
+            self.root.after(self.poll_ms, self._poll)
+            return
+
+        self.running = False
+        if distribution is None:
+            # Remember the request so BUILD knows what to compute
+            self.unbuilt = (variant, bankroll_bets)
+            self.labels["return"].config(text="RETURN: not built")
+            self.labels["sd"].config(text="SD/HAND: -")
+            self.labels["n0"].config(text="N0: -")
+            self.labels["ruin"].config(text=f"RUIN IN {HORIZON:,} HANDS: -")
+            self.build_button.pack(anchor="w", pady=2)
+        else:
+            self.build_button.pack_forget()
+            self.labels["return"].config(text=f"RETURN: {distribution.mean * 100:.3f}%")
+            self.labels["sd"].config(text=f"SD/HAND: {distribution.sd:.2f} BETS")
+            self.labels["n0"].config(text=f"N0: {distribution.n0:,.0f} HANDS")
+            self.labels["ruin"].config(text=f"RUIN IN {HORIZON:,} HANDS: {ruin * 100:.1f}% "
+                                            f"({bankroll_bets} BETS)")
+        self._start()
@@ -0,0 +1,111 @@
+"""
+Headless perfect-play simulations: python SimulationCLI.py --hands 5000 --workers 4
+
+This entry point never imports tkinter, matplotlib or PIL, so it starts quickly and
+runs on machines without a display. Benchmark.py's startup benchmark checks that.
+"""
+import argparse
+
+import numpy as np
+
+import Metrics
+import Variants
+from Deck import Deck, FastDeck
+from HandAnalyzer import ANALYSIS_MODES
+from MultiHand import PLAY_SIZES
+from ResultsSink import DEFAULT_CHUNK_SIZE, ColumnarSink, variant_metadata
+from VideoPokerSim import VideoPokerSim
+
+DECKS = {
+    "fast": FastDeck,
+    "classic": Deck
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Peeker perfect-play simulator (no GUI)")
+    parser.add_argument("--hands", type=int, default=500, help="number of hands to play (default: 500)")
+    parser.add_argument("--bankroll", type=float, default=200.0, help="starting bankroll (default: 200)")
+    parser.add_argument("--bet", type=float, default=1.0, help="bet per hand, per line in multi-hand play (default: 1)")
+    parser.add_argument("--lines", type=int, default=1, choices=sorted(PLAY_SIZES),
+                        help="lines per deal for multi-hand play; --hands then counts deals (default: 1)")
+    parser.add_argument("--analysis", default="exact", choices=ANALYSIS_MODES,
+                        help="hold analysis: exact, or per-hold draws with 0- and 1-card holds sampled "
+                             "from the seeded stream (default: exact)")
+    parser.add_argument("--variant", default=Variants.DEFAULT_VARIANT,
+                        help=f"game to play: {', '.join(Variants.VARIANTS)}")
+    parser.add_argument("--deck", default="fast", help=f"deck implementation: {', '.join(DECKS)} (default: fast)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes to use; more than 1 runs the seeded parallel session (default: 1)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed for a reproducible session (results do not depend on --workers); "
+                             "multi-worker runs without one draw a fresh seed and print it")
+    parser.add_argument("--block-size", type=int, default=250, help="hands per seeded block (default: 250)")
+    parser.add_argument("--quiet", action="store_true", help="no progress lines, only the final report")
+    parser.add_argument("--out", default=None,
+                        help="directory to stream per-hand results to as columnar .npy chunks (see ResultsSink)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per results chunk")
+    parser.add_argument("--log-level", default="INFO",
+                        help="diagnostics to show: DEBUG, INFO, WARNING or ERROR (default: INFO)")
+    parser.add_argument("--metrics", action="store_true",
+                        help="print phase timers, counters and cache hit rates at the end "
+                             "(work done in this process; --workers > 1 plays in child processes)")
+    parser.add_argument("--risk", action="store_true",
+                        help="instead of simulating, print the exact variance and risk of ruin for "
+                             "--bankroll / --bet over --hands hands (see RiskAnalyzer)")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.deck not in DECKS:
+        parser.error(f"unknown deck: {args.deck}")
+    if args.variant not in Variants.VARIANTS:
+        parser.error(f"unknown variant: {args.variant}")
+    if args.hands <= 0 or args.workers <= 0 or args.block_size <= 0:
+        parser.error("--hands, --workers and --block-size must be positive")
+    Metrics.setup_logging(args.log_level)
+
+    # The exact analytics need no simulation at all (numpy loads only here)
+    if args.risk:
+        import RiskAnalyzer
+        if args.lines > 1:
+            print("Risk figures are for single-line play")
+        distribution = RiskAnalyzer.get_distribution(Variants.get_variant(args.variant), workers=args.workers)
+        distribution.report(int(args.bankroll // args.bet), args.hands)
+        return distribution
+
+    # Streamed runs keep per-hand data on disk only, so memory stays flat for long studies
+    variant = Variants.get_variant(args.variant)
+    sink = (ColumnarSink(args.out, chunk_size=args.chunk_size, metadata=variant_metadata(variant))
+            if args.out else None)
+    sim = VideoPokerSim(DECKS[args.deck], initial_bankroll=args.bankroll, bet_amount=args.bet,
+                        keep_payouts=sink is None, variant=variant, lines=args.lines,
+                        analysis=args.analysis)
+
+    try:
+        # 1. Seeded or multi-process runs go through the deterministic block scheduler
+        if args.workers > 1 or args.seed is not None:
+            seed = args.seed
+            if seed is None:
+                # Fresh entropy, cut to the sink's 64-bit seed column; printed so the run can be repeated
+                seed = np.random.SeedSequence().entropy % (1 << 63)
+                print(f"Seed: {seed} (rerun with --seed {seed})")
+            sim.run_parallel(num_hands=args.hands, workers=args.workers, seed=seed,
+                             block_size=args.block_size, sink=sink, silent=args.quiet)
+        # 2. Otherwise play one in-process session with progress output
+        else:
+            sim.run_session(num_hands=args.hands, silent=args.quiet, sink=sink)
+    finally:
+        if sink is not None:
+            sink.close()
+            print(f"Wrote {sink.rows} hands in {len(sink.chunks)} chunks to {args.out}")
+    if args.metrics:
+        print(Metrics.METRICS.report())
+    return sim
+
+
+if __name__ == '__main__':
+    main()
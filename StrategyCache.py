@@ -0,0 +1,170 @@
+import threading
+from collections import OrderedDict
+
+from Metrics import METRICS
+
+
+class StrategyCache(object):
+    """
+    Bounded LRU cache of full 32-hold analysis results.
+
+    Keys are (canonical hand, paytable hash), so a deal that is a suit relabelling
+    of an earlier one is served without re-running the analysis. Values are stored
+    in canonical hold order; HandAnalyzer maps them back onto the real cards.
+    """
+
+    def __init__(self, maxsize=50000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def resize(self, maxsize):
+        """Changes the capacity, evicting the least recently used entries if needed."""
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate
+        }
+
+
+class HoldCache(object):
+    """
+    Bounded LRU cache of single-hold draw outcomes, the level below StrategyCache.
+
+    Keys are (evaluator key, Canonicalizer.canonical_hold(held, discards)), so a hold
+    that recurs in another deal (a lone high pair, a four-card royal with the same
+    kind of discards) is served without enumerating its draws. Values are the hold's
+    category counts (DrawEnumerator.hold_counts), which do not depend on the paytable.
+
+    A hold's key is about as specific as the deal itself, so reuse grows with the
+    session: entries are kept sparse (a hold reaches ~40 of several hundred categories,
+    packed as category << 32 | count) to fit a few hundred thousand of them. The
+    capacity is in bytes: each entry costs its packed array plus ENTRY_OVERHEAD.
+    """
+    # Approximate bytes of key, array header and dict slot per entry
+    ENTRY_OVERHEAD = 300
+
+    def __init__(self, maxbytes=64 << 20):
+        self.maxbytes = maxbytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, num_categories):
+        """The hold's counts as a dense int64 array of num_categories, or None."""
+        import numpy as np
+
+        with self._lock:
+            packed = self._entries.get(key)
+            if packed is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        counts = np.zeros(num_categories, dtype=np.int64)
+        counts[packed >> 32] = packed & 0xFFFFFFFF
+        return counts
+
+    def put(self, key, counts):
+        """Stores the nonzero entries of counts (a copy, so the caller may reuse its array)."""
+        import numpy as np
+
+        categories = np.flatnonzero(counts)
+        value = (categories.astype(np.int64) << 32) | counts[categories]
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old.nbytes + self.ENTRY_OVERHEAD
+            self._entries[key] = value
+            self.bytes += value.nbytes + self.ENTRY_OVERHEAD
+            self._evict()
+
+    def _evict(self):
+        while self.bytes > self.maxbytes and self._entries:
+            _, value = self._entries.popitem(last=False)
+            self.bytes -= value.nbytes + self.ENTRY_OVERHEAD
+            self.evictions += 1
+
+    def resize(self, maxbytes):
+        """Changes the capacity in bytes, evicting the least recently used entries if needed."""
+        with self._lock:
+            self.maxbytes = maxbytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            "size": len(self._entries),
+            "bytes": self.bytes,
+            "maxbytes": self.maxbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate
+        }
+
+
+# Shared by every HandAnalyzer in the process (GUI and VideoPokerSim alike)
+STRATEGY_CACHE = StrategyCache()
+METRICS.register_cache("strategy_cache", STRATEGY_CACHE.stats)
+HOLD_CACHE = HoldCache()
+METRICS.register_cache("hold_cache", HOLD_CACHE.stats)
@@ -0,0 +1,208 @@
+import argparse
+import logging
+import os
+import struct
+import time
+
+import numpy as np
+
+import Canonicalizer
+import ExactAnalyzer
+import Metrics
+import Variants
+
+logger = logging.getLogger(__name__)
+
+# --- FILE LAYOUT ---
+# 32-byte header, then one fixed-size record per suit-canonical starting hand,
+# sorted by key so a lookup is a binary search over a memory-mapped array.
+# EVs are float64, exactly what a fresh analysis computes, so the best hold and its
+# EV do not depend on whether the database exists. Hit rates are only displayed (to
+# 0.1%), so float32 keeps the record at 424 bytes.
+MAGIC = b"PEEKRSDB"
+VERSION = 3
+HEADER = struct.Struct("<8sI16sI")
+
+RECORD_DTYPE = np.dtype([
+    ("key", "<u4"),          # packed canonical cards, see pack_key()
+    ("best", "u1"),          # canonical hold mask with the highest EV
+    ("likely", "u1", 32),    # most likely rank (HandRank or WildRank) per canonical hold mask
+    ("pad", "u1", 3),
+    ("ev", "<f8", 32),       # EV per canonical hold mask
+    ("hit_rate", "<f4", 32)  # frequency of the most likely rank per hold
+])
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "peeker_strategy.db")
+
+
+class StaleDatabaseError(ValueError):
+    """Raised when a strategy file is missing, corrupt, or built for another paytable."""
+
+
+def pack_key(codes):
+    """Packs five sorted card codes into one int; numeric order == tuple order."""
+    c0, c1, c2, c3, c4 = codes
+    return (c0 << 24) | (c1 << 18) | (c2 << 12) | (c3 << 6) | c4
+
+
+def unpack_key(key):
+    return tuple((key >> shift) & 0x3F for shift in (24, 18, 12, 6, 0))
+
+
+def canonical_keys(hands):
+    """Vectorized Canonicalizer.canonicalize() over sorted (N, 5) hands -> packed keys (Joker allowed)."""
+    keys = None
+    codes = np.arange(Canonicalizer.SUITLESS_CODE + 1)
+    suited = codes < Canonicalizer.SUITLESS_CODE
+    for perm in Canonicalizer.SUIT_PERMUTATIONS:
+        relabel = np.where(suited, codes - codes % 4 + np.array(perm)[codes % 4], codes).astype(np.uint8)
+        mapped = np.sort(relabel[hands], axis=1).astype(np.uint32)
+        packed = (mapped[:, 0] << 24) | (mapped[:, 1] << 18) | (mapped[:, 2] << 12) | (mapped[:, 3] << 6) | mapped[:, 4]
+        keys = packed if keys is None else np.minimum(keys, packed)
+    return keys
+
+
+def enumerate_canonical_hands(deck_size=52):
+    """
+    Returns (keys, class_sizes) for all 134,459 suit-canonical starting hands (more with
+    the Joker, deck_size=53). class_sizes[i] is how many of the 2,598,960 deals map to keys[i].
+    """
+    return np.unique(canonical_keys(ExactAnalyzer.all_hands(deck_size)), return_counts=True)
+
+
+def _build_records(keys, variant_key):
+    variant = Variants.get_variant(variant_key)
+    engine = ExactAnalyzer.get_engine(variant.evaluator)
+    payouts = variant.payout_array()
+    records = np.zeros(len(keys), dtype=RECORD_DTYPE)
+    for i, key in enumerate(keys.tolist()):
+        counts = engine.hold_counts(unpack_key(key))
+        evs, likely, hit_rates = ExactAnalyzer.summarize_holds(counts, payouts, engine.rank_matrix)
+
+        rec = records[i]
+        rec["key"] = key
+        rec["best"] = int(evs.argmax())
+        rec["likely"] = likely
+        rec["ev"] = evs
+        rec["hit_rate"] = hit_rates
+    return records
+
+
+def build(path=DEFAULT_PATH, variant=None, workers=1, chunk_size=2000):
+    """Runs the exact analysis on every canonical starting hand and writes the database."""
+    start = time.time()
+    variant = variant or Variants.get_variant()
+    if variant.deck_size != 52:
+        raise ValueError(f"{variant.name} uses a {variant.deck_size}-card deck; the database covers 52-card games")
+    keys, _ = enumerate_canonical_hands()
+    logger.info("Building strategy database for %s: %d canonical hands", variant.name, len(keys))
+
+    chunks = [keys[i:i + chunk_size] for i in range(0, len(keys), chunk_size)]
+    parts = []
+    if workers > 1:
+        from multiprocessing import Pool
+        with Pool(workers) as pool:
+            for part in pool.starmap(_build_records, [(chunk, variant.key) for chunk in chunks]):
+                parts.append(part)
+    else:
+        for n, chunk in enumerate(chunks):
+            parts.append(_build_records(chunk, variant.key))
+            logger.info("Progress: %d/%d | %.0fs", min((n + 1) * chunk_size, len(keys)), len(keys), time.time() - start)
+
+    records = np.concatenate(parts)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, variant.hash.encode(), len(records)))
+        f.write(records.tobytes())
+    os.replace(tmp_path, path)
+
+    logger.info("Wrote %s (%.1f MB) in %.0fs", path, os.path.getsize(path) / 1e6, time.time() - start)
+    return path
+
+
+class StrategyDB(object):
+    """Read-only, memory-mapped view of a database written by build()."""
+
+    def __init__(self, path=DEFAULT_PATH, variant=None):
+        self.path = path
+        variant = variant or Variants.get_variant()
+        try:
+            with open(path, "rb") as f:
+                magic, version, table_hash, count = HEADER.unpack(f.read(HEADER.size))
+        except (OSError, struct.error) as e:
+            raise StaleDatabaseError(f"Cannot read strategy database {path}: {e}")
+
+        if magic != MAGIC or version != VERSION:
+            raise StaleDatabaseError(f"{path} is not a version {VERSION} strategy database")
+        if table_hash.decode() != variant.hash:
+            raise StaleDatabaseError(f"{path} was built for a different paytable than {variant.name}")
+
+        self.table_hash = variant.hash
+        self.ranks = variant.evaluator.ranks
+        self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER.size, shape=(count,))
+        self.keys = self.records["key"]
+
+    def __len__(self):
+        return len(self.records)
+
+    def find(self, canonical):
+        """Returns the record for a CanonicalHand, or None if it is not in the file."""
+        key = pack_key(canonical.cards)
+        i = int(np.searchsorted(self.keys, key))
+        if i < len(self.keys) and self.keys[i] == key:
+            return self.records[i]
+        return None
+
+    def lookup(self, canonical):
+        """
+        Returns [(ev, hit_rate, most_likely name)] in canonical hold order (the same
+        layout StrategyCache stores), or None.
+        """
+        rec = self.find(canonical)
+        if rec is None:
+            return None
+        return [
+            (float(ev), float(hit), self.ranks(int(rank)).name.replace("_", " ").title())
+            for ev, hit, rank in zip(rec["ev"], rec["hit_rate"], rec["likely"])
+        ]
+
+    def best_mask(self, canonical):
+        """Best hold for a CanonicalHand as a real-hand mask int, or None."""
+        rec = self.find(canonical)
+        if rec is None:
+            return None
+        return canonical.real_mask(int(rec["best"]))
+
+
+_default_db = None
+_default_checked = False
+
+
+def get_default():
+    """Returns the StrategyDB at DEFAULT_PATH for the default variant, or None if absent or stale."""
+    global _default_db, _default_checked
+    if not _default_checked:
+        _default_checked = True
+        if os.path.exists(DEFAULT_PATH):
+            try:
+                _default_db = StrategyDB(DEFAULT_PATH)
+            except StaleDatabaseError as e:
+                logger.warning("Ignoring strategy database: %s", e)
+    return _default_db
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Perfect-strategy database for Jacks or Better")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build_cmd = sub.add_parser("build", help="Analyze every canonical starting hand and write the database")
+    build_cmd.add_argument("--out", default=DEFAULT_PATH)
+    build_cmd.add_argument("--workers", type=int, default=1)
+    build_cmd.add_argument("--variant", default=Variants.DEFAULT_VARIANT,
+                           help=f"game to build for: {', '.join(Variants.VARIANTS)}")
+
+    args = parser.parse_args()
+    Metrics.setup_logging("INFO")
+    if args.command == "build":
+        build(args.out, variant=Variants.get_variant(args.variant), workers=args.workers)
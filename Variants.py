@@ -0,0 +1,208 @@
+import hashlib
+
+import HandEvaluator
+from HandRank import HandRank, WildRank
+from PayoutTable import PAYOUT_TABLE
+
+ROYAL = "Royal Flush"
+
+
+def rank_name(rank):
+    """HandRank.FULL_HOUSE -> 'Full House'."""
+    return rank.name.replace("_", " ").title()
+
+
+# --- QUALIFIER RULES ---
+# Each rule maps an evaluated hand (HandRank, primary, kicker) to the name of the pay
+# category it falls in, or None if it pays nothing. kicker is 0 when unknown. Wild-card
+# games get (WildRank, primary, 0) from WildEvaluator instead.
+
+def jacks_or_better_rule(rank, primary, kicker):
+    if rank == HandRank.PAIR:
+        return "Jacks or Better" if primary >= 11 else None
+    if rank == HandRank.HIGH_CARD:
+        return None
+    return rank_name(rank)
+
+
+def bonus_rule(rank, primary, kicker):
+    """Bonus Poker: Four of a Kind pays by the rank of the quads."""
+    if rank == HandRank.FOUR_OF_A_KIND:
+        if primary == 14:
+            return "Four Aces"
+        return "Four 2s-4s" if primary <= 4 else "Four 5s-Ks"
+    return jacks_or_better_rule(rank, primary, kicker)
+
+
+def double_double_bonus_rule(rank, primary, kicker):
+    """Double Double Bonus: Aces and 2s-4s also pay extra for a low kicker."""
+    if rank == HandRank.FOUR_OF_A_KIND:
+        if primary == 14 and 2 <= kicker <= 4:
+            return "Four Aces + 2-4"
+        if primary <= 4 and (kicker == 14 or 2 <= kicker <= 4):
+            return "Four 2s-4s + A-4"
+    return bonus_rule(rank, primary, kicker)
+
+
+def deuces_wild_rule(rank, primary, kicker):
+    """Deuces Wild: Three of a Kind or better."""
+    return rank_name(rank) if rank >= WildRank.THREE_OF_A_KIND else None
+
+
+def joker_poker_rule(rank, primary, kicker):
+    """Joker Poker: a pair of Kings or better; only the Joker is wild."""
+    if rank == WildRank.PAIR:
+        return "Kings or Better" if primary >= 13 else None
+    if rank == WildRank.FOUR_DEUCES:
+        return None  # needs four wild cards; one Joker never makes it
+    return rank_name(rank) if rank >= WildRank.TWO_PAIR else None
+
+
+class Variant(object):
+    """
+    One video poker game: its pay categories (in paytable order), the rule that puts
+    an evaluated hand into a pay category, and what each category pays.
+
+    Pays are per coin at every bet, unless short_royal is set: then a Royal Flush below
+    max bet pays short_royal per coin instead. The paytable is compiled once per bet
+    size into a flat list indexed by the category of the game's evaluator
+    (HandEvaluator.NATURAL, or a WildEvaluator for wild='deuces' / 'joker'), so pricing
+    a hand is a single index.
+    """
+
+    def __init__(self, key, name, pays, rule, wild=None, deck_size=52, max_coins=5, short_royal=None):
+        self.key = key
+        self.name = name
+        self.pays = pays
+        self.rule = rule
+        self.wild = wild
+        self.deck_size = deck_size
+        self.max_coins = max_coins
+        self.short_royal = short_royal
+        self._evaluator = None
+        self._names = None
+        self._payouts = {}
+        self._arrays = {}
+
+    def __repr__(self):
+        return f"Variant({self.key!r})"
+
+    @property
+    def evaluator(self):
+        """Evaluator for this game's deck and wild cards; the wild tables are built on first use."""
+        if self._evaluator is None:
+            if self.wild is None:
+                self._evaluator = HandEvaluator.NATURAL
+            else:
+                import WildEvaluator
+                self._evaluator = WildEvaluator.get_evaluator(self.wild)
+        return self._evaluator
+
+    def _compile_names(self):
+        if self._names is None:
+            evaluator = self.evaluator
+            self._names = tuple(self.rule(*evaluator.category_info(cat)) for cat in range(evaluator.num_categories))
+        return self._names
+
+    def pay_category(self, cat):
+        """Name of the pay category an evaluator category falls in, or None."""
+        return self._compile_names()[cat]
+
+    def pays_for_bet(self, coins):
+        """{pay category: credits won} at a bet of coins, in paytable order."""
+        return {name: self.pay_per_coin(name, coins) * coins for name in self.pays}
+
+    def pay_per_coin(self, name, coins=None):
+        if name == ROYAL and self.short_royal is not None and coins is not None and coins < self.max_coins:
+            return self.short_royal
+        return self.pays[name]
+
+    def payouts(self, coins=None):
+        """Per-coin payout of every category at a bet of coins (default: max bet), as a list."""
+        coins = coins or self.max_coins
+        if coins not in self._payouts:
+            self._payouts[coins] = [0 if name is None else self.pay_per_coin(name, coins)
+                                    for name in self._compile_names()]
+        return self._payouts[coins]
+
+    def payout_array(self, coins=None):
+        """payouts() as a float64 numpy array, for the vectorized engines."""
+        coins = coins or self.max_coins
+        if coins not in self._arrays:
+            import numpy as np
+            self._arrays[coins] = np.asarray(self.payouts(coins), dtype=np.float64)
+        return self._arrays[coins]
+
+    def repriced(self, pays, name=None):
+        """
+        The same game with some pay categories changed ({name: pays per coin}). The hash
+        changes with the pays, so caches and databases keyed by it never mix the two, while
+        category counts (HandAnalyzer.reprice, HoldTensor) price either one.
+        """
+        unknown = set(pays) - set(self.pays)
+        if unknown:
+            raise ValueError(f"{self.name} has no pay category {', '.join(sorted(unknown))}")
+        table = dict(self.pays)
+        table.update(pays)
+        variant = Variant(self.key, name or self.name, table, self.rule, self.wild, self.deck_size,
+                          self.max_coins, self.short_royal)
+        # Same rule, so the same category -> pay category names (a meter reprices often)
+        variant._evaluator = self._evaluator
+        variant._names = self._names
+        return variant
+
+    def with_progressive_royal(self, meter):
+        """repriced() for a progressive jackpot: meter is what a max-bet Royal Flush pays, in credits."""
+        return self.repriced({ROYAL: meter / self.max_coins}, name=f"{self.name} (Royal {meter:,.0f})")
+
+    @property
+    def hash(self):
+        """Stable short hash of what the game pays, used to key cached and stored strategy results."""
+        priced = (self.wild, self.deck_size, tuple(self.payouts()))
+        return hashlib.sha1(repr(priced).encode()).hexdigest()[:16]
+
+
+def _jacks_or_better_pays():
+    # Taken from PAYOUT_TABLE, so payout_for() and the variant always agree
+    pays = {rank_name(rank): PAYOUT_TABLE[rank] for rank in sorted(PAYOUT_TABLE, reverse=True)
+            if rank not in (HandRank.PAIR, HandRank.HIGH_CARD)}
+    pays["Jacks or Better"] = PAYOUT_TABLE[HandRank.PAIR]
+    return pays
+
+
+VARIANTS = {v.key: v for v in (
+    Variant("jacks_or_better", "Jacks or Better 9/6", _jacks_or_better_pays(), jacks_or_better_rule),
+
+    Variant("bonus_poker", "Bonus Poker 8/5", {
+        "Royal Flush": 800, "Straight Flush": 50, "Four Aces": 80, "Four 2s-4s": 40, "Four 5s-Ks": 25,
+        "Full House": 8, "Flush": 5, "Straight": 4, "Three Of A Kind": 3, "Two Pair": 2, "Jacks or Better": 1
+    }, bonus_rule),
+
+    Variant("double_double_bonus", "Double Double Bonus 9/6", {
+        "Royal Flush": 800, "Straight Flush": 50, "Four Aces + 2-4": 400, "Four 2s-4s + A-4": 160,
+        "Four Aces": 160, "Four 2s-4s": 80, "Four 5s-Ks": 50, "Full House": 9, "Flush": 6, "Straight": 4,
+        "Three Of A Kind": 3, "Two Pair": 1, "Jacks or Better": 1
+    }, double_double_bonus_rule),
+
+    Variant("deuces_wild", "Deuces Wild (Full Pay)", {
+        "Royal Flush": 800, "Four Deuces": 200, "Wild Royal Flush": 25, "Five Of A Kind": 15,
+        "Straight Flush": 9, "Four Of A Kind": 5, "Full House": 3, "Flush": 2, "Straight": 2, "Three Of A Kind": 1
+    }, deuces_wild_rule, wild="deuces"),
+
+    Variant("joker_poker", "Joker Poker (Kings or Better)", {
+        "Royal Flush": 800, "Five Of A Kind": 200, "Wild Royal Flush": 100, "Straight Flush": 50,
+        "Four Of A Kind": 20, "Full House": 7, "Flush": 5, "Straight": 3, "Three Of A Kind": 2, "Two Pair": 1,
+        "Kings or Better": 1
+    }, joker_poker_rule, wild="joker", deck_size=53),
+)}
+
+DEFAULT_VARIANT = "jacks_or_better"
+
+
+def get_variant(key=None):
+    """Looks up a registered variant by key (default: Jacks or Better)."""
+    try:
+        return VARIANTS[key or DEFAULT_VARIANT]
+    except KeyError:
+        raise ValueError(f"Unknown game variant {key!r}; choose from {', '.join(VARIANTS)}")
+
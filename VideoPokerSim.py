@@ -1,69 +1,249 @@
-import random
+from collections import Counter, deque
+
+import numpy as np
+
+import Variants
 from HandAnalyzer import HandAnalyzer
+from MultiHand import play_lines
+from StrategyDB import pack_key
+
+
+def play_hand(deck_instance, bet_amount, variant=None, analysis="exact"):
+    """
+    Deals, plays the optimal hold for variant (default: Jacks or Better) and scores one
+    hand. analysis is the find_optimal_move mode. Returns (rank, payout, hand, hold):
+    hand is the dealt cards packed with StrategyDB.pack_key, hold the mask as an int.
+    """
+    # 1. Deal 5 cards using your dealOne() method
+    initial_hand = [deck_instance.dealOne() for _ in range(5)]
+
+    # 2. Analyze strategy
+    # Passing the hand and the actual list of remaining cards
+    analyzer = HandAnalyzer(initial_hand, deck_instance.cards, variant, rng=deck_instance.rng)
+    analyzer.find_optimal_move(analysis)
+
+    # 3. Execute Best Move
+    best_move = analyzer.best_move
+    num_to_draw = 5 - len(best_move['cards'])
+
+    # Complete the hand using dealOne()
+    final_hand = best_move['cards'] + [deck_instance.dealOne() for _ in range(num_to_draw)]
+
+    # 4. Evaluate Result (with the variant's evaluator, so wild cards count)
+    cat = analyzer.category_of(final_hand)
+    rank = analyzer.variant.evaluator.category_ranks[cat]
+    payout = analyzer.variant.payouts()[cat] * bet_amount
+    return rank, payout, pack_key([c.get_code for c in initial_hand]), int(best_move['mask'], 2)
+
+
+def play_multi_hand(deck_instance, bet_amount, variant, lines, rng=None, analysis="exact"):
+    """
+    Multi-hand play: deals once, analyzes the hold once, then draws all lines from their
+    own copies of the stub in one batch (MultiHand.play_lines). bet_amount is per line.
+    Returns (ranks, payouts, hand, hold): per-line arrays plus the packed deal and mask.
+    """
+    initial_hand = [deck_instance.dealOne() for _ in range(5)]
+    stub = deck_instance.cards
+
+    analyzer = HandAnalyzer(initial_hand, stub, variant, rng=rng)
+    analyzer.find_optimal_move(analysis)
+    hold = int(analyzer.best_move['mask'], 2)
+
+    dealt_codes = [c.get_code for c in initial_hand]
+    result = play_lines(analyzer.variant, dealt_codes, hold, [c.get_code for c in stub], lines, bet_amount, rng)
+    return result.ranks, result.payouts, pack_key(dealt_codes), hold
+
+
+def play_block(deck_class, bet_amount, num_hands, seed_seq, variant_key=None, lines=1, analysis="exact"):
+    """
+    Plays num_hands deals of `lines` lines each with a Generator seeded from seed_seq (one
+    block of run_parallel). Returns the per-line final ranks, payouts, packed dealt hands
+    and hold masks as arrays (num_hands * lines long, the lines of a deal adjacent).
+    """
+    rng = np.random.default_rng(seed_seq)
+    variant = Variants.get_variant(variant_key)
+    ranks = np.empty(num_hands * lines, dtype=np.uint8)
+    payouts = np.empty(num_hands * lines, dtype=np.float64)
+    hands = np.empty(num_hands * lines, dtype=np.uint32)
+    holds = np.empty(num_hands * lines, dtype=np.uint8)
+    deck_instance = deck_class(rng=rng, deck_size=variant.deck_size)
+
+    for i in range(num_hands):
+        # Reuse one deck: reset() and reshuffle instead of rebuilding it every hand
+        deck_instance.reset()
+        deck_instance.shuffle()
+        if lines == 1:
+            ranks[i], payouts[i], hands[i], holds[i] = play_hand(deck_instance, bet_amount, variant, analysis)
+        else:
+            rows = slice(i * lines, (i + 1) * lines)
+            ranks[rows], payouts[rows], hands[rows], holds[rows] = play_multi_hand(
+                deck_instance, bet_amount, variant, lines, rng, analysis)
+
+    return ranks, payouts, hands, holds
+
+
+def _play_block_job(job):
+    return play_block(*job)
 
 
 class VideoPokerSim:
-    def __init__(self, deck_class, initial_bankroll=100.0, bet_amount=1.0):
+    def __init__(self, deck_class, initial_bankroll=100.0, bet_amount=1.0, keep_payouts=True, variant=None,
+                 lines=1, analysis="exact"):
         self.Deck = deck_class
+        self.variant = variant or Variants.get_variant()
+        # Lines per deal (MultiHand.PLAY_SIZES); bet_amount is per line, and every line counts as a hand
+        self.lines = lines
+        # find_optimal_move mode: "exact", or "sampled" (per-hold draws from the deck's seeded rng;
+        # exactly enumerated holds are served from HOLD_CACHE when seen)
+        self.analysis = analysis
+        self.initial_bankroll = initial_bankroll
         self.bankroll = initial_bankroll
         self.bet_amount = bet_amount
+        # Per-hand payouts for bankroll_trajectory(); turn off for long runs that stream to a sink
+        self.keep_payouts = keep_payouts
+        self.payouts = []
         self.stats = {
             "hands_played": 0,
             "total_invested": 0,
             "total_returned": 0,
             "wins": 0,
             "losses": 0,
-            "big_wins": []
+            "rank_counts": Counter(),
+            # Only the most recent hits are kept, so long studies don't grow this list without bound
+            "big_wins": deque(maxlen=100)
         }
 
-    def run_session(self, num_hands=100, silent=False):
-        print(f"\n>>> Starting Perfect-Play Session: {num_hands} Hands")
+    def record_hand(self, rank, payout):
+        """Applies one finished hand to the bankroll and stats."""
+        self.bankroll += payout - self.bet_amount
+        self.stats["hands_played"] += 1
+        self.stats["total_invested"] += self.bet_amount
+        self.stats["total_returned"] += payout
+        self.stats["rank_counts"][self.variant.evaluator.ranks(rank)] += 1
+        if self.keep_payouts:
+            self.payouts.append(payout)
+
+        if payout > 0:
+            self.stats["wins"] += 1
+            # Track hits that pay 5x or more (Flush+)
+            if payout >= (self.bet_amount * 5):
+                self.stats["big_wins"].append(f"Hand #{self.stats['hands_played']}: {self.variant.evaluator.ranks(rank).name} (+{payout})")
+        else:
+            self.stats["losses"] += 1
+
+    def record_lines(self, ranks, payouts):
+        """record_hand() for an array of hands at once (the lines of a deal, or a whole block)."""
+        n = len(payouts)
+        first = self.stats["hands_played"]
+        total = float(payouts.sum())
+        self.bankroll += total - self.bet_amount * n
+        self.stats["hands_played"] += n
+        self.stats["total_invested"] += self.bet_amount * n
+        self.stats["total_returned"] += total
+        if self.keep_payouts:
+            self.payouts.extend(payouts.tolist())
+
+        ranks_type = self.variant.evaluator.ranks
+        for rank, count in zip(*np.unique(ranks, return_counts=True)):
+            self.stats["rank_counts"][ranks_type(int(rank))] += int(count)
+
+        wins = int(np.count_nonzero(payouts))
+        self.stats["wins"] += wins
+        self.stats["losses"] += n - wins
+        for i in np.flatnonzero(payouts >= self.bet_amount * 5).tolist():
+            self.stats["big_wins"].append(f"Hand #{first + i + 1}: {ranks_type(int(ranks[i])).name} (+{payouts[i]})")
+
+    def run_session(self, num_hands=100, silent=False, sink=None, seed=None):
+        """
+        Plays num_hands in this process. A seed makes the session reproducible; a sink
+        (e.g. ResultsSink.ColumnarSink) receives every hand as it is played.
+        """
+        print(f"\n>>> Starting Perfect-Play Session: {num_hands} Hands of {self.variant.name}{self._play_label()}")
+
+        # 1. Initialize your Deck once; every hand starts from reset() + shuffle()
+        rng = np.random.default_rng(seed) if seed is not None else None
+        deck_instance = self.Deck(rng=rng, deck_size=self.variant.deck_size)
 
         for i in range(num_hands):
-            # 1. Initialize your Deck (Constructor calls new() and shuffle() automatically)
-            deck_instance = self.Deck()
-
-            # 2. Pay for the hand
-            self.bankroll -= self.bet_amount
-            self.stats["total_invested"] += self.bet_amount
-            self.stats["hands_played"] += 1
-
-            # 3. Deal 5 cards using your dealOne() method
-            initial_hand = [deck_instance.dealOne() for _ in range(5)]
-
-            # 4. Analyze strategy
-            # Passing the hand and the actual list of remaining cards
-            analyzer = HandAnalyzer(initial_hand, deck_instance.cards)
-            analyzer.find_optimal_move()
-
-            # 5. Execute Best Move
-            best_move = analyzer.best_move
-            num_to_draw = 5 - len(best_move['cards'])
-
-            # Complete the hand using dealOne()
-            final_hand = best_move['cards'] + [deck_instance.dealOne() for _ in range(num_to_draw)]
-
-            # 6. Evaluate Result
-            rank, val = analyzer.evaluate_hand_fast(final_hand)
-            payout = analyzer.get_payout(rank, val) * self.bet_amount
-
-            # 7. Update Stats
-            self.bankroll += payout
-            self.stats["total_returned"] += payout
-
-            if payout > 0:
-                self.stats["wins"] += 1
-                # Track hits that pay 5x or more (Flush+)
-                if payout >= (self.bet_amount * 5):
-                    self.stats["big_wins"].append(f"Hand #{i + 1}: {rank.name} (+{payout})")
+            deck_instance.reset()
+            deck_instance.shuffle()
+
+            # 2. Play the hand perfectly and update stats
+            if self.lines == 1:
+                rank, payout, hand, hold = play_hand(deck_instance, self.bet_amount, self.variant, self.analysis)
+                self.record_hand(rank, payout)
+                if sink is not None:
+                    sink.append(seed or 0, self.stats["hands_played"] - 1, hand, hold, rank, payout, self.bankroll)
             else:
-                self.stats["losses"] += 1
+                # One analysis per deal; every line draws from its own copy of the stub
+                start_bankroll = self.bankroll
+                ranks, payouts, hand, hold = play_multi_hand(deck_instance, self.bet_amount, self.variant,
+                                                             self.lines, rng, self.analysis)
+                self.record_lines(ranks, payouts)
+                if sink is not None:
+                    self._sink_rows(sink, seed or 0, ranks, payouts, np.full(self.lines, hand),
+                                    np.full(self.lines, hold), start_bankroll)
 
             if not silent and (i + 1) % 10 == 0:
                 print(f"Progress: {i + 1}/{num_hands} | Bankroll: {self.bankroll:.2f}")
 
         self.show_report()
 
+    def run_parallel(self, num_hands=1000, workers=4, seed=0, block_size=250, sink=None, silent=False):
+        """
+        Runs a session across a process pool. The session is cut into fixed blocks of
+        block_size hands, each with its own SeedSequence.spawn() stream, and results are
+        merged in block order, so a given seed gives identical results for any worker count.
+        A sink receives the merged hands block by block; unless silent, a progress line
+        follows each block.
+        """
+        print(f"\n>>> Starting Parallel Perfect-Play Session: {num_hands} Hands of {self.variant.name}"
+              f"{self._play_label()} on {workers} workers")
+
+        sizes = [min(block_size, num_hands - start) for start in range(0, num_hands, block_size)]
+        streams = np.random.SeedSequence(seed).spawn(len(sizes))
+        jobs = [(self.Deck, self.bet_amount, size, stream, self.variant.key, self.lines,
+                 self.analysis)
+                for size, stream in zip(sizes, streams)]
+
+        if workers > 1:
+            from multiprocessing import Pool
+            with Pool(workers) as pool:
+                # imap hands blocks back in order as they finish, so only a few are held at once
+                self._merge_blocks(pool.imap(_play_block_job, jobs), seed, sink, num_hands, silent)
+        else:
+            self._merge_blocks((play_block(*job) for job in jobs), seed, sink, num_hands, silent)
+
+        self.show_report()
+
+    def _merge_blocks(self, blocks, seed, sink, num_hands, silent):
+        """Applies finished blocks to the stats in block order and forwards them to the sink."""
+        for ranks, payouts, hands, holds in blocks:
+            start_bankroll = self.bankroll
+            self.record_lines(ranks, payouts)
+            if sink is not None:
+                self._sink_rows(sink, seed, ranks, payouts, hands, holds, start_bankroll)
+            if not silent:
+                deals = self.stats["hands_played"] // self.lines
+                print(f"Progress: {deals}/{num_hands} | Bankroll: {self.bankroll:.2f}")
+
+    def _sink_rows(self, sink, seed, ranks, payouts, hands, holds, start_bankroll):
+        # Rows for hands record_lines() just applied: they end at hands_played
+        first = self.stats["hands_played"] - len(ranks)
+        bankroll = start_bankroll + np.cumsum(payouts - self.bet_amount)
+        sink.extend(seed=np.full(len(ranks), seed), hand_index=np.arange(first, first + len(ranks)),
+                    hand=hands, hold=holds, rank=ranks, payout=payouts, bankroll=bankroll)
+
+    def _play_label(self):
+        if self.lines == 1:
+            return ""
+        return f" ({self.lines} lines per deal)"
+
+    def bankroll_trajectory(self):
+        """Bankroll after each hand, starting with the initial bankroll."""
+        net = np.asarray(self.payouts, dtype=np.float64) - self.bet_amount
+        return np.concatenate(([self.initial_bankroll], self.initial_bankroll + np.cumsum(net)))
+
     def show_report(self):
         roi = (self.stats["total_returned"] / self.stats["total_invested"]) * 100
         net = self.stats["total_returned"] - self.stats["total_invested"]
@@ -72,6 +252,8 @@ class VideoPokerSim:
         print(f"{'SESSION SUMMARY':^50}")
         print("=" * 50)
         print(f"Total Hands:     {self.stats['hands_played']}")
+        if self.lines > 1:
+            print(f"Deals:           {self.stats['hands_played'] // self.lines} x {self.lines} lines")
         print(f"Final Bankroll:  {self.bankroll:.2f}")
         print(f"Net Profit/Loss: {net:+.2f}")
         print(f"Return (ROI):    {roi:.2f}%")
@@ -79,6 +261,6 @@ class VideoPokerSim:
 
         if self.stats["big_wins"]:
             print("\n--- Top Hits ---")
-            for win in self.stats["big_wins"][-5:]:
+            for win in list(self.stats["big_wins"])[-5:]:
                 print(win)
-        print("=" * 50 + "\n")
\ No newline at end of file
+        print("=" * 50 + "\n")
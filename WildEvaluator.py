@@ -0,0 +1,332 @@
+import itertools
+import random
+import time
+from collections import Counter
+
+from Card import JOKER_CODE
+from HandEvaluator import CARD_INTS, PRIMARY_SLOTS, RANK_PRIMES, extend_state, fold_states, partial_state
+from HandRank import WildRank
+
+# --- WILD CARD ENCODING ---
+# Same packed ints as HandEvaluator, except a wild card has no rank bit, every suit
+# bit and the prime 1: it never breaks a flush and drops out of the rank-prime
+# product. So a hand is fully described by its natural cards:
+#   suited      : c1 & ... & c5 & 0xF000 (the naturals share a suit)
+#   rank bits   : the natural ranks; when suited they are distinct, and the number
+#                 of wild cards is 5 minus the bit count
+#   prime product: the natural rank multiset (and so the number of wild cards)
+WILD_INT = 0xF000 | 1
+
+# --- CATEGORIES ---
+# WildRank * PRIMARY_SLOTS + primary, where primary is the rank the hand is made of
+# (the best one the wild cards can reach): the pair, trips, quads or five of a kind,
+# the top pair, the trips of a Full House, or the high card of a straight or flush.
+NUM_CATEGORIES = len(WildRank) * PRIMARY_SLOTS
+
+
+def category(rank, primary, kicker=0):
+    """Category index of an evaluated hand; wild games have no kicker categories."""
+    return int(rank) * PRIMARY_SLOTS + primary
+
+
+def category_info(cat):
+    """Inverse of category(): (WildRank, primary, kicker)."""
+    return WildRank(cat // PRIMARY_SLOTS), cat % PRIMARY_SLOTS, 0
+
+
+CATEGORY_RANKS = tuple(category_info(cat)[0] for cat in range(NUM_CATEGORIES))
+
+
+# (rank bitmask of a straight, its high card), best first; bit 0 = Two
+STRAIGHT_WINDOWS = tuple((0b11111 << (high - 6), high) for high in range(14, 5, -1)) + ((0b1000000001111, 5),)
+
+
+def _straight_high(values):
+    """High card of the best straight that distinct natural values complete with wild cards, or 0."""
+    rank_mask = 0
+    for v in values:
+        rank_mask |= 1 << (v - 2)
+    for window, high in STRAIGHT_WINDOWS:
+        if rank_mask & window == rank_mask:
+            return high
+    return 0
+
+
+def classify(values, suited):
+    """
+    Best hand made by the natural rank values (2..14) plus 5 - len(values) wild cards.
+    suited: the natural cards share one suit. Returns (WildRank, primary).
+
+    The ranks are checked from the top down. Where a hand could be read two ways
+    the readings never overlap in a way that changes the pay: a hand is never both
+    Five of a Kind and a Wild Royal, and Four Deuces only happens with four wilds.
+    """
+    wilds = 5 - len(values)
+    counts = {}
+    for v in values:
+        counts[v] = counts.get(v, 0) + 1
+    shape = sorted(counts.values(), reverse=True)
+    top = shape[0] if shape else 0
+    # The rank with the most copies, the higher one on ties
+    best = max((v for v in counts if counts[v] == top), default=14)
+    high = _straight_high(values) if top <= 1 else 0
+
+    if wilds == 4:
+        return WildRank.FOUR_DEUCES, 0
+    if suited and high == 14:
+        return (WildRank.ROYAL_FLUSH if wilds == 0 else WildRank.WILD_ROYAL_FLUSH), 14
+    if top + wilds >= 5:
+        return WildRank.FIVE_OF_A_KIND, best
+    if suited and high:
+        return WildRank.STRAIGHT_FLUSH, high
+    if top + wilds >= 4:
+        return WildRank.FOUR_OF_A_KIND, best
+    if shape == [3, 2] or (wilds == 1 and shape == [2, 2]):
+        return WildRank.FULL_HOUSE, best
+    if suited:
+        return WildRank.FLUSH, 14 if wilds else max(values)
+    if high:
+        return WildRank.STRAIGHT, high
+    if top + wilds >= 3:
+        return WildRank.THREE_OF_A_KIND, best
+    if shape[:2] == [2, 2]:
+        return WildRank.TWO_PAIR, best
+    if top + wilds >= 2:
+        return WildRank.PAIR, best
+    return WildRank.HIGH_CARD, 0
+
+
+def _build_tables():
+    """Builds the lookup tables used by evaluate_category()."""
+    # 1. Suited naturals (all distinct ranks): indexed by the OR of the rank bits
+    suited_table = [None] * 8192
+    for size in range(1, 6):
+        for ranks in itertools.combinations(range(13), size):
+            suited_table[sum(1 << r for r in ranks)] = category(*classify([r + 2 for r in ranks], True))
+
+    # 2. Everything else: indexed by the product of the natural rank primes
+    product_table = {}
+    for size in range(0, 6):
+        for ranks in itertools.combinations_with_replacement(range(13), size):
+            if size == 5 and ranks[0] == ranks[4]:
+                continue  # five of one rank: only four exist
+            product = 1
+            for r in ranks:
+                product *= RANK_PRIMES[r]
+            product_table[product] = category(*classify([r + 2 for r in ranks], False))
+
+    return suited_table, product_table
+
+
+SUITED_CATEGORIES, PRODUCT_CATEGORIES = _build_tables()
+_batch_tables = None
+
+
+def evaluate_category(c1, c2, c3, c4, c5):
+    """Category of five packed card ints (wild cards as WILD_INT)."""
+    if c1 & c2 & c3 & c4 & c5 & 0xF000:
+        return SUITED_CATEGORIES[(c1 | c2 | c3 | c4 | c5) >> 16]
+    return PRODUCT_CATEGORIES[(c1 & 0xFF) * (c2 & 0xFF) * (c3 & 0xFF) * (c4 & 0xFF) * (c5 & 0xFF)]
+
+
+def state_category(state):
+    """Category of a complete (five-card) partial-hand state (HandEvaluator.partial_state)."""
+    suits, rank_bits, product = state
+    if suits & 0xF000:
+        return SUITED_CATEGORIES[rank_bits >> 16]
+    return PRODUCT_CATEGORIES[product]
+
+
+def complete_category(state, c):
+    """Category of a four-card state completed by the packed int c."""
+    suits, rank_bits, product = state
+    if suits & c & 0xF000:
+        return SUITED_CATEGORIES[(rank_bits | c) >> 16]
+    return PRODUCT_CATEGORIES[product * (c & 0xFF)]
+
+
+def _get_batch_tables():
+    # numpy copies of the tables, built on first use so importing this module stays cheap
+    global _batch_tables
+    if _batch_tables is None:
+        import numpy as np
+        suited = np.array([0 if cat is None else cat for cat in SUITED_CATEGORIES], dtype=np.uint16)
+        products = np.array(sorted(PRODUCT_CATEGORIES), dtype=np.int64)
+        product_cats = np.array([PRODUCT_CATEGORIES[p] for p in products.tolist()], dtype=np.uint16)
+        _batch_tables = suited, products, product_cats
+    return _batch_tables
+
+
+class WildEvaluator(object):
+    """
+    Evaluator for one wild-card game: which card codes are wild and how big the deck
+    is. Provides the same interface as HandEvaluator.NATURAL, so Variants,
+    HandAnalyzer and ExactAnalyzer drive either one the same way.
+    """
+    ranks = WildRank
+    num_categories = NUM_CATEGORIES
+    category_ranks = CATEGORY_RANKS
+
+    category = staticmethod(category)
+    category_info = staticmethod(category_info)
+    evaluate_category = staticmethod(evaluate_category)
+
+    # Wild cards are packed ints like any other, so partial hands use HandEvaluator's state
+    partial_state = staticmethod(partial_state)
+    extend_state = staticmethod(extend_state)
+    state_category = staticmethod(state_category)
+    complete_category = staticmethod(complete_category)
+
+    def __init__(self, key, wild_codes, deck_size=52):
+        self.key = key
+        self.wild_codes = frozenset(wild_codes)
+        self.deck_size = deck_size
+        self.card_ints = tuple(WILD_INT if code in self.wild_codes else CARD_INTS[code]
+                               for code in range(deck_size))
+
+    def __repr__(self):
+        return f"WildEvaluator({self.key!r})"
+
+    def category_codes(self, codes):
+        """Category of a sequence of five card codes."""
+        ints = self.card_ints
+        c1, c2, c3, c4, c5 = codes
+        return evaluate_category(ints[c1], ints[c2], ints[c3], ints[c4], ints[c5])
+
+    def category_cards(self, cards):
+        """Category of a list of five Card objects."""
+        ints = self.card_ints
+        c1, c2, c3, c4, c5 = [ints[c.get_code] for c in cards]
+        return evaluate_category(c1, c2, c3, c4, c5)
+
+    def evaluate_categories(self, hands, chunk_size=1 << 18):
+        """Category of every hand in an (N, 5) array of card codes, as uint16 (vectorized)."""
+        import numpy as np
+
+        suited_cats, products, product_cats = _get_batch_tables()
+        ints = np.asarray(self.card_ints, dtype=np.int64)
+        cats = np.empty(len(hands), dtype=np.uint16)
+
+        # Chunking keeps the temporaries cache-sized
+        for start in range(0, len(hands), chunk_size):
+            chunk = ints[hands[start:start + chunk_size]]
+            suited = np.bitwise_and.reduce(chunk, axis=1) & 0xF000
+            rank_bits = np.bitwise_or.reduce(chunk, axis=1) >> 16
+            product = np.prod(chunk & 0xFF, axis=1)
+            cats[start:start + chunk_size] = np.where(
+                suited != 0, suited_cats[rank_bits], product_cats[np.searchsorted(products, product)])
+        return cats
+
+    def complete_categories(self, state, drawn):
+        """Category of the partial hand state completed by each column of drawn (fold_states), as uint16."""
+        import numpy as np
+
+        suited_cats, products, product_cats = _get_batch_tables()
+        suits, rank_bits, product = fold_states(state, drawn)
+        return np.where(suits != 0, suited_cats[rank_bits], product_cats[np.searchsorted(products, product)])
+
+
+DEUCES = WildEvaluator("deuces", range(4), 52)
+JOKER = WildEvaluator("joker", (JOKER_CODE,), 53)
+EVALUATORS = {e.key: e for e in (DEUCES, JOKER)}
+
+
+def get_evaluator(wild):
+    """The evaluator for a Variant.wild key ('deuces' or 'joker')."""
+    try:
+        return EVALUATORS[wild]
+    except KeyError:
+        raise ValueError(f"Unknown wild card {wild!r}; choose from {', '.join(EVALUATORS)}")
+
+
+def _reference(values, suits, wilds, four_deuces):
+    """
+    Brute-force best hand: tries every rank for every wild card (taking the naturals'
+    suit when they share one) and keeps the highest (WildRank, primary).
+    """
+    best = (WildRank.HIGH_CARD, 0)
+    if four_deuces and wilds == 4:
+        return WildRank.FOUR_DEUCES, 0
+    flush_possible = len(set(suits)) <= 1
+
+    for filled in itertools.product(range(2, 15), repeat=wilds):
+        hand = sorted(values + list(filled))
+        counts = Counter(hand)
+        shape = sorted(counts.values(), reverse=True)
+        made = max(counts, key=lambda v: (counts[v], v))
+        straight = 0
+        if len(counts) == 5:
+            if hand[4] - hand[0] == 4:
+                straight = hand[4]
+            elif hand == [2, 3, 4, 5, 14]:
+                straight = 5
+
+        if flush_possible and straight == 14:
+            result = (WildRank.ROYAL_FLUSH if wilds == 0 else WildRank.WILD_ROYAL_FLUSH, 14)
+        elif shape[0] == 5:
+            result = (WildRank.FIVE_OF_A_KIND, made)
+        elif flush_possible and straight:
+            result = (WildRank.STRAIGHT_FLUSH, straight)
+        elif shape[0] == 4:
+            result = (WildRank.FOUR_OF_A_KIND, made)
+        elif shape == [3, 2]:
+            result = (WildRank.FULL_HOUSE, made)
+        elif flush_possible:
+            result = (WildRank.FLUSH, hand[4])
+        elif straight:
+            result = (WildRank.STRAIGHT, straight)
+        elif shape[0] == 3:
+            result = (WildRank.THREE_OF_A_KIND, made)
+        elif shape[:2] == [2, 2]:
+            result = (WildRank.TWO_PAIR, made)
+        elif shape[0] == 2:
+            result = (WildRank.PAIR, made)
+        else:
+            result = (WildRank.HIGH_CARD, 0)
+        best = max(best, result)
+    return best
+
+
+def verify_against_reference(evaluator, num_hands=20000, seed=0):
+    """
+    Compares evaluate_category() with the brute-force _reference() on random hands
+    (every hand holds at least one wild card). Returns the number of mismatches.
+    """
+    rng = random.Random(seed)
+    wild_codes = sorted(evaluator.wild_codes)
+    naturals = [code for code in range(evaluator.deck_size) if code not in evaluator.wild_codes]
+
+    mismatches = 0
+    for _ in range(num_hands):
+        wilds = rng.randint(1, min(4, len(wild_codes)))
+        hand = rng.sample(wild_codes, wilds) + rng.sample(naturals, 5 - wilds)
+        natural = [code for code in hand if code not in evaluator.wild_codes]
+        expected = _reference([code // 4 + 2 for code in natural], [code % 4 for code in natural],
+                              wilds, evaluator is DEUCES)
+        if category_info(evaluator.category_codes(hand))[:2] != expected:
+            mismatches += 1
+    return mismatches
+
+
+def benchmark(evaluator, num_hands=500000, seed=0):
+    """evaluate_category throughput (hands per second) for a wild game and for HandEvaluator."""
+    import HandEvaluator
+
+    rng = random.Random(seed)
+    rates = {}
+    for name, deck_size, ints, evaluate in (
+            (evaluator.key, evaluator.deck_size, evaluator.card_ints, evaluate_category),
+            ("natural", 52, HandEvaluator.CARD_INTS, HandEvaluator.evaluate_category)):
+        packed = [[ints[c] for c in rng.sample(range(deck_size), 5)] for _ in range(num_hands)]
+        start = time.perf_counter()
+        for c1, c2, c3, c4, c5 in packed:
+            evaluate(c1, c2, c3, c4, c5)
+        rates[name] = num_hands / (time.perf_counter() - start)
+    return rates
+
+
+if __name__ == '__main__':
+    for wild_evaluator in EVALUATORS.values():
+        print(f"{wild_evaluator.key}: {verify_against_reference(wild_evaluator)} mismatches vs brute force")
+        for game, rate in benchmark(wild_evaluator).items():
+            print(f"  {game:<8} {rate / 1e6:.2f}M hands/sec")
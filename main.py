@@ -1,30 +1,36 @@
-from Deck import Deck
-from Player import Player
-from HandAnalyzer import HandAnalyzer
-from VideoPokerSim import VideoPokerSim
-from GUI import GUI
+import os
 import tkinter as tk
 
-if __name__ == '__main__':
-    deck = Deck()
-    player = Player()
-    # for i in range(5):
-    #     player.inject(["3h", "3c", "3d", "ah", "as"], deck)
-    # player.print_cards()
-    # analyzed = HandAnalyzer(player.get_cards, deck.get_cards)
-    # analyzed.analyze()
+import Metrics
+
+# Headless simulations have their own entry point that never loads the GUI stack:
+#   python SimulationCLI.py --hands 500 --workers 4 --seed 1
+#
+# To inspect one hand from a script:
+#   from Deck import Deck
+#   from Player import Player
+#   from HandAnalyzer import HandAnalyzer
+#   deck = Deck()
+#   player = Player()
+#   player.inject(["3h", "3c", "3d", "ah", "as"], deck)
+#   Metrics.setup_logging("INFO")   # analyze() logs its strategy table at INFO
+#   HandAnalyzer(player.get_cards, deck.get_cards).analyze()
+#
+# PEEKER_LOG_LEVEL=INFO (or DEBUG) shows the GUI's diagnostics on stderr.
 
-    # Create the simulator, passing your classes in
-    # sim = VideoPokerSim(Deck, initial_bankroll=200, bet_amount=1)
-    #
-    # # Run 500 hands
-    # sim.run_session(num_hands=500, silent=False)
+if __name__ == '__main__':
+    Metrics.setup_logging(os.environ.get("PEEKER_LOG_LEVEL", "WARNING"))
 
-    # Create the root Tkinter window
+    # 1. Create the root Tkinter window and paint it before anything heavy is imported
     root = tk.Tk()
+    root.title("Peeker")
+    root.geometry("1150x800")
+    root.configure(bg="#0a3d0a")
+    root.update()
 
-    # Initialize our GUI object
+    # 2. Initialize our GUI object (matplotlib and the card images load after this paints)
+    from GUI import GUI
     app = GUI(root)
 
-    # Start the program loop
-    root.mainloop()
\ No newline at end of file
+    # 3. Start the program loop
+    root.mainloop()